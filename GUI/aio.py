@@ -0,0 +1,198 @@
+"""
+aio.py
+asyncio facade over the DMD and ASI camera wrappers
+
+Blocking ctypes calls run on small dedicated executors (one thread per
+device, since neither DLL is safe to call concurrently for one device), so a
+single event loop can overlap DMD uploads with camera exposures.
+
+    dmd = AsyncDMD(DMD())
+    cam = AsyncCamera(camera)
+    await dmd.connect()
+    shown, dark = await asyncio.gather(dmd.display(pattern), cam.snap(is_dark=True))
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asi_wrapper import ExpStatus
+from dmd_worker import DMDWorker
+
+
+class AsyncDMD:
+    """Awaitable DMD commands, run on a latest-wins DMDWorker"""
+
+    def __init__(self, dmd, worker: DMDWorker = None):
+        """
+        Args:
+            dmd: DMD instance
+            worker: Existing worker owning dmd (a new one is started if None)
+        """
+        self.dmd = dmd
+        self._owns_worker = worker is None
+        self.worker = worker or DMDWorker(dmd)
+
+    async def _await(self, future, timeout: float = None):
+        # Cancelling the wrapper cancels the queued command if it has not started;
+        # a running USB transfer is always allowed to finish.
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    async def call(self, method: str, *args, timeout: float = None):
+        """
+        Await any DMD method on the worker.
+
+        Args:
+            method: DMD method name
+            timeout: Seconds before asyncio.TimeoutError (None waits forever)
+        """
+        return await self._await(self.worker.call(method, *args), timeout)
+
+    async def connect(self, timeout: float = None) -> bool:
+        """Connect to the DMD."""
+        return await self.call("connect", timeout=timeout)
+
+    async def display(self, pattern, timeout: float = None) -> bool:
+        """
+        Display an in-memory pattern. A newer display() cancels this one if it
+        is still queued, raising asyncio.CancelledError here.
+
+        Args:
+            pattern: Array accepted by DMD.display_array
+            timeout: Seconds before asyncio.TimeoutError
+        """
+        return await self._await(self.worker.display(pattern), timeout)
+
+    async def display_cell(self, row: int, column: int, grid_size: int = 10, timeout: float = None) -> bool:
+        """Generate and display a grid cell pattern (latest wins, as display())."""
+        return await self._await(self.worker.display_cell(row, column, grid_size), timeout)
+
+    async def clear_pattern(self, timeout: float = None) -> bool:
+        """Stop the current pattern display."""
+        return await self.call("clear_pattern", timeout=timeout)
+
+    async def get_status(self, timeout: float = None) -> dict | None:
+        """Get device status (see DMD.get_status)."""
+        return await self.call("get_status", timeout=timeout)
+
+    def close(self):
+        """Stop the worker if this facade started it."""
+        if self._owns_worker:
+            self.worker.stop()
+
+
+class AsyncCamera:
+    """Awaitable ASI camera snaps and an async video frame iterator"""
+
+    def __init__(self, camera, poll_s: float = 0.005):
+        """
+        Args:
+            camera: Initialised ASICamera instance
+            poll_s: Interval between exposure status polls in seconds
+        """
+        self.camera = camera
+        self.poll_s = poll_s
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aio-camera")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def snap(self, is_dark: bool = False, timeout: float = 30.0):
+        """
+        Take a single exposure without blocking the event loop.
+
+        The exposure is polled from the loop, so a timeout or a cancelled task
+        aborts it with cam_stop_exposure instead of waiting it out.
+
+        Args:
+            is_dark: True for dark frame
+            timeout: Seconds before asyncio.TimeoutError (None waits forever)
+
+        Returns:
+            numpy array or None on failure
+        """
+        if await self._run(self.camera.start_exposure, is_dark) != 0:
+            print("Snap failed: Failed to start exposure")
+            return None
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                status = await self._run(self.camera.get_exposure_status)
+                if status == ExpStatus.SUCCESS:
+                    break
+                if status != ExpStatus.WORKING:
+                    print(f"Snap failed: exposure status {status}")
+                    return None
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise asyncio.TimeoutError(f"Exposure did not finish within {timeout} s")
+                await asyncio.sleep(self.poll_s)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            await asyncio.shield(self._run(self.camera.stop_exposure))
+            raise
+
+        return await self._run(self.camera.get_data_after_exp)
+
+    async def frames(self, wait_ms: int = 500, max_frames: int = None):
+        """
+        Iterate video frames. Video mode is started on entry and stopped when
+        the iteration ends, breaks or is cancelled.
+
+        Args:
+            wait_ms: Per-frame timeout of cam_get_frame
+            max_frames: Stop after this many frames (None runs until broken)
+
+        Yields:
+            numpy arrays; frames that time out are skipped
+        """
+        if await self._run(self.camera.start_video) != 0:
+            print("Failed to start video")
+            return
+        count = 0
+        try:
+            while max_frames is None or count < max_frames:
+                frame = await self._run(self.camera.get_video_frame, wait_ms)
+                if frame is None:
+                    continue
+                count += 1
+                yield frame
+        finally:
+            await asyncio.shield(self._run(self.camera.stop_video))
+
+    def close(self):
+        """Shut the executor down once pending calls finish."""
+        self._executor.shutdown(wait=True)
+
+
+# ============== Usage Example ==============
+
+if __name__ == "__main__":
+    from asi_wrapper import ASICamera, ImgType
+    from dmd_wrapper import DMD
+
+    async def main():
+        camera = ASICamera()
+        if camera.init_camera(1920, 1080, img_type=ImgType.RAW8) != 0:
+            return
+        camera.set_exposure(10000)
+
+        dmd = AsyncDMD(DMD())
+        cam = AsyncCamera(camera)
+        if not await dmd.connect():
+            return
+
+        # Dark frame exposes while the first pattern is uploading
+        shown, dark = await asyncio.gather(dmd.display_cell(0, 0), cam.snap(is_dark=True, timeout=5.0))
+        print(f"Displayed: {shown}, dark frame: {None if dark is None else dark.shape}")
+
+        for cell in range(1, 4):
+            await dmd.display_cell(0, cell)
+            image = await cam.snap(timeout=5.0)
+            print(f"Cell {cell}: {None if image is None else image.shape}")
+
+        await dmd.clear_pattern()
+        dmd.close()
+        cam.close()
+        camera.stop_camera()
+
+    asyncio.run(main())
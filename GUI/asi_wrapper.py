@@ -1,10 +1,9 @@
-import ctypes
-from ctypes import c_int, c_long, c_ubyte, POINTER, byref
+import os
+from ctypes import c_int, c_long, c_ubyte, c_uint, POINTER, byref
 import numpy as np
-from PIL import Image
-from tkinter import filedialog
 from pathlib import Path
-import os
+from lazy_dll import LazyDLL
+from frame_pool import FramePool, FrameLease
 
 
 class ImgType:
@@ -23,111 +22,115 @@ class ExpStatus:
     FAILED = 3
 
 
+class CameraMode:
+    """ASI Camera Modes (trigger cameras only)"""
+    NORMAL = 0
+    TRIG_SOFT_EDGE = 1
+    TRIG_RISE_EDGE = 2
+    TRIG_FALL_EDGE = 3
+    TRIG_SOFT_LEVEL = 4
+    TRIG_HIGH_LEVEL = 5
+    TRIG_LOW_LEVEL = 6
+
+
+# asi_api.dll function prototypes (name -> (argtypes, restype)), bound on first use by LazyDLL
+CAMERA_PROTOTYPES = {
+    # Connection
+    'num_of_camera_connected': ([], c_int),
+    'cam_init_camera': ([POINTER(c_int), c_int, c_int, c_int, c_int], c_int),
+    'cam_stop_camera': ([c_int], c_int),
+
+    # Controls
+    'cam_set_pos': ([c_int, c_int, c_int], c_int),
+    'cam_get_pos': ([c_int, POINTER(c_int), POINTER(c_int)], c_int),
+    'cam_set_ROI': ([c_int, c_int, c_int, c_int, c_int], c_int),
+    'cam_get_ROI': ([c_int, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)], c_int),
+    'cam_set_exposure': ([c_int, c_long, c_int], c_int),
+    'cam_get_exposure': ([c_int, POINTER(c_long), POINTER(c_int)], c_int),
+    'cam_get_exposure_range': ([c_int, POINTER(c_long), POINTER(c_long)], c_int),
+    'cam_set_gain': ([c_int, c_long, c_int], c_int),
+    'cam_get_gain': ([c_int, POINTER(c_long), POINTER(c_int)], c_int),
+    'cam_get_gain_range': ([c_int, POINTER(c_long), POINTER(c_long)], c_int),
+    'cam_set_offset': ([c_int, c_long, c_int], c_int),
+    'cam_get_offset': ([c_int, POINTER(c_long), POINTER(c_int)], c_int),
+
+    # Video Mode
+    'cam_start_video': ([c_int], c_int),
+    'cam_stop_video': ([c_int], c_int),
+    'cam_get_frame': ([c_int, POINTER(c_ubyte), c_int, c_int], c_int),
+    'cam_get_dropped_frames': ([c_int, POINTER(c_int)], c_int),
+
+    # Capture Ring
+    'cam_ring_start': ([c_int, c_int], c_int),
+    'cam_ring_stop': ([c_int], c_int),
+    'cam_ring_latest': ([c_int, POINTER(c_ubyte), c_int, POINTER(c_uint)], c_int),
+    'cam_ring_read': ([c_int, POINTER(c_uint), POINTER(c_ubyte), c_int, c_int], c_int),
+    'cam_ring_stats': ([c_int, POINTER(c_int), POINTER(c_int)], c_int),
+
+    # Trigger Mode
+    'cam_is_trigger_cam': ([c_int, POINTER(c_int)], c_int),
+    'cam_set_camera_mode': ([c_int, c_int], c_int),
+    'cam_get_camera_mode': ([c_int, POINTER(c_int)], c_int),
+    'cam_send_soft_trigger': ([c_int, c_int], c_int),
+
+    # Snap Mode
+    'cam_start_exposure': ([c_int, c_int], c_int),
+    'cam_get_exposure_status': ([c_int, POINTER(c_int)], c_int),
+    'cam_stop_exposure': ([c_int], c_int),
+    'cam_get_data_after_exp': ([c_int, POINTER(c_ubyte), c_int], c_int),
+    'cam_snap': ([c_int, POINTER(c_ubyte), c_int, c_int, c_int], c_int),
+    'cam_get_dimension_range': ([c_int, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)], c_int),
+}
+
+
 class ASICamera:
     """Python wrapper for ASI Camera DLL"""
     
-    def __init__(self, dll_path: str = None):
+    def __init__(self, dll_path: str = None, backend: str = None):
         """
         Initialize the ASI camera wrapper.
         
         Args:
             dll_path: Path to the compiled asi_api.dll (defaults to bin/asi_api.dll)
+            backend: "dll" for the native library, or "sim" for the synthetic
+                     camera of sim_camera.py; defaults to the CAMERA_BACKEND
+                     environment variable, then "dll"
         """
-        if dll_path is None:
-            dll_path = Path(__file__).parent.parent / "bin" / "asi_api.dll"
+        backend = backend or os.environ.get("CAMERA_BACKEND", "dll")
+        if backend == "sim":
+            from sim_camera import SimulatedCameraLibrary
+            self.dll = SimulatedCameraLibrary()
+        elif backend == "dll":
+            if dll_path is None:
+                dll_path = Path(__file__).parent.parent / "bin" / "asi_api.dll"
+            # Loaded by the first call, prototypes bound as each function is first used
+            self.dll = LazyDLL(dll_path, CAMERA_PROTOTYPES)
         else:
-            dll_path = Path(dll_path)
-        
-        # Add the DLL directory to the search path so dependencies are found
-        dll_dir = dll_path.parent.resolve()
-        os.add_dll_directory(str(dll_dir))
-        
-        self.dll = ctypes.CDLL(str(dll_path.resolve()))
-        self._define_functions()
+            raise ValueError(f"Camera backend must be 'dll' or 'sim', got {backend!r}")
+        self.backend = backend
         
         self.camera_id: int | None = None
         self.roi_width: int = 0
         self.roi_height: int = 0
         self.roi_bin: int = 1
         self.img_type: int = ImgType.RAW8
-    
-    def _define_functions(self):
-        
-        # Connection
-        self.dll.num_of_camera_connected.argtypes = []
-        self.dll.num_of_camera_connected.restype = c_int
-        
-        self.dll.cam_init_camera.argtypes = [POINTER(c_int), c_int, c_int, c_int, c_int]
-        self.dll.cam_init_camera.restype = c_int
-        
-        self.dll.cam_stop_camera.argtypes = [c_int]
-        self.dll.cam_stop_camera.restype = c_int
-        
-        # Controls
-        self.dll.cam_set_pos.argtypes = [c_int, c_int, c_int]
-        self.dll.cam_set_pos.restype = c_int
-        
-        self.dll.cam_get_pos.argtypes = [c_int, POINTER(c_int), POINTER(c_int)]
-        self.dll.cam_get_pos.restype = c_int
-        
-        self.dll.cam_set_ROI.argtypes = [c_int, c_int, c_int, c_int, c_int]
-        self.dll.cam_set_ROI.restype = c_int
-        
-        self.dll.cam_get_ROI.argtypes = [c_int, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)]
-        self.dll.cam_get_ROI.restype = c_int
-        
-        self.dll.cam_set_exposure.argtypes = [c_int, c_long, c_int]
-        self.dll.cam_set_exposure.restype = c_int
-        
-        self.dll.cam_get_exposure.argtypes = [c_int, POINTER(c_long), POINTER(c_int)]
-        self.dll.cam_get_exposure.restype = c_int
-        
-        self.dll.cam_get_exposure_range.argtypes = [c_int, POINTER(c_long), POINTER(c_long)]
-        self.dll.cam_get_exposure_range.restype = c_int
-        
-        self.dll.cam_set_gain.argtypes = [c_int, c_long, c_int]
-        self.dll.cam_set_gain.restype = c_int
-        
-        self.dll.cam_get_gain.argtypes = [c_int, POINTER(c_long), POINTER(c_int)]
-        self.dll.cam_get_gain.restype = c_int
-        
-        self.dll.cam_get_gain_range.argtypes = [c_int, POINTER(c_long), POINTER(c_long)]
-        self.dll.cam_get_gain_range.restype = c_int
-        
-        self.dll.cam_set_offset.argtypes = [c_int, c_long, c_int]
-        self.dll.cam_set_offset.restype = c_int
-        
-        self.dll.cam_get_offset.argtypes = [c_int, POINTER(c_long), POINTER(c_int)]
-        self.dll.cam_get_offset.restype = c_int
-        
-        # Video Mode
-        self.dll.cam_start_video.argtypes = [c_int]
-        self.dll.cam_start_video.restype = c_int
-        
-        self.dll.cam_stop_video.argtypes = [c_int]
-        self.dll.cam_stop_video.restype = c_int
-        
-        self.dll.cam_get_frame.argtypes = [c_int, POINTER(c_ubyte), c_int, c_int]
-        self.dll.cam_get_frame.restype = c_int
-        
-        # Snap Mode
-        self.dll.cam_start_exposure.argtypes = [c_int, c_int]
-        self.dll.cam_start_exposure.restype = c_int
-        
-        self.dll.cam_get_exposure_status.argtypes = [c_int, POINTER(c_int)]
-        self.dll.cam_get_exposure_status.restype = c_int
-        
-        self.dll.cam_stop_exposure.argtypes = [c_int]
-        self.dll.cam_stop_exposure.restype = c_int
-        
-        self.dll.cam_get_data_after_exp.argtypes = [c_int, POINTER(c_ubyte), c_int]
-        self.dll.cam_get_data_after_exp.restype = c_int
-        
-        self.dll.cam_snap.argtypes = [c_int, POINTER(c_ubyte), c_int, c_int, c_int]
-        self.dll.cam_snap.restype = c_int
+        self._pool: FramePool | None = None
+        self._ring_slots: int | None = None  # Slots of the running capture ring
+        self._missing_exports = set()
 
-        self.dll.cam_get_dimension_range.argtypes = [c_int, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)]
-        self.dll.cam_get_dimension_range.restype = c_int
+    def _has_export(self, name: str, quiet: bool = False) -> bool:
+        """
+        Check that the library provides a function. An asi_api.dll built
+        before the capture ring lacks the functions added since, so their
+        methods fail with an error instead of raising AttributeError. The
+        error is printed once per function.
+        """
+        if hasattr(self.dll, name):
+            return True
+        if not quiet and name not in self._missing_exports:
+            self._missing_exports.add(name)
+            print(f"ERROR: {name} not found in asi_api.dll, rebuild it with api_build.bat")
+        return False
     
     # Connection Methods
     
@@ -187,6 +190,7 @@ class ASICamera:
         if result == 0:
             print("Camera stopped")
             self.camera_id = None
+            self._ring_slots = None
         return result
     
     @property
@@ -226,15 +230,20 @@ class ASICamera:
         return result, x.value, y.value
     
     def set_ROI(self, width: int, height: int, bin_val: int = 1, img_type: int = ImgType.RAW8) -> int:
-        """Set ROI format."""
+        """Set ROI format. A running capture ring is restarted at the new frame size."""
         if self.camera_id is None:
             return -1
+        ring_slots = self._ring_slots
+        if ring_slots:
+            self.stop_ring()
         result = self.dll.cam_set_ROI(self.camera_id, width, height, bin_val, img_type)
         if result == 0:
             self.roi_width = width
             self.roi_height = height
             self.roi_bin = bin_val
             self.img_type = img_type
+        if ring_slots:
+            self.start_ring(ring_slots)
         return result
     
     def get_ROI(self) -> tuple[int, int, int, int, int]:
@@ -364,17 +373,18 @@ class ASICamera:
         else:  # RAW8, Y8
             return pixels
     
-    def _buffer_to_array(self, buffer) -> np.ndarray:
-        """Convert buffer to numpy array."""
+    def frame_pool(self) -> FramePool:
+        """Buffer pool for the current ROI and image type, rebuilt when they change."""
         if self.img_type == ImgType.RAW16:
-            arr = np.frombuffer(buffer, dtype=np.uint16)
-            return arr.reshape((self.roi_height, self.roi_width))
+            shape, dtype = (self.roi_height, self.roi_width), np.uint16
         elif self.img_type == ImgType.RGB24:
-            arr = np.frombuffer(buffer, dtype=np.uint8)
-            return arr.reshape((self.roi_height, self.roi_width, 3))
+            shape, dtype = (self.roi_height, self.roi_width, 3), np.uint8
         else:  # RAW8, Y8
-            arr = np.frombuffer(buffer, dtype=np.uint8)
-            return arr.reshape((self.roi_height, self.roi_width))
+            shape, dtype = (self.roi_height, self.roi_width), np.uint8
+        pool = self._pool
+        if pool is None or pool.shape != shape or pool.dtype != dtype:
+            pool = self._pool = FramePool(self.get_buffer_size(), shape, dtype)
+        return pool
     
     # Video Mode Methods
     
@@ -385,9 +395,10 @@ class ASICamera:
         return self.dll.cam_start_video(self.camera_id)
     
     def stop_video(self) -> int:
-        """Stop video capture mode."""
+        """Stop video capture mode (and the capture ring, if running)."""
         if self.camera_id is None:
             return -1
+        self._ring_slots = None
         return self.dll.cam_stop_video(self.camera_id)
     
     def get_video_frame(self, wait_ms: int = 500) -> np.ndarray | None:
@@ -400,17 +411,189 @@ class ASICamera:
         Returns:
             numpy array or None on failure
         """
+        lease = self.get_video_frame_lease(wait_ms)
+        return lease.detach() if lease else None
+
+    def get_video_frame_lease(self, wait_ms: int = 500) -> FrameLease | None:
+        """
+        Get single frame from video mode into a pooled buffer. Release the
+        lease when done with lease.array; streaming this way allocates
+        nothing per frame.
+        
+        Args:
+            wait_ms: Timeout in milliseconds
+            
+        Returns:
+            FrameLease or None on failure
+        """
         if self.camera_id is None:
             return None
         
-        buffer_size = self.get_buffer_size()
-        buffer = (c_ubyte * buffer_size)()
-        
-        result = self.dll.cam_get_frame(self.camera_id, buffer, buffer_size, wait_ms)
+        pool = self.frame_pool()
+        lease = pool.acquire()
+        result = self.dll.cam_get_frame(self.camera_id, lease.pointer, pool.buffer_size, wait_ms)
         if result != 0:
+            lease.release()
             return None
+        return lease
+    
+    def get_dropped_frames(self) -> int:
+        """
+        Get the number of frames dropped since video capture started.
+        
+        Returns:
+            Dropped frame count, or -1 on error
+        """
+        if self.camera_id is None or not self._has_export('cam_get_dropped_frames'):
+            return -1
+        dropped = c_int()
+        if self.dll.cam_get_dropped_frames(self.camera_id, byref(dropped)) != 0:
+            return -1
+        return dropped.value
+    
+    # Capture Ring Methods
+
+    @property
+    def has_ring(self) -> bool:
+        """True if the library has the capture ring (start_ring and the ring reads)."""
+        return self._has_export('cam_ring_start', quiet=True)
+    
+    def start_ring(self, n_slots: int = 8) -> int:
+        """
+        Start video capture with a native capture thread keeping the newest
+        n_slots frames. Read them with get_latest_frame_lease / read_frame_lease
+        instead of get_video_frame until stop_ring.
         
-        return self._buffer_to_array(buffer)
+        Args:
+            n_slots: Frames held in the ring (at least 2)
+        """
+        if self.camera_id is None or not self._has_export('cam_ring_start'):
+            return -1
+        result = self.dll.cam_ring_start(self.camera_id, n_slots)
+        self._ring_slots = n_slots if result == 0 else None
+        return result
+    
+    @property
+    def is_ring_running(self) -> bool:
+        """True while the capture ring started by start_ring is running."""
+        return self._ring_slots is not None
+    
+    def stop_ring(self) -> int:
+        """Stop the capture thread and video capture."""
+        if self.camera_id is None:
+            return -1
+        self._ring_slots = None
+        if not self.has_ring:
+            return self.dll.cam_stop_video(self.camera_id)
+        return self.dll.cam_ring_stop(self.camera_id)
+    
+    def get_latest_frame_lease(self, since_seq: int = 0) -> tuple[FrameLease | None, int]:
+        """
+        Get the newest captured frame without waiting.
+        
+        Args:
+            since_seq: Sequence number of the last frame already seen (0 for none)
+            
+        Returns:
+            (lease, seq); lease is None if no frame newer than since_seq
+            has arrived (seq is then since_seq)
+        """
+        if self.camera_id is None or not self.has_ring:
+            return None, since_seq
+        
+        pool = self.frame_pool()
+        lease = pool.acquire()
+        seq = c_uint(since_seq)
+        result = self.dll.cam_ring_latest(self.camera_id, lease.pointer, pool.buffer_size, byref(seq))
+        if result != 0:
+            lease.release()
+            return None, since_seq
+        return lease, seq.value
+    
+    def read_frame_lease(self, seq: int, wait_ms: int = 500) -> tuple[FrameLease | None, int]:
+        """
+        Get frame number seq (starting at 1), waiting for it to be captured.
+        
+        Args:
+            seq: Sequence number wanted
+            wait_ms: Timeout in milliseconds (negative waits forever)
+            
+        Returns:
+            (lease, seq read); seq read is later than seq if that frame was
+            already overwritten, the difference being frames this reader lost.
+            lease is None on timeout or error
+        """
+        if self.camera_id is None or not self.has_ring:
+            return None, seq
+        
+        pool = self.frame_pool()
+        lease = pool.acquire()
+        got = c_uint(seq)
+        result = self.dll.cam_ring_read(self.camera_id, byref(got), lease.pointer, pool.buffer_size, wait_ms)
+        if result != 0:
+            lease.release()
+            return None, seq
+        return lease, got.value
+    
+    def get_ring_stats(self) -> tuple[int, int]:
+        """
+        Get capture ring counters since start_ring.
+        
+        Returns:
+            (frames dropped by the SDK, frames captured), or (-1, -1) on error
+        """
+        if self.camera_id is None or not self.has_ring:
+            return -1, -1
+        dropped, captured = c_int(), c_int()
+        if self.dll.cam_ring_stats(self.camera_id, byref(dropped), byref(captured)) != 0:
+            return -1, -1
+        return dropped.value, captured.value
+    
+    # Trigger Mode Methods
+    
+    def is_trigger_camera(self) -> bool:
+        """Check if the camera has a trigger port (required for CameraMode other than NORMAL)."""
+        if self.camera_id is None or not self._has_export('cam_is_trigger_cam'):
+            return False
+        is_trigger = c_int()
+        if self.dll.cam_is_trigger_cam(self.camera_id, byref(is_trigger)) != 0:
+            return False
+        return bool(is_trigger.value)
+    
+    def set_camera_mode(self, mode: int) -> int:
+        """
+        Set the camera mode. In the trigger modes video capture delivers one
+        frame per trigger through get_video_frame.
+        
+        Args:
+            mode: CameraMode value
+        """
+        if self.camera_id is None or not self._has_export('cam_set_camera_mode'):
+            return -1
+        return self.dll.cam_set_camera_mode(self.camera_id, mode)
+    
+    def get_camera_mode(self) -> int:
+        """
+        Get the current camera mode.
+        
+        Returns:
+            CameraMode value, or -1 on error
+        """
+        if self.camera_id is None or not self._has_export('cam_get_camera_mode'):
+            return -1
+        mode = c_int()
+        if self.dll.cam_get_camera_mode(self.camera_id, byref(mode)) != 0:
+            return -1
+        return mode.value
+    
+    def send_soft_trigger(self, start: bool = True) -> int:
+        """
+        Send a soft trigger. Edge modes only need start=True; level modes
+        expose from start=True until start=False.
+        """
+        if self.camera_id is None or not self._has_export('cam_send_soft_trigger'):
+            return -1
+        return self.dll.cam_send_soft_trigger(self.camera_id, 1 if start else 0)
     
     # Snap Mode Methods
     
@@ -425,22 +608,32 @@ class ASICamera:
         Returns:
             numpy array or None on failure
         """
+        lease = self.snap_lease(is_dark, timeout_ms)
+        return lease.detach() if lease else None
+
+    def snap_lease(self, is_dark: bool = False, timeout_ms: int = 30000) -> FrameLease | None:
+        """
+        Take a single snap image into a pooled buffer (see get_video_frame_lease).
+        
+        Returns:
+            FrameLease or None on failure
+        """
         if self.camera_id is None:
             print("Camera not initialized")
             return None
         
-        buffer_size = self.get_buffer_size()
-        buffer = (c_ubyte * buffer_size)()
-        
+        pool = self.frame_pool()
+        lease = pool.acquire()
         result = self.dll.cam_snap(
             self.camera_id,
-            buffer,
-            buffer_size,
+            lease.pointer,
+            pool.buffer_size,
             1 if is_dark else 0,
             timeout_ms
         )
         
         if result != 0:
+            lease.release()
             errors = {
                 -1: "Invalid buffer",
                 -2: "Failed to start exposure",
@@ -451,8 +644,7 @@ class ASICamera:
             }
             print(f"Snap failed: {errors.get(result, f'Unknown error {result}')}")
             return None
-        
-        return self._buffer_to_array(buffer)
+        return lease
     
     def start_exposure(self, is_dark: bool = False) -> int:
         """Start a long exposure (manual control)."""
@@ -483,17 +675,21 @@ class ASICamera:
     
     def get_data_after_exp(self) -> np.ndarray | None:
         """Get image data after successful exposure."""
+        lease = self.get_data_after_exp_lease()
+        return lease.detach() if lease else None
+
+    def get_data_after_exp_lease(self) -> FrameLease | None:
+        """Get image data after successful exposure into a pooled buffer."""
         if self.camera_id is None:
             return None
         
-        buffer_size = self.get_buffer_size()
-        buffer = (c_ubyte * buffer_size)()
-        
-        result = self.dll.cam_get_data_after_exp(self.camera_id, buffer, buffer_size)
+        pool = self.frame_pool()
+        lease = pool.acquire()
+        result = self.dll.cam_get_data_after_exp(self.camera_id, lease.pointer, pool.buffer_size)
         if result != 0:
+            lease.release()
             return None
-        
-        return self._buffer_to_array(buffer)
+        return lease
     
     # ============== Save Methods ==============
     
@@ -513,6 +709,8 @@ class ASICamera:
             return False
         
         if filepath is None:
+            # Imported here so headless users never load tkinter
+            from tkinter import filedialog
             filepath = filedialog.asksaveasfilename(
                 defaultextension=".png",
                 filetypes=[
@@ -529,6 +727,7 @@ class ASICamera:
             return False
         
         try:
+            from PIL import Image
             ext = Path(filepath).suffix.lower()
             
             if ext == ".fits":
@@ -548,6 +747,7 @@ class ASICamera:
     def _save_tiff_16bit(self, image: np.ndarray, filepath: str) -> bool:
         """Save 16-bit TIFF."""
         try:
+            from PIL import Image
             img = Image.fromarray(image, mode='I;16')
             img.save(filepath)
             print(f"Saved 16-bit TIFF: {filepath}")
@@ -1,7 +1,33 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 from PIL import Image
 
-def generate_bmp(row,column,grid_size=10,grid_line_thickness=2):
-    """Generate a BMP file with a grid pattern and a highlighted cell.
+CANVAS_W = 2048
+CANVAS_H = 1200
+SQUARE = 1200
+FILENAME = "row_pattern/current.bmp"
+
+
+def _grid_geometry(grid_size):
+    """Return (offset_x, offset_y, cell_size, N) for a square grid of grid_size + 1 cells."""
+    pad_x = (CANVAS_W - SQUARE) // 2
+
+    N = grid_size + 1  # square grid
+    cell_size = SQUARE // N  # auto-fit
+
+    grid_w = N * cell_size
+
+    offset_x = pad_x + (SQUARE - grid_w) // 2
+    offset_y = (SQUARE - grid_w) // 2
+    return offset_x, offset_y, cell_size, N
+
+
+def render_pattern(row, column, grid_size=10, grid_line_thickness=2) -> np.ndarray:
+    """Render the grid pattern as a (CANVAS_H, CANVAS_W) boolean array (True = white).
+
+    Every region is written as an array slice instead of pixel by pixel.
 
     Args:
         row: Row index of the cell to highlight (0-based)
@@ -9,48 +35,322 @@ def generate_bmp(row,column,grid_size=10,grid_line_thickness=2):
         grid_size: Number of cells along one side of the square grid
         grid_line_thickness: Thickness of the grid lines in pixels
     """
-    CANVAS_W = 2048
-    CANVAS_H = 1200
-    SQUARE = 1200
-    FILENAME = "row_pattern/current.bmp"
-
     pad_x = (CANVAS_W - SQUARE) // 2
+    offset_x, offset_y, cell_size, N = _grid_geometry(grid_size)
+    grid_w = N * cell_size
 
-    N = grid_size  + 1 # square grid
-    cell_size = SQUARE // N  # auto-fit
+    canvas = np.ones((CANVAS_H, CANVAS_W), dtype=bool)  # start white
 
-    grid_w = N * cell_size
-    grid_h = N * cell_size
+    # Black square
+    canvas[:, pad_x:pad_x + SQUARE] = False
 
-    offset_x = pad_x + (SQUARE - grid_w) // 2
-    offset_y = (SQUARE - grid_h) // 2
-
-    img = Image.new("1", (CANVAS_W, CANVAS_H), 1)  # start white
-    pixels = img.load()
-
-    for y in range(CANVAS_H):
-        for x in range(CANVAS_W):
-
-            # Black square
-            if pad_x <= x < pad_x + SQUARE:
-                pixels[x, y] = 0
-
-                if offset_x <= x < offset_x + grid_w and offset_y <= y < offset_y + grid_h:
-                    gx = (x - offset_x) // cell_size
-                    gy = (y - offset_y) // cell_size
-
-                    # White selected cell
-                    if gx == column and gy == row:
-                        pixels[x, y] = 1
-
-                    # Gridlines
-                    if (x - offset_x) % cell_size < grid_line_thickness:
-                        pixels[x, y] = 1
-                    if (y - offset_y) % cell_size < grid_line_thickness:
-                        pixels[x, y] = 1
-    
-    img.save(FILENAME, "BMP")
-    print(f"Saved BMP: {FILENAME}")
+    grid = canvas[offset_y:offset_y + grid_w, offset_x:offset_x + grid_w]
+
+    # White selected cell
+    if 0 <= row < N and 0 <= column < N:
+        grid[row * cell_size:(row + 1) * cell_size,
+             column * cell_size:(column + 1) * cell_size] = True
+
+    # Gridlines: the first grid_line_thickness pixels of every cell
+    for k in range(min(grid_line_thickness, cell_size)):
+        grid[k::cell_size, :] = True
+        grid[:, k::cell_size] = True
+
+    return canvas
+
+
+class PatternCache:
+    """Memory-bounded LRU cache of packed grid patterns.
+
+    One gridlines-only base is kept per (grid_size, thickness); each cell
+    pattern is derived from it by OR-ing the selected cell into a copy.
+    Cached arrays are read-only and shared between callers.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Memory budget for bases and cell patterns together
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, row, column, grid_size=10, grid_line_thickness=2) -> np.ndarray:
+        """Return the packed pattern for one cell, generating it on a miss."""
+        key = (grid_size, row, column, grid_line_thickness)
+        with self._lock:
+            pattern = self._lookup(key)
+            if pattern is not None:
+                self.hits += 1
+                return pattern
+            self.misses += 1
+
+        base = self.get_base(grid_size, grid_line_thickness)
+        pattern = _overlay_cell(base, row, column, grid_size)
+        with self._lock:
+            self._store(key, pattern)
+        return pattern
+
+    def get_base(self, grid_size=10, grid_line_thickness=2) -> np.ndarray:
+        """Return the packed gridlines-only pattern (no cell selected)."""
+        key = (grid_size, grid_line_thickness)
+        with self._lock:
+            base = self._lookup(key)
+        if base is None:
+            base = np.packbits(render_pattern(-1, -1, grid_size, grid_line_thickness), axis=1)
+            base.flags.writeable = False
+            with self._lock:
+                self._store(key, base)
+        return base
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current memory use."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """Drop every cached pattern (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _lookup(self, key):
+        pattern = self._entries.get(key)
+        if pattern is not None:
+            self._entries.move_to_end(key)
+        return pattern
+
+    def _store(self, key, pattern):
+        if key in self._entries:
+            return
+        self._entries[key] = pattern
+        self._bytes += pattern.nbytes
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.nbytes
+            self.evictions += 1
+
+
+def _overlay_cell(base, row, column, grid_size) -> np.ndarray:
+    """Return a read-only copy of a packed base with one cell turned white."""
+    offset_x, offset_y, cell_size, N = _grid_geometry(grid_size)
+    pattern = base.copy()
+    if 0 <= row < N and 0 <= column < N:
+        cols = np.zeros(CANVAS_W, dtype=bool)
+        x0 = offset_x + column * cell_size
+        cols[x0:x0 + cell_size] = True
+        y0 = offset_y + row * cell_size
+        pattern[y0:y0 + cell_size] |= np.packbits(cols)
+    pattern.flags.writeable = False
+    return pattern
+
+
+pattern_cache = PatternCache()
+
+
+def generate_pattern(row, column, grid_size=10, grid_line_thickness=2) -> np.ndarray:
+    """Generate the grid pattern as a packed 1-bit array for DMD.display_array.
+
+    Patterns are served from pattern_cache, so repeated cells cost a dict lookup.
+
+    Args:
+        row: Row index of the cell to highlight (0-based)
+        column: Column index of the cell to highlight (0-based)
+        grid_size: Number of cells along one side of the square grid
+        grid_line_thickness: Thickness of the grid lines in pixels
+
+    Returns:
+        Read-only uint8 array of shape (CANVAS_H, CANVAS_W // 8), MSB first, 1 = white
+    """
+    return pattern_cache.get(row, column, grid_size, grid_line_thickness)
+
+
+class Mask:
+    """Packed 1-bit DMD mask (1 = white) with boolean set operations.
+
+    Masks combine with | (union), & (intersection), - (difference),
+    ^ (symmetric difference) and ~ (inversion). Every operation runs on
+    64-bit words of the packed rows, so composing many cells costs the same
+    as a single-cell pattern. The result of any expression can be passed to
+    DMD.display_array through `.bits`.
+
+    Example:
+        mask = Mask.grid(20) | Mask.cells([(0, 0), (3, 5)], 20) - Mask.rect(0, 0, 1024, 600)
+    """
+
+    __slots__ = ('bits',)
+
+    SHAPE = (CANVAS_H, CANVAS_W // 8)
+
+    def __init__(self, bits: np.ndarray):
+        """
+        Args:
+            bits: Packed uint8 array of shape (CANVAS_H, CANVAS_W // 8), MSB first
+        """
+        bits = np.ascontiguousarray(bits, dtype=np.uint8)
+        if bits.shape != self.SHAPE:
+            raise ValueError(f"Mask must have shape {self.SHAPE}, got {bits.shape}")
+        self.bits = bits
+
+    # ============== Constructors ==============
+
+    @classmethod
+    def empty(cls) -> "Mask":
+        """All-black mask."""
+        return cls(np.zeros(cls.SHAPE, dtype=np.uint8))
+
+    @classmethod
+    def full(cls) -> "Mask":
+        """All-white mask."""
+        return cls(np.full(cls.SHAPE, 0xFF, dtype=np.uint8))
+
+    @classmethod
+    def rect(cls, x0, y0, x1, y1) -> "Mask":
+        """White rectangle covering pixels x0 <= x < x1, y0 <= y < y1 (clipped to the canvas)."""
+        cols = np.zeros(CANVAS_W, dtype=bool)
+        cols[max(x0, 0):max(x1, 0)] = True
+        bits = np.zeros(cls.SHAPE, dtype=np.uint8)
+        bits[max(y0, 0):max(y1, 0)] = np.packbits(cols)
+        return cls(bits)
+
+    @classmethod
+    def grid(cls, grid_size=10, grid_line_thickness=2) -> "Mask":
+        """Grid template with no cell selected (shared with pattern_cache)."""
+        return cls(pattern_cache.get_base(grid_size, grid_line_thickness))
+
+    @classmethod
+    def cells(cls, cells, grid_size=10) -> "Mask":
+        """
+        White mask of a set of grid cells (gridlines not included).
+
+        Args:
+            cells: Iterable of (row, col) pairs; cells outside the grid are ignored
+            grid_size: Number of cells along one side of the square grid
+        """
+        offset_x, offset_y, cell_size, N = _grid_geometry(grid_size)
+        selected = np.zeros((N, N), dtype=bool)
+        rc = np.array(list(cells), dtype=np.int64).reshape(-1, 2)
+        inside = (rc >= 0).all(axis=1) & (rc < N).all(axis=1)
+        selected[rc[inside, 0], rc[inside, 1]] = True
+        return cls._from_selection(selected, offset_x, offset_y, cell_size)
+
+    @classmethod
+    def cell_block(cls, row0, col0, row1, col1, grid_size=10) -> "Mask":
+        """White mask of the cells row0..row1 x col0..col1 (inclusive)."""
+        offset_x, offset_y, cell_size, N = _grid_geometry(grid_size)
+        selected = np.zeros((N, N), dtype=bool)
+        selected[max(row0, 0):max(row1 + 1, 0), max(col0, 0):max(col1 + 1, 0)] = True
+        return cls._from_selection(selected, offset_x, offset_y, cell_size)
+
+    @classmethod
+    def _from_selection(cls, selected, offset_x, offset_y, cell_size) -> "Mask":
+        """Expand an (N, N) cell selection to pixels, one packed row per grid row."""
+        N = selected.shape[0]
+        grid_w = N * cell_size
+        cols = np.zeros((N, CANVAS_W), dtype=bool)
+        cols[:, offset_x:offset_x + grid_w] = np.repeat(selected, cell_size, axis=1)
+        bits = np.zeros(cls.SHAPE, dtype=np.uint8)
+        bits[offset_y:offset_y + grid_w] = np.repeat(np.packbits(cols, axis=1), cell_size, axis=0)
+        return cls(bits)
+
+    # ============== Operations ==============
+
+    def _words(self) -> np.ndarray:
+        return self.bits.view(np.uint64)
+
+    @classmethod
+    def _from_words(cls, words) -> "Mask":
+        return cls(words.view(np.uint8))
+
+    def __or__(self, other: "Mask") -> "Mask":
+        return self._from_words(self._words() | other._words())
+
+    def __and__(self, other: "Mask") -> "Mask":
+        return self._from_words(self._words() & other._words())
+
+    def __xor__(self, other: "Mask") -> "Mask":
+        return self._from_words(self._words() ^ other._words())
+
+    def __sub__(self, other: "Mask") -> "Mask":
+        return self._from_words(self._words() & ~other._words())
+
+    def __invert__(self) -> "Mask":
+        return self._from_words(~self._words())
+
+    # ============== Queries ==============
+
+    def count(self) -> int:
+        """Number of white pixels."""
+        return int(np.unpackbits(self.bits).sum(dtype=np.int64))
+
+    def to_bool(self) -> np.ndarray:
+        """Unpacked (CANVAS_H, CANVAS_W) boolean array."""
+        return np.unpackbits(self.bits, axis=1).astype(bool)
+
+
+def generate_grid_batch(grid_size=10, grid_line_thickness=2) -> np.ndarray:
+    """Generate every single-cell pattern of a grid as one packed array.
+
+    Cell (row, col) is at index row * (grid_size + 1) + col. The base grid is
+    rendered once and each row of cells is lit with one broadcast OR, so the
+    cost no longer scales with Python calls per pattern. Memory is
+    (grid_size + 1)**2 * 300 KB (about 800 MB at grid 50).
+
+    Args:
+        grid_size: Number of cells along one side of the square grid
+        grid_line_thickness: Thickness of the grid lines in pixels
+
+    Returns:
+        Contiguous uint8 array of shape ((grid_size + 1)**2, CANVAS_H, CANVAS_W // 8)
+    """
+    offset_x, offset_y, cell_size, N = _grid_geometry(grid_size)
+    base = np.packbits(render_pattern(-1, -1, grid_size, grid_line_thickness), axis=1)
+
+    batch = np.empty((N * N,) + base.shape, dtype=np.uint8)
+    batch[:] = base
+
+    # Packed column mask of every cell column: (N, CANVAS_W // 8)
+    x = np.arange(CANVAS_W)
+    col_of_x = np.where(x >= offset_x, (x - offset_x) // cell_size, -1)
+    col_masks = np.packbits(col_of_x[None, :] == np.arange(N)[:, None], axis=1)
+
+    cells = batch.reshape(N, N, *base.shape)
+    for row in range(N):
+        y0 = offset_y + row * cell_size
+        cells[row, :, y0:y0 + cell_size, :] |= col_masks[:, None, :]
+    return batch
+
+
+def generate_bmp(row, column, grid_size=10, grid_line_thickness=2, filename=FILENAME):
+    """Generate a BMP file with a grid pattern and a highlighted cell.
+
+    Args:
+        row: Row index of the cell to highlight (0-based)
+        column: Column index of the cell to highlight (0-based)
+        grid_size: Number of cells along one side of the square grid
+        grid_line_thickness: Thickness of the grid lines in pixels
+        filename: Output path of the 1-bit BMP
+    """
+    bits = generate_pattern(row, column, grid_size, grid_line_thickness)
+
+    # Mode "1" raw data is MSB-first packed rows, exactly what packbits produces
+    img = Image.frombytes("1", (CANVAS_W, CANVAS_H), bits.tobytes())
+
+    img.save(filename, "BMP")
+    print(f"Saved BMP: {filename}")
 
 if __name__ == "__main__":
     generate_bmp(
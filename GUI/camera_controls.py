@@ -1,14 +1,15 @@
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import filedialog
-import threading
+from recorder import Recorder
 
 class CameraControls(tk.Frame):
-    def __init__(self, parent, camera=None, video_panel=None, *args, **kwargs):
+    def __init__(self, parent, camera=None, video_panel=None, status_panel=None, *args, **kwargs):
         super().__init__(parent, borderwidth=2, relief="groove", *args, **kwargs)
         
         self.camera = camera
         self.video_panel = video_panel
+        self.recorder = None
         
         self.label = tk.Label(self, text="Camera Controls", font=("Arial", 10, "bold"))
         self.label.pack(anchor="sw", padx=5, pady=5)
@@ -20,125 +21,37 @@ class CameraControls(tk.Frame):
         self.create_gain_section()
         self.create_snapshot_save_section()
         
-        self.status_panel_ref = None
-        self._health_check_id = None
-        self._was_connected = False
+        self.status_panel_ref = status_panel
     
 # ============== Connection/Status ==============
 
-    def auto_connect(self, status_panel=None):
-        """Automatically connect to camera on startup."""
-        self.status_panel_ref = status_panel
-        threading.Thread(target=self._auto_connect_helper, daemon=True).start()
-        return None
-
-    def _auto_connect_helper(self):
-        '''Helper function to automatically connect to camera on startup'''
-        if not self.camera:
-            return
-
-        # Get number of connected cameras
-        num_cams = 0
-        try:
-            num_cams = self.camera.get_num_cameras()
-        except Exception as e:
-            print(f"Error checking cameras: {e}")
-
-        if num_cams == 0:
-            self.after(0, lambda: self._update_camera_status("No cameras detected", False))
-            self.after(0, self._start_health_check)
-            return
-
-        # Get ROI from input fields
+    def connect_camera(self) -> bool:
+        """
+        Initialise the camera with the ROI from the input fields. Blocking;
+        called by the DeviceMonitor on its reconnect thread.
+        """
+        if not self.camera or self.camera.get_num_cameras() == 0:
+            return False
         try:
             width = int(self.roi_width_var.get())
             height = int(self.roi_height_var.get())
         except (ValueError, AttributeError):
             width, height = 1080, 1080
-
-        result = -1
-        try:
-            result = self.camera.init_camera(width, height)
-        except Exception as e:
-            print(f"Camera init error: {e}")
-
-        if result == 0:
-            def on_connected():
-                # Call helper function to
-                self._update_camera_status("Connected", True)
-                self._was_connected = True
-                self._update_control_ranges()
-                # Start video stream
-                if self.video_panel:
-                    self.video_panel.start_stream()
-                self._start_health_check()
-
-            self.after(0, on_connected)
-        else:
-            self.after(0, lambda: self._update_camera_status(f"Connection failed: {result}", False))
-            self.after(0, self._start_health_check)
-
-    def _start_health_check(self, interval_ms: int = 2000):
-        """Start periodic camera health check"""
-        if self._health_check_id:
-            self.after_cancel(self._health_check_id)
-        self._check_camera_health()
-    
-    def _check_camera_health(self):
-        """Check if camera is still connected"""
-        if not self.camera:
-            self._health_check_id = self.after(2000, self._check_camera_health)
-            return
-        
-        num_cams = self.camera.get_num_cameras()
-        is_connected = num_cams > 0 and self.camera.is_connected
-        
-        # Detect disconnect
-        if self._was_connected and not is_connected:
-        # if not is_connected:
-            self._was_connected = False
-            self._update_camera_status("Disconnected", False)
-            if self.video_panel:
-                self.video_panel.stop_stream()
-        
-        # Detect reconnect
-        elif not self._was_connected and num_cams > 0:
-        # elif num_cams > 0:
-            self._update_camera_status("Reconnecting...", False)
-
-            def reconnect_helper():
-                try:
-                    try:
-                        width = int(self.roi_width_var.get())
-                        height = int(self.roi_height_var.get())
-                    except (ValueError, AttributeError):
-                        width, height = 1080, 1080
-
-                    result = self.camera.init_camera(width, height)
-                except Exception as e:
-                    print(f"Reconnect init error: {e}")
-                    self.after(0, lambda: self._update_camera_status("Reconnecting failed", False))
-                    return
-
-                if result == 0:
-                    def on_reconnected():
-                        self._was_connected = True
-                        self._update_camera_status("Connected", True)
-                        self._update_control_ranges()
-                        if self.video_panel and self.mode_var.get() == "Video":
-                            self.video_panel.start_stream()
-
-                    self.after(0, on_reconnected)
-
-            threading.Thread(target=reconnect_helper, daemon=True).start()
-        
-        self._health_check_id = self.after(2000, self._check_camera_health)
-    
-    def stop_health_check(self):
-        """Stop the periodic health check."""
-        if self._health_check_id:
-            self.after_cancel(self._health_check_id)
-            self._health_check_id = None
+        return self.camera.init_camera(width, height) == 0
+
+    def probe_camera(self) -> bool:
+        """Cheap liveness check for the DeviceMonitor."""
+        return self.camera.get_num_cameras() > 0 and self.camera.is_connected
+
+    def on_connection_change(self, connected: bool, message: str):
+        """Apply a camera state change published by the DeviceMonitor (Tk thread)."""
+        self._update_camera_status(message, connected)
+        if connected:
+            self._update_control_ranges()
+            if self.video_panel and self.mode_var.get() == "Video":
+                self.video_panel.start_stream()
+        elif self.video_panel:
+            self.video_panel.stop_stream()
     
     def _update_camera_status(self, message: str, connected: bool):
         """Update camera status in status panel."""
@@ -165,15 +78,21 @@ class CameraControls(tk.Frame):
 
         # Create save button as part of the same frame (initially hidden)
         self.create_snapshot_save_section(parent=mode_frame)
+        self.create_record_section(parent=mode_frame)
 
     def on_mode_select(self):
         """Handle video/snapshot mode change."""
         mode = self.mode_var.get()
         
         if mode == "Snapshot":
+            # A snapshot stops video capture, which would end a recording anyway
+            if self.recorder and self.recorder.is_recording:
+                self.recorder.stop(wait=False)
+            self.record_btn.pack_forget()
             self.save_btn.pack(anchor="sw", padx=3, pady=3)
         else:
             self.save_btn.pack_forget()
+            self.record_btn.pack(side="left", padx=(10, 0))
             # Start video stream if connected
             if self.camera and self.camera.is_connected and self.video_panel:
                 self.video_panel.start_stream()
@@ -216,6 +135,65 @@ class CameraControls(tk.Frame):
             self.camera.save_image(image, filename)
             messagebox.showinfo("Save Snapshot", f"Snapshot saved to {filename}")
 
+# ============== Recording ==============
+
+    def create_record_section(self, parent=None):
+        '''Create record button and recording stats label'''
+        parent = parent or self
+        self.record_btn = tk.Button(parent, text="Record",
+                                    command=self.on_record,
+                                    bg="red",
+                                    fg="white",
+                                    font=("Arial", 9))
+        # Shown in Video mode, the default
+        self.record_btn.pack(side="left", padx=(10, 0))
+
+        self.record_stats_label = tk.Label(self, text="", font=("Arial", 8), fg="gray")
+        self.record_stats_label.pack(anchor="w", padx=6, pady=(0, 3))
+
+    def on_record(self):
+        """Start recording the live stream to a raw file, or stop the running recording."""
+        if self.recorder and self.recorder.is_recording:
+            # Queued frames are still written; _poll_recording notices when done
+            self.recorder.stop(wait=False)
+            self.record_btn.config(text="Stopping...", state="disabled")
+            return
+
+        if not self.camera or not self.camera.is_connected:
+            messagebox.showerror("Error", "Camera not connected")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".raw",
+            initialfile="recording.raw",
+            filetypes=[("Raw Video", "*.raw"), ("All Files", "*.*")]
+        )
+        if not filename:
+            return
+
+        self.recorder = Recorder(self.camera, filename)
+        if not self.recorder.start():
+            messagebox.showerror("Error", "Failed to start recording")
+            return
+        self.record_btn.config(text="Stop Recording")
+        self._poll_recording()
+
+    def _poll_recording(self):
+        """Show recording progress until the recorder has closed its files."""
+        stats = self.recorder.stats()
+        dropped = stats['ring_dropped'] + stats['queue_dropped'] + stats['sdk_dropped']
+        text = f"{stats['frames']} frames, {stats['mb_per_s']:.0f} MB/s, {dropped} dropped"
+
+        if self.recorder.is_recording:
+            self.record_stats_label.config(text=f"Recording: {text}")
+            self.after(500, self._poll_recording)
+            return
+
+        self.record_btn.config(text="Record", state="normal")
+        self.record_stats_label.config(text=f"Saved {self.recorder.path.name}: {text}")
+        if stats['error']:
+            messagebox.showwarning("Recording", f"Recording stopped: {stats['error']}")
+
 # ============== ROI/Position ==============
 
     def create_roi_section(self):
@@ -279,6 +257,9 @@ class CameraControls(tk.Frame):
         if not self.camera or not self.camera.is_connected:
             messagebox.showerror("Error", "Camera not connected")
             return
+        if self.recorder and self.recorder.is_recording:
+            messagebox.showerror("Error", "Stop the recording before changing the ROI")
+            return
         
         try:
             width = int(self.roi_width_var.get())
@@ -0,0 +1,168 @@
+"""
+device_monitor.py
+One background thread watching DMD and camera health
+
+While a device is up it is probed every interval with a cheap liveness check
+(dmd_is_connected only enumerates USB, num_of_camera_connected asks the ASI
+SDK). While it is down, reconnects are retried with exponential backoff.
+Each device has its own single-thread executor for reconnects and the
+monitor never submits a new attempt while one is pending, so a blocking
+init can delay the next retry but never stack threads behind it. State
+changes are published through a single callback.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Device:
+    """Monitor bookkeeping for one device"""
+
+    def __init__(self, name, probe, connect, on_lost):
+        self.name = name
+        self.probe = probe
+        self.connect = connect
+        self.on_lost = on_lost
+        self.connected = False
+        self.pending = None         # Future of the reconnect in flight
+        self.next_check = 0.0       # time.monotonic() of the next probe or attempt
+        self.backoff = 0.0
+        self.published = None       # Last (connected, message) sent to on_change
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"monitor-{name}")
+
+
+class DeviceMonitor:
+    """Probe devices from one thread and reconnect them with backoff"""
+
+    def __init__(self, on_change, interval_s: float = 2.0,
+                 min_backoff_s: float = 1.0, max_backoff_s: float = 30.0):
+        """
+        Args:
+            on_change: Called as on_change(name, connected, message) from the
+                       monitor thread whenever a device's state changes;
+                       Tk users should hand it over with after(0, ...)
+            interval_s: Seconds between probes of a connected device
+            min_backoff_s: First reconnect delay after a failure or loss
+            max_backoff_s: Reconnect delay cap
+        """
+        self.on_change = on_change
+        self.interval_s = interval_s
+        self.min_backoff_s = min_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._devices: dict[str, _Device] = {}
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def add_device(self, name: str, probe, connect, on_lost=None):
+        """
+        Register a device; it starts disconnected and is connected on the
+        first pass of the monitor.
+
+        Args:
+            name: Key passed to on_change, e.g. "dmd" or "camera"
+            probe: Callable returning True while the device is alive. Runs on
+                   the monitor thread, so it must not block or use a handle
+                   owned by another thread.
+            connect: Blocking callable returning True once connected. Runs
+                     on the device's reconnect executor.
+            on_lost: Optional callable run on the reconnect executor when a
+                     connected device stops answering the probe, to release
+                     its handles before the next connect
+        """
+        self._devices[name] = _Device(name, probe, connect, on_lost)
+        self._wake.set()
+
+    def is_connected(self, name: str) -> bool:
+        """Last known state of a device."""
+        device = self._devices.get(name)
+        return device is not None and device.connected
+
+    def start(self):
+        """Start the monitor thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="DeviceMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """
+        Stop the monitor thread. A reconnect already running is left to finish.
+
+        Args:
+            timeout: Seconds to wait for the monitor thread
+        """
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        for device in self._devices.values():
+            device.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ============== Monitor Thread ==============
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            for device in list(self._devices.values()):
+                if device.next_check <= now:
+                    self._check(device, now)
+            due = [d.next_check for d in self._devices.values() if d.pending is None]
+            timeout = max(0.0, min(due) - time.monotonic()) if due else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def _check(self, device: _Device, now: float):
+        if device.pending is not None:
+            if device.pending.done():
+                self._finish_reconnect(device, now)
+            return
+
+        if device.connected:
+            try:
+                alive = device.probe()
+            except Exception as e:
+                print(f"{device.name} probe error: {e}")
+                alive = False
+            if alive:
+                device.next_check = now + self.interval_s
+                return
+            device.connected = False
+            device.backoff = self.min_backoff_s
+            device.next_check = now + device.backoff
+            self._publish(device, False, "Disconnected")
+            if device.on_lost:
+                device.executor.submit(device.on_lost)
+            return
+
+        device.pending = device.executor.submit(device.connect)
+        device.pending.add_done_callback(lambda f: self._wake.set())
+
+    def _finish_reconnect(self, device: _Device, now: float):
+        future, device.pending = device.pending, None
+        try:
+            connected = bool(future.result())
+        except Exception as e:
+            print(f"{device.name} connect error: {e}")
+            connected = False
+
+        if connected:
+            device.connected = True
+            device.backoff = 0.0
+            device.next_check = now + self.interval_s
+            self._publish(device, True, "Connected")
+            return
+        device.backoff = min(max(device.backoff * 2, self.min_backoff_s), self.max_backoff_s)
+        device.next_check = now + device.backoff
+        self._publish(device, False, "Not found, retrying")
+
+    def _publish(self, device: _Device, connected: bool, message: str):
+        if device.published == (connected, message):
+            return
+        device.published = (connected, message)
+        try:
+            self.on_change(device.name, connected, message)
+        except Exception as e:
+            print(f"Device state callback error: {e}")
@@ -1,13 +1,14 @@
 import tkinter as tk
 from tkinter import messagebox
 from pathlib import Path
-import threading
-from bmp_generator import generate_bmp 
+from dmd_worker import DMDWorker
 
 class DMDControls(tk.Frame):
     def __init__(self, parent, dmd=None, status_panel=None, *args, **kwargs):
         super().__init__(parent, borderwidth=2, relief="groove", *args, **kwargs)
         self.dmd = dmd
+        # All DMD calls go through this worker so only one thread touches the device
+        self.worker = DMDWorker(dmd) if dmd else None
         
         self.label = tk.Label(self, text="DMD Controls", font=("Arial", 10, "bold"))
         self.label.pack(anchor="sw", padx=3, pady=3)
@@ -57,114 +58,43 @@ class DMDControls(tk.Frame):
         stop_btn.pack(anchor="sw", padx=3, pady=3)
         
         self.status_panel = status_panel
-        self._health_check_id = None
-        self._was_connected = False
 
+    def _when_done(self, future, callback):
+        """Run callback(future) on the Tk thread once the worker finishes it."""
+        future.add_done_callback(lambda f: self.after(0, lambda: callback(f)))
 
-# ============== Connection/Status ==============
-
-    def auto_connect(self):
-        """Auto-connect to DMD on startup"""
-        if not self.dmd:
-            return
-        threading.Thread(target=self._auto_connect_helper, daemon=True).start()
-
-    def _auto_connect_helper(self):
-        try:
-            connect = self.dmd.connect()
-        except Exception as e:
-            self.after(0, lambda: self.status_panel.set_dmd_status(f"Error: {e}", False))
-            return
-        if connect:
-            def on_connected():
-                self._was_connected = True
-                if self.status_panel:
-                    self.status_panel.set_dmd_status("Connected", True)
-                self._update_power_mode_display()
-
-            self.after(0, on_connected)
-        else:
-            self.after(0, lambda: self.status_panel.set_dmd_status("Connection failed", False))
-    
 
-    def start_health_check(self):
-        """Start periodic health check for DMD connection."""
-        self._check_dmd_health()
-    
-    def stop_health_check(self):
-        """Stop the periodic health check."""
-        if self._health_check_id:
-            self.after_cancel(self._health_check_id)
-            self._health_check_id = None
-    
-    def _check_dmd_health(self):
-        """Check if camera is still connected.
-            Currently bugged"""
-        if not self.dmd:
-            self._health_check_id = self.after(2000, self._check_dmd_health)
-            return
+# ============== Connection/Status ==============
 
-        try:
-            is_connected = getattr(self.dmd, 'connected', getattr(self.dmd, '_connected', False))
-
-            # Detect disconnect (only act on transition)
-            if self._was_connected and not is_connected:
-                self._was_connected = False
-                try:
-                    # perform full cleanup via on_disconnect
-                    self.on_disconnect()
-                except Exception:
-                    if self.status_panel:
-                        self.status_panel.set_dmd_status("Disconnected", False)
-
-            elif not self._was_connected and is_connected:
-                self._was_connected = True
-                if self.status_panel:
-                    self.status_panel.set_dmd_status("Connected", True)
-                self._update_power_mode_display()
-
-            # If not connected, attempt reconnect in background (similar to camera logic)
-            elif not self._was_connected and not is_connected:
-                def reconnect_helper():
-                    try:
-                        connect = self.dmd.connect()
-                    except Exception as e:
-                        print(f"DMD reconnect error: {e}")
-                        self.after(0, lambda: self.status_panel.set_dmd_status("Reconnecting failed", False) if self.status_panel else None)
-                        return
-
-                    if connect:
-                        def on_reconnected():
-                            self._was_connected = True
-                            if self.status_panel:
-                                self.status_panel.set_dmd_status("Connected", True)
-                            self._update_power_mode_display()
-
-                        self.after(0, on_reconnected)
-
-                threading.Thread(target=reconnect_helper, daemon=True).start()
+    def connect_dmd(self) -> bool:
+        """
+        Connect on the worker and wait for the result. Blocking; called by
+        the DeviceMonitor on its reconnect thread.
+        """
+        return bool(self.dmd and self.worker.call("connect").result())
 
-        except Exception as e:
-            print(f"DMD health check error: {e}")
-            try:
-                self._was_connected = False
-            except Exception:
-                pass
-            try:
-                self.on_disconnect()
-            except Exception:
-                if self.status_panel:
-                    self.status_panel.set_dmd_status("Error", False)
+    def release_dmd(self):
+        """Close the stale USB handle on the worker after the DMD was unplugged."""
+        self.worker.call("disconnect").result()
 
-        # Schedule next check in 2 seconds
-        self._health_check_id = self.after(2000, self._check_dmd_health)
+    def on_connection_change(self, connected: bool, message: str):
+        """Apply a DMD state change published by the DeviceMonitor (Tk thread)."""
+        if self.status_panel:
+            self.status_panel.set_dmd_status(message, connected)
+        if connected:
+            self._update_power_mode_display()
 
     def _update_power_mode_display(self):
         """Update the radio buttons to reflect current DMD power mode."""
         if not self.dmd or not self.dmd.connected:
             return
+        self._when_done(self.worker.call("get_power_mode"), self._on_power_mode)
+
+    def _on_power_mode(self, future):
+        if future.cancelled():
+            return
         try:
-            mode = self.dmd.get_power_mode()
+            mode = future.result()
             if mode == 0:
                 self.mode_var.set("Normal")
                 print("_update_power_mode_display: Normal mode")
@@ -206,22 +136,21 @@ class DMDControls(tk.Frame):
             return
 
         requested_mode = self.mode_var.get()
-        try:
-            if requested_mode == "Normal":
-                if self.dmd.set_normal():
-                    print("on_mode_select(): DMD set to Normal mode")
-                else:
-                    messagebox.showerror("Error", "Failed to set Normal mode")
-            elif requested_mode == "Standby":
-                if self.dmd.set_standby():
-                    print("on_mode_select(): DMD set to Standby mode")
-                else:
-                    messagebox.showerror("Error", "Failed to set Standby mode")
+        method = "set_normal" if requested_mode == "Normal" else "set_standby"
 
+        def on_done(future):
+            if future.cancelled():
+                return
+            try:
+                if future.result():
+                    print(f"on_mode_select(): DMD set to {requested_mode} mode")
+                else:
+                    messagebox.showerror("Error", f"Failed to set {requested_mode} mode")
+            except Exception as e:
+                messagebox.showerror("Error", f"Power mode change failed: {e}")
             self.after(100, self._update_power_mode_display)
-        except Exception as e:
-            messagebox.showerror("Error", f"Power mode change failed: {e}")
-            self.after(100, self._update_power_mode_display)
+
+        self._when_done(self.worker.call(method), on_done)
  
 # ============== Pattern Selection ==============
 
@@ -261,44 +190,22 @@ class DMDControls(tk.Frame):
         if not (0 <= row <= grid and 0 <= col <= grid):
             return
 
-        # Press and disable the button while work is running
-        self.display_btn.config(state="disabled", relief="sunken")
-
-        threading.Thread(target=lambda: self._generate_and_schedule_display(row, col, grid), daemon=True).start()
-
-    def _generate_and_schedule_display(self, row, col, grid):
-        """Generate BMP in background and schedule UI display/restoration."""
-        try:
-            generate_bmp(row, col, grid)
-        except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Error", f"BMP generation failed: {e}"))
-            self.after(0, lambda: self.display_btn.config(state="normal", relief="raised"))
-            return
-
-        image_path = Path(__file__).parent.parent / "row_pattern" / "current.bmp"
-        if not image_path.exists():
-            self.after(0, lambda: messagebox.showerror("Error", f"BMP file could not be generated"))
-            self.after(0, lambda: self.display_btn.config(state="normal", relief="raised"))
+        if not self.dmd or not self.dmd.connected:
+            messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
             return
 
-        # Schedule the display and UI restore on the main thread
-        self.after(0, lambda: self._display_bmp(image_path))
-
-    def _display_bmp(self, image_path: Path):
-        """Display BMP on the DMD"""
-        if self.dmd and self.dmd.connected:
-            try:
-                self.dmd.display_bmp(str(image_path))
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to display {image_path}: {e}")
-        else:
-            messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
+        # Latest wins: a newer click cancels this one if it has not started yet
+        self._when_done(self.worker.display_cell(row, col, grid), self._on_display_done)
 
-        # Restore button state
+    def _on_display_done(self, future):
+        """Report the result of a display request finished on the worker."""
+        if future.cancelled():
+            return
         try:
-            self.display_btn.config(state="normal", relief="raised")
-        except Exception:
-            pass
+            if not future.result():
+                messagebox.showerror("Error", "Failed to display pattern")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to display pattern: {e}")
 
     # 10x10 button grid for pattern selection. Did not continue since it lags the program
     def create_button_grid(self, rows=10, cols=10):
@@ -334,13 +241,33 @@ class DMDControls(tk.Frame):
                 return
 
             if self.dmd and self.dmd.connected:
-                try:
-                    self.dmd.display_bmp(str(image_path))
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to display {image_path}: {e}")
+                self._run_command("display_bmp", None, f"Failed to display {image_path}", str(image_path))
             else:
                 messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
 
+    def _run_command(self, method, success_message, error_message, *args):
+        """
+        Run a DMD method on the worker and report the outcome on the Tk thread.
+
+        Args:
+            method: DMD method name
+            success_message: Printed when the method returns True (None for silent)
+            error_message: Shown in an error box when it returns False or raises
+        """
+        def on_done(future):
+            if future.cancelled():
+                return
+            try:
+                if future.result():
+                    if success_message:
+                        print(success_message)
+                else:
+                    messagebox.showerror("Error", error_message)
+            except Exception as e:
+                messagebox.showerror("Error", f"{error_message}: {e}")
+
+        self._when_done(self.worker.call(method, *args), on_done)
+
     def stop_pattern(self):
         """Stop any currently displayed pattern on the DMD"""
         # If create_button_grid and on_button_select are used,
@@ -350,10 +277,7 @@ class DMDControls(tk.Frame):
         #     self.selected_button = None
         
         if self.dmd and self.dmd.connected:
-            if self.dmd.clear_pattern():
-                print("Pattern stopped")
-            else:
-                messagebox.showerror("Error", "Failed to stop pattern")
+            self._run_command("clear_pattern", "Pattern stopped", "Failed to stop pattern")
         else:
             messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
     
@@ -363,39 +287,18 @@ class DMDControls(tk.Frame):
         if not self.dmd or not self.dmd.connected:
             messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
             return
-        
-        try:
-            if self.dmd.show_test_pattern():
-                print("Checkerboard pattern displayed")
-            else:
-                messagebox.showerror("Error", "Failed to display test pattern")
-        except Exception as e:
-            messagebox.showerror("Error", f"Test pattern failed: {e}")
+        self._run_command("show_test_pattern", "Checkerboard pattern displayed", "Failed to display test pattern")
     
     def show_white(self):
         """Display white test pattern on DMD."""
         if not self.dmd or not self.dmd.connected:
             messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
             return
-        
-        try:
-            if self.dmd.load_white():
-                print("White pattern displayed")
-            else:
-                messagebox.showerror("Error", "Failed to display white pattern")
-        except Exception as e:
-            messagebox.showerror("Error", f"White pattern failed: {e}")
+        self._run_command("load_white", "White pattern displayed", "Failed to display white pattern")
     
     def show_black(self):
         """Display black test pattern on DMD."""
         if not self.dmd or not self.dmd.connected:
             messagebox.showwarning("DMD Not Connected", "Please connect to DMD first.")
             return
-        
-        try:
-            if self.dmd.load_black():
-                print("Black pattern displayed")
-            else:
-                messagebox.showerror("Error", "Failed to display black pattern")
-        except Exception as e:
-            messagebox.showerror("Error", f"Black pattern failed: {e}")
+        self._run_command("load_black", "Black pattern displayed", "Failed to display black pattern")
@@ -0,0 +1,125 @@
+"""
+dmd_worker.py
+Single worker thread that owns the DMD wrapper
+
+Every DMD call goes through one queue so the HID handle is only ever used
+from one thread. Display requests are latest-wins: a display still waiting
+in the queue is cancelled when a newer one arrives, so rapid row/col entry
+never leaves stale uploads behind the one the user actually wants.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from bmp_generator import generate_pattern
+
+
+class DMDWorker:
+    """Run DMD commands on a dedicated thread and hand back futures"""
+
+    def __init__(self, dmd):
+        """
+        Start the worker thread.
+
+        Args:
+            dmd: DMD instance; only this worker should call it afterwards
+        """
+        self.dmd = dmd
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = True
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._run, name="DMDWorker", daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self) -> bool:
+        """Connection status of the owned DMD."""
+        return self.dmd.connected
+
+    # ============== Submitting ==============
+
+    def call(self, method: str, *args, **kwargs) -> Future:
+        """
+        Queue a DMD method call.
+
+        Args:
+            method: Name of the DMD method, e.g. "connect" or "clear_pattern"
+
+        Returns:
+            Future resolving to the method's return value
+        """
+        func = getattr(self.dmd, method)
+        return self._submit(lambda: func(*args, **kwargs), display=False)
+
+    def display(self, pattern) -> Future:
+        """
+        Queue a latest-wins display of an in-memory pattern.
+
+        Args:
+            pattern: Array accepted by DMD.display_array
+
+        Returns:
+            Future resolving to True/False, cancelled if superseded
+        """
+        return self._submit(lambda: self.dmd.display_array(pattern), display=True)
+
+    def display_cell(self, row: int, column: int, grid_size: int = 10) -> Future:
+        """
+        Queue a latest-wins display of a grid cell pattern. The pattern is
+        generated on the worker, so superseded requests cost nothing.
+
+        Returns:
+            Future resolving to True/False, cancelled if superseded
+        """
+        def job():
+            return self.dmd.display_array(generate_pattern(row, column, grid_size))
+        return self._submit(job, display=True)
+
+    def _submit(self, job, display: bool) -> Future:
+        future = Future()
+        with self._cond:
+            if not self._running:
+                future.cancel()
+                return future
+            if display:
+                # Drop displays that have not started yet, keeping command order
+                for entry in [e for e in self._queue if e[2]]:
+                    self._queue.remove(entry)
+                    entry[0].cancel()
+                    self.coalesced += 1
+            self._queue.append((future, job, display))
+            self._cond.notify()
+        return future
+
+    # ============== Worker ==============
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                future, job, _ = self._queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(job())
+            except Exception as e:
+                future.set_exception(e)
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Cancel queued commands and stop the worker after the current one.
+
+        Args:
+            timeout: Seconds to wait for the running command to finish
+        """
+        with self._cond:
+            self._running = False
+            while self._queue:
+                self._queue.popleft()[0].cancel()
+            self._cond.notify()
+        self._thread.join(timeout)
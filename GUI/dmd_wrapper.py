@@ -4,9 +4,12 @@ Python wrapper for DLPC900 DMD control DLL
 """
 
 import ctypes
-from ctypes import c_int, c_uint, c_ubyte, c_char_p, POINTER, byref
-from pathlib import Path
 import os
+from ctypes import c_int, c_uint, c_ubyte, c_char_p, c_double, POINTER, byref
+from collections import deque
+from pathlib import Path
+from lazy_dll import LazyDLL
+import numpy as np
 
 
 class PatternMode:
@@ -23,107 +26,135 @@ class PowerMode:
     STANDBY = 1
 
 
+class DMDTimings(ctypes.Structure):
+    """Mirror of DMD_Timings_t (dmd.h)"""
+    _fields_ = [
+        ('otf_us', c_double),
+        ('led_us', c_double),
+        ('load_us', c_double),
+        ('splash_us', c_double),
+        ('upload_us', c_double),
+        ('lut_us', c_double),
+        ('total_us', c_double),
+        ('upload_bytes', c_uint),
+        ('upload_packets', c_uint),
+        ('upload_acks', c_uint),
+    ]
+
+
+TIMING_STAGES = ('otf_us', 'led_us', 'load_us', 'splash_us', 'upload_us', 'lut_us', 'total_us')
+
+
+# dmd_api.dll function prototypes (name -> (argtypes, restype)), bound on first use by LazyDLL
+DMD_PROTOTYPES = {
+    # ============== Connection ==============
+    'dmd_is_connected': ([], c_int),
+    'dmd_connect': ([], c_int),
+    'dmd_disconnect': ([], c_int),
+
+    # ============== Status ==============
+    'dmd_get_status': ([POINTER(c_ubyte), POINTER(c_ubyte), POINTER(c_ubyte), POINTER(c_ubyte), POINTER(c_ubyte)], c_int),
+    'dmd_get_version': ([POINTER(c_uint), POINTER(c_uint), POINTER(c_uint), POINTER(c_uint)], c_int),
+    'dmd_get_power_mode': ([POINTER(c_ubyte)], c_int),
+    'dmd_set_standby': ([], c_int),
+    'dmd_set_normal': ([], c_int),
+    'dmd_toggle_idle': ([], c_int),
+
+    # ============== Pattern Mode ==============
+    'dmd_set_otf_mode': ([], c_int),
+    'dmd_set_disable_mode': ([], c_int),
+    'dmd_get_pattern_mode': ([POINTER(c_int)], c_int),
+    'dmd_clear_pattern': ([], c_int),
+    'dmd_show_tpg': ([], c_int),
+
+    # ============== LED Control ==============
+    'dmd_set_led_enables': ([c_int, c_int, c_int, c_int], c_int),
+    'dmd_get_led_enables': ([POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)], c_int),
+
+    # ============== Image Display ==============
+    'dmd_display_bmp': ([c_char_p], c_int),
+    'dmd_display_buffer': ([POINTER(c_ubyte), c_int, c_int], c_int),
+    'dmd_preload_buffer': ([POINTER(c_ubyte), c_int, c_int], c_int),
+    'dmd_play_sequence': ([POINTER(c_ubyte), c_int, c_int, c_int, c_int, c_int, c_uint], c_int),
+    'dmd_configure_playback': ([c_int, c_int, c_int, c_uint, c_int], c_int),
+    'dmd_get_playback': ([POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_uint), POINTER(c_int)], None),
+    'dmd_configure_trigger_out': ([c_int, c_int, c_int, c_int], c_int),
+    'dmd_load_white': ([], c_int),
+    'dmd_load_black': ([], c_int),
+    'dmd_load_half': ([], c_int),
+    'dmd_software_reset': ([], c_int),
+
+    # ============== Pattern Cache ==============
+    'dmd_get_cache_stats': ([POINTER(c_uint), POINTER(c_uint), POINTER(c_uint)], c_int),
+    'dmd_set_cache_slots': ([c_int], c_int),
+    'dmd_invalidate_cache': ([], None),
+    'dmd_get_elided_stats': ([POINTER(c_uint), POINTER(c_uint), POINTER(c_uint)], c_int),
+    'dmd_invalidate_display_state': ([], None),
+
+    # ============== Timing ==============
+    'dmd_get_last_timings': ([POINTER(DMDTimings)], c_int),
+    'dmd_set_upload_ack_interval': ([c_int], c_int),
+    'dmd_set_quiet': ([c_int], None),
+}
+
+
 class DMD:
     """Python wrapper for DLPC900 DMD DLL"""
+
+    # Binary patterns packed into one 24-bit image index
+    PATTERNS_PER_IMAGE = 24
+    # Pattern LUT size of the native library
+    MAX_SEQUENCE_PATTERNS = 1024
+    # DLPC900 1-bit exposure floor and 24-bit LUT time field limit, in us
+    MIN_EXPOSURE_US = 105
+    MAX_LUT_TIME_US = 0xFFFFFF
+    # TRIG_OUT edge delay range, in us
+    MIN_TRIG_OUT_DELAY_US = -20
+    MAX_TRIG_OUT_DELAY_US = 20000
+
+    # Number of display calls kept for the timing histograms
+    TIMING_HISTORY = 256
     
-    def __init__(self, dll_path: str = None):
+    def __init__(self, dll_path: str = None, backend: str = None):
         """
         Initialize the DMD wrapper.
         
         Args:
             dll_path: Path to the compiled dmd_api.dll (defaults to bin/dmd_api.dll)
+            backend: "dll" for the native library, or "sim" for the in-memory
+                     DLPC900 of sim_dmd.py; defaults to the DMD_BACKEND
+                     environment variable, then "dll"
         """
-        if dll_path is None:
-            dll_path = Path(__file__).parent.parent / "bin" / "dmd_api.dll"
+        backend = backend or os.environ.get("DMD_BACKEND", "dll")
+        if backend == "sim":
+            from sim_dmd import SimulatedDMDLibrary
+            self.dll = SimulatedDMDLibrary()
+        elif backend == "dll":
+            if dll_path is None:
+                dll_path = Path(__file__).parent.parent / "bin" / "dmd_api.dll"
+            # Loaded by the first call, prototypes bound as each function is first used
+            self.dll = LazyDLL(dll_path, DMD_PROTOTYPES)
         else:
-            dll_path = Path(dll_path)
-        
-        # Add the DLL directory to the search path
-        dll_dir = dll_path.parent.resolve()
-        os.add_dll_directory(str(dll_dir))
-        
-        self.dll = ctypes.CDLL(str(dll_path.resolve()))
-        self._define_functions()
+            raise ValueError(f"DMD backend must be 'dll' or 'sim', got {backend!r}")
+        self.backend = backend
         self._connected = False
+        self._missing_exports = set()
+        self._timing_history = {stage: deque(maxlen=self.TIMING_HISTORY) for stage in TIMING_STAGES}
     
-    def _define_functions(self):
-        """Define all DLL function signatures."""
-        
-        # ============== Connection ==============
-        self.dll.dmd_is_connected.argtypes = []
-        self.dll.dmd_is_connected.restype = c_int
-        
-        self.dll.dmd_connect.argtypes = []
-        self.dll.dmd_connect.restype = c_int
-        
-        self.dll.dmd_disconnect.argtypes = []
-        self.dll.dmd_disconnect.restype = c_int
-        
-        # ============== Status ==============
-        self.dll.dmd_get_status.argtypes = [
-            POINTER(c_ubyte), POINTER(c_ubyte), POINTER(c_ubyte),
-            POINTER(c_ubyte), POINTER(c_ubyte)
-        ]
-        self.dll.dmd_get_status.restype = c_int
-        
-        self.dll.dmd_get_version.argtypes = [
-            POINTER(c_uint), POINTER(c_uint), POINTER(c_uint), POINTER(c_uint)
-        ]
-        self.dll.dmd_get_version.restype = c_int
-        
-        self.dll.dmd_get_power_mode.argtypes = [POINTER(c_ubyte)]
-        self.dll.dmd_get_power_mode.restype = c_int
-        
-        self.dll.dmd_set_standby.argtypes = []
-        self.dll.dmd_set_standby.restype = c_int
-        
-        self.dll.dmd_set_normal.argtypes = []
-        self.dll.dmd_set_normal.restype = c_int
-        
-        self.dll.dmd_toggle_idle.argtypes = []
-        self.dll.dmd_toggle_idle.restype = c_int
-        
-        # ============== Pattern Mode ==============
-        self.dll.dmd_set_otf_mode.argtypes = []
-        self.dll.dmd_set_otf_mode.restype = c_int
-        
-        self.dll.dmd_set_disable_mode.argtypes = []
-        self.dll.dmd_set_disable_mode.restype = c_int
-        
-        self.dll.dmd_get_pattern_mode.argtypes = [POINTER(c_int)]
-        self.dll.dmd_get_pattern_mode.restype = c_int
-        
-        self.dll.dmd_clear_pattern.argtypes = []
-        self.dll.dmd_clear_pattern.restype = c_int
-        
-        self.dll.dmd_show_tpg.argtypes = []
-        self.dll.dmd_show_tpg.restype = c_int
-        
-        # ============== LED Control ==============
-        self.dll.dmd_set_led_enables.argtypes = [c_int, c_int, c_int, c_int]
-        self.dll.dmd_set_led_enables.restype = c_int
-        
-        self.dll.dmd_get_led_enables.argtypes = [
-            POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)
-        ]
-        self.dll.dmd_get_led_enables.restype = c_int
-        
-        # ============== Image Display ==============
-        self.dll.dmd_display_bmp.argtypes = [c_char_p]
-        self.dll.dmd_display_bmp.restype = c_int
-        
-        self.dll.dmd_load_white.argtypes = []
-        self.dll.dmd_load_white.restype = c_int
-        
-        self.dll.dmd_load_black.argtypes = []
-        self.dll.dmd_load_black.restype = c_int
-        
-        self.dll.dmd_load_half.argtypes = []
-        self.dll.dmd_load_half.restype = c_int
+    def _has_export(self, name: str, quiet: bool = False) -> bool:
+        """
+        Check that the library provides a function. A dmd_api.dll built
+        before the in-memory display lacks the functions added since, so
+        their methods fail with an error (or fall back) instead of raising
+        AttributeError. The error is printed once per function.
+        """
+        if hasattr(self.dll, name):
+            return True
+        if not quiet and name not in self._missing_exports:
+            self._missing_exports.add(name)
+            print(f"ERROR: {name} not found in dmd_api.dll, rebuild it with api_build.bat")
+        return False
 
-        self.dll.dmd_software_reset.argtypes = []
-        self.dll.dmd_software_reset.restype = c_int
-    
     # ============== Connection Methods ==============
     
     def connect(self) -> bool:
@@ -151,6 +182,14 @@ class DMD:
         """Check if DMD is connected (uses internal state, not USB check)."""
         return self._connected
     
+    def probe(self) -> bool:
+        """
+        Check that the USB connection is open and the DLPC900 is still on the
+        bus. Only enumerates USB devices, so unlike the other methods it may
+        be called from a thread other than the one owning the DMD.
+        """
+        return self.dll.dmd_is_connected() == 0
+    
     
     @property
     def connected(self) -> bool:
@@ -306,24 +345,389 @@ class DMD:
         Returns:
             True if successful
         """
-        return self.dll.dmd_display_bmp(filename.encode('utf-8')) == 0
+        result = self.dll.dmd_display_bmp(filename.encode('utf-8'))
+        self._record_timings()
+        return result == 0
+
+    def _pack_pattern(self, pattern: np.ndarray, width: int = None) -> tuple[np.ndarray, int, int]:
+        """
+        Validate a pattern and return (contiguous packed bits, width, height).
+        """
+        if pattern.ndim != 2:
+            raise ValueError(f"Pattern must be 2-D, got shape {pattern.shape}")
+        if pattern.dtype == np.bool_:
+            height, width = pattern.shape
+            pattern = np.packbits(pattern, axis=1)
+        elif pattern.dtype == np.uint8:
+            height = pattern.shape[0]
+            if width is None:
+                width = pattern.shape[1] * 8
+            if (width + 7) // 8 != pattern.shape[1]:
+                raise ValueError(f"Width {width} does not match {pattern.shape[1]} packed bytes per row")
+        else:
+            raise TypeError(f"Pattern must be bool or packed uint8, got {pattern.dtype}")
+        return np.ascontiguousarray(pattern), width, height
+
+    def display_array(self, pattern: np.ndarray, width: int = None) -> bool:
+        """
+        Display an in-memory 1-bit pattern on the DMD (no BMP file involved).
+        
+        Args:
+            pattern: Either a 2-D bool array (height x width, True = white) or
+                     a packed uint8 array (height x width/8, MSB first) as
+                     returned by bmp_generator.generate_pattern
+            width: Pixel width of a packed array (defaults to 8 * columns)
+            
+        Returns:
+            True if successful
+        """
+        bits, width, height = self._pack_pattern(pattern, width)
+        if not self._has_export('dmd_display_buffer'):
+            return self._display_array_as_bmp(bits, width, height)
+        result = self.dll.dmd_display_buffer(bits.ctypes.data_as(POINTER(c_ubyte)), width, height)
+        self._record_timings()
+        return result == 0
+
+    def _display_array_as_bmp(self, bits: np.ndarray, width: int, height: int) -> bool:
+        """Fallback for an old dmd_api.dll: show packed bits through row_pattern/current.bmp."""
+        from PIL import Image
+
+        path = Path(__file__).parent.parent / "row_pattern" / "current.bmp"
+        path.parent.mkdir(exist_ok=True)
+        # Mode "1" raw data is MSB-first packed rows, the layout of bits
+        Image.frombytes("1", (width, height), bits.tobytes()).save(path, "BMP")
+        return self.display_bmp(str(path))
+
+    def preload_array(self, pattern: np.ndarray, width: int = None) -> bool:
+        """
+        Upload a pattern into a spare image index while the current pattern
+        stays on the mirrors. Displaying it afterwards with display_array only
+        swaps the pattern LUT, so a scan can upload cell k+1 during the
+        exposure of cell k.
+        
+        Args:
+            pattern: Same as display_array
+            width: Pixel width of a packed array (defaults to 8 * columns)
+            
+        Returns:
+            True if successful
+        """
+        bits, width, height = self._pack_pattern(pattern, width)
+        if not self._has_export('dmd_preload_buffer'):
+            return False
+        result = self.dll.dmd_preload_buffer(bits.ctypes.data_as(POINTER(c_ubyte)), width, height)
+        self._record_timings()
+        return result == 0
     
+    def play_sequence(self, patterns, exposure_us: int, dark_us: int = 0, repeat: int = 0) -> bool:
+        """
+        Upload a sequence of binary patterns and play it from the DMD's pattern
+        LUT. Patterns are packed 24 per image index, so N patterns cost
+        ceil(N / 24) uploads and then run at hardware speed with no host calls.
+
+        The sequence keeps image indices 0..ceil(N / 24) - 1 while it runs:
+        preload_array and display_array only use the cache slots above them,
+        and display_array stops the sequence first if it holds every slot.
+
+        Args:
+            patterns: Stack of patterns, either bool (count x height x width) or
+                      packed uint8 (count x height x width/8), or a list of 2-D
+                      arrays of either kind. At most MAX_SEQUENCE_PATTERNS (1024):
+                      bmp_generator.generate_grid_batch() output, (grid + 1)**2
+                      patterns, fits for grids up to 31; play larger grids in
+                      slices of at most 1024 cells
+            exposure_us: Exposure of each pattern in microseconds
+            dark_us: Dark time after each pattern in microseconds
+            repeat: Number of times to play the sequence, 0 loops forever
+            
+        Returns:
+            True if successful
+        """
+        if isinstance(patterns, (list, tuple)):
+            patterns = np.stack([np.packbits(p, axis=1) if p.dtype == np.bool_ else p for p in patterns])
+        if patterns.ndim != 3:
+            raise ValueError(f"Patterns must be a 3-D stack, got shape {patterns.shape}")
+        if patterns.dtype == np.bool_:
+            count, height, width = patterns.shape
+            patterns = np.packbits(patterns, axis=2)
+        elif patterns.dtype == np.uint8:
+            count, height = patterns.shape[:2]
+            width = patterns.shape[2] * 8
+        else:
+            raise TypeError(f"Patterns must be bool or packed uint8, got {patterns.dtype}")
+        if not 1 <= count <= self.MAX_SEQUENCE_PATTERNS:
+            raise ValueError(f"Sequence must have 1-{self.MAX_SEQUENCE_PATTERNS} patterns, got {count}")
+
+        if not self._has_export('dmd_play_sequence'):
+            return False
+        bits = np.ascontiguousarray(patterns)
+        result = self.dll.dmd_play_sequence(
+            bits.ctypes.data_as(POINTER(c_ubyte)), count, width, height,
+            exposure_us, dark_us, 0xFFFFFFFF if repeat == 0 else repeat
+        )
+        self._record_timings()
+        return result == 0
+    
+    def configure_playback(self, exposure_us: int = 500000, dark_time_us: int = 0, led_mask: int = 7,
+                           repeat: int = 0, wait_for_trigger: bool = False) -> bool:
+        """
+        Set the pattern LUT parameters used by display_array, display_bmp and
+        the load_* patterns. A pattern already on the mirrors is restarted
+        with them from device memory; nothing is uploaded again. play_sequence
+        uses the LED mask and trigger setting, with its own timing.
+        
+        Args:
+            exposure_us: Exposure in microseconds, at least MIN_EXPOSURE_US
+            dark_time_us: Dark time after each exposure in microseconds
+            led_mask: LEDs on during exposure, b0 = red, b1 = green, b2 = blue
+            repeat: Number of times to play the pattern, 0 loops forever
+            wait_for_trigger: Start each exposure on TRIG_IN_1
+            
+        Returns:
+            True if successful
+        """
+        if not self.MIN_EXPOSURE_US <= exposure_us <= self.MAX_LUT_TIME_US:
+            raise ValueError(f"1-bit exposure must be {self.MIN_EXPOSURE_US}-{self.MAX_LUT_TIME_US} us, got {exposure_us}")
+        if not 0 <= dark_time_us <= self.MAX_LUT_TIME_US:
+            raise ValueError(f"Dark time must be 0-{self.MAX_LUT_TIME_US} us, got {dark_time_us}")
+        if not 0 <= led_mask <= 7:
+            raise ValueError(f"LED mask must be 0-7, got {led_mask}")
+        if not self._has_export('dmd_configure_playback'):
+            return False
+        result = self.dll.dmd_configure_playback(
+            exposure_us, dark_time_us, led_mask,
+            0xFFFFFFFF if repeat == 0 else repeat, int(wait_for_trigger)
+        )
+        return result == 0
+
+    def get_playback(self) -> dict | None:
+        """
+        Get the pattern LUT parameters set by configure_playback.
+        
+        Returns:
+            Dict with exposure_us, dark_time_us, led_mask, repeat (0 = forever)
+            and wait_for_trigger
+        """
+        if not self._has_export('dmd_get_playback'):
+            return None
+        exposure, dark, leds, trigger = c_int(), c_int(), c_int(), c_int()
+        repeat = c_uint()
+        self.dll.dmd_get_playback(byref(exposure), byref(dark), byref(leds), byref(repeat), byref(trigger))
+        return {
+            'exposure_us': exposure.value,
+            'dark_time_us': dark.value,
+            'led_mask': leds.value,
+            'repeat': 0 if repeat.value == 0xFFFFFFFF else repeat.value,
+            'wait_for_trigger': bool(trigger.value),
+        }
+
+    def configure_trigger_out(self, trig_out: int = 1, invert: bool = False,
+                              rising_delay_us: int = 0, falling_delay_us: int = 0) -> bool:
+        """
+        Configure a DLPC900 trigger output. TRIG_OUT_1 is active during every
+        pattern exposure, so wired to a camera trigger input it starts one
+        frame per pattern; TRIG_OUT_2 pulses once per pass of the LUT.
+        Stops the running pattern; the next display restarts it.
+        
+        Args:
+            trig_out: 1 for TRIG_OUT_1, 2 for TRIG_OUT_2
+            invert: Active low output
+            rising_delay_us: Rising edge delay from the start of exposure
+            falling_delay_us: Falling edge delay from the end of exposure
+                              (TRIG_OUT_1 only)
+            
+        Returns:
+            True if successful
+        """
+        if trig_out not in (1, 2):
+            raise ValueError(f"Trigger output must be 1 or 2, got {trig_out}")
+        for delay in (rising_delay_us, falling_delay_us):
+            if not self.MIN_TRIG_OUT_DELAY_US <= delay <= self.MAX_TRIG_OUT_DELAY_US:
+                raise ValueError(f"Trigger delay must be {self.MIN_TRIG_OUT_DELAY_US}-"
+                                 f"{self.MAX_TRIG_OUT_DELAY_US} us, got {delay}")
+        if not self._has_export('dmd_configure_trigger_out'):
+            return False
+        return self.dll.dmd_configure_trigger_out(trig_out, int(invert), rising_delay_us, falling_delay_us) == 0
+
     def load_white(self) -> bool:
         """Display white pattern on DMD."""
-        return self.dll.dmd_load_white() == 0
+        result = self.dll.dmd_load_white()
+        self._record_timings()
+        return result == 0
     
     def load_black(self) -> bool:
         """Display black pattern on DMD."""
-        return self.dll.dmd_load_black() == 0
+        result = self.dll.dmd_load_black()
+        self._record_timings()
+        return result == 0
     
     def load_half(self) -> bool:
         """Display half white/half black pattern on DMD."""
-        return self.dll.dmd_load_half() == 0
+        result = self.dll.dmd_load_half()
+        self._record_timings()
+        return result == 0
 
     def software_reset(self) -> bool:
         """Perform a software reset via the DLL."""
         return self.dll.dmd_software_reset() == 0
 
+    # ============== Pattern Cache ==============
+
+    def get_device_cache_stats(self) -> dict | None:
+        """
+        Get counters of the device-resident pattern cache.
+        
+        Patterns already uploaded to a DLPC900 image index are re-shown by
+        rebuilding the pattern LUT only, without converting or uploading.
+        
+        Returns:
+            Dictionary with hits, misses and evictions
+        """
+        if not self._has_export('dmd_get_cache_stats'):
+            return None
+        hits, misses, evictions = c_uint(), c_uint(), c_uint()
+        result = self.dll.dmd_get_cache_stats(byref(hits), byref(misses), byref(evictions))
+        if result != 0:
+            return None
+        return {
+            'hits': hits.value,
+            'misses': misses.value,
+            'evictions': evictions.value
+        }
+
+    def set_device_cache_slots(self, slots: int) -> bool:
+        """
+        Set how many DLPC900 image indices the pattern cache may occupy.
+        Clears the cache.
+        
+        Args:
+            slots: Number of image indices (1-16; one pattern per index)
+        """
+        if not self._has_export('dmd_set_cache_slots'):
+            return False
+        return self.dll.dmd_set_cache_slots(slots) == 0
+
+    def invalidate_device_cache(self):
+        """Forget which patterns are on the device, forcing the next display to upload."""
+        # An old dmd_api.dll has no cache to forget
+        if self._has_export('dmd_invalidate_cache', quiet=True):
+            self.dll.dmd_invalidate_cache()
+
+    def get_elided_commands(self) -> dict | None:
+        """
+        Get how many commands were skipped because the device already matched.
+        
+        Returns:
+            Dictionary with otf (mode switches), led (LED enables) and
+            display (requests for the pattern already being displayed;
+            only counted while the playback loops forever)
+        """
+        if not self._has_export('dmd_get_elided_stats'):
+            return None
+        otf, led, display = c_uint(), c_uint(), c_uint()
+        result = self.dll.dmd_get_elided_stats(byref(otf), byref(led), byref(display))
+        if result != 0:
+            return None
+        return {
+            'otf': otf.value,
+            'led': led.value,
+            'display': display.value
+        }
+
+    def invalidate_display_state(self):
+        """
+        Forget the known mode, LED and displayed pattern, so the next display
+        sends the full command sequence. Use after changing the device from
+        outside this wrapper.
+        """
+        # An old dmd_api.dll sends every command anyway
+        if self._has_export('dmd_invalidate_display_state', quiet=True):
+            self.dll.dmd_invalidate_display_state()
+
+    # ============== Timing ==============
+
+    def set_quiet(self, quiet: bool = True):
+        """
+        Suppress the per-call progress output and ASCII preview of the DLL.
+        Errors are still printed.
+        """
+        if self._has_export('dmd_set_quiet', quiet=True):
+            self.dll.dmd_set_quiet(1 if quiet else 0)
+
+    def get_last_timings(self) -> dict | None:
+        """
+        Get the stage timings of the last display call.
+        
+        Returns:
+            Dictionary with otf_us, led_us, load_us, splash_us, upload_us,
+            lut_us, total_us (microseconds), upload_bytes, upload_packets
+            (HID reports), upload_acks (error check round trips) and
+            upload_bytes_per_s
+        """
+        if not self._has_export('dmd_get_last_timings', quiet=True):
+            return None
+        timings = DMDTimings()
+        if self.dll.dmd_get_last_timings(byref(timings)) != 0:
+            return None
+        result = {name: getattr(timings, name) for name, _ in DMDTimings._fields_}
+        result['upload_bytes_per_s'] = (
+            result['upload_bytes'] * 1e6 / result['upload_us'] if result['upload_us'] > 0 else 0.0
+        )
+        return result
+
+    def set_upload_ack_interval(self, interval: int) -> bool:
+        """
+        Set how many 504-byte upload commands are streamed between device
+        error checks. The device error code only describes the last command,
+        so each check covers the command just before it: 1 checks every
+        command, 0 (the default) only the final command of each image.
+        Other values cost a round trip per check without covering the
+        commands in between.
+        """
+        if not self._has_export('dmd_set_upload_ack_interval'):
+            return False
+        return self.dll.dmd_set_upload_ack_interval(interval) == 0
+
+    def _record_timings(self):
+        """Append the last display call's timings to the rolling history."""
+        timings = self.get_last_timings()
+        if timings is None:
+            return
+        for stage in TIMING_STAGES:
+            self._timing_history[stage].append(timings[stage])
+
+    def get_timing_histograms(self, bins: int = 10) -> dict:
+        """
+        Summarise the last TIMING_HISTORY display calls per stage.
+        
+        Args:
+            bins: Number of histogram bins
+            
+        Returns:
+            Dictionary keyed by stage with count, mean, p50, p95, max and
+            histogram (counts, bin_edges) in microseconds
+        """
+        summary = {}
+        for stage, history in self._timing_history.items():
+            if not history:
+                continue
+            values = np.fromiter(history, dtype=np.float64)
+            counts, edges = np.histogram(values, bins=bins)
+            summary[stage] = {
+                'count': len(values),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'max': float(values.max()),
+                'histogram': (counts, edges),
+            }
+        return summary
+
+    def clear_timing_history(self):
+        """Drop all recorded timings."""
+        for history in self._timing_history.values():
+            history.clear()
+
 # ============== Usage Example ==============
 
 if __name__ == "__main__":
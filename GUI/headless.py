@@ -0,0 +1,383 @@
+"""
+headless.py
+Run a DMD/camera protocol file without the GUI
+
+    python -m GUI.headless scan.json [--output DIR] [--check]
+
+Never imports tkinter or PIL.ImageTk, and only opens the devices the
+protocol uses, so it suits unattended scans on lab PCs. A protocol is a JSON
+(or, with PyYAML installed, YAML) mapping:
+
+    {
+        "output_dir": "scans/run1",
+        "camera": {"width": 1920, "height": 1080, "bin": 1, "img_type": "RAW8",
+                   "position": [0, 0], "exposure_us": 10000, "gain": 0},
+        "dmd": {"quiet": true},
+        "steps": [
+            {"action": "display_cell", "row": 0, "col": 0, "grid": 10},
+            {"action": "wait", "seconds": 0.1},
+            {"action": "capture", "frames": 3, "name": "cell_0_0", "format": "tiff"},
+            {"action": "scan", "grid": 10, "frames": 1, "name": "cell_{row}_{col}"},
+            {"action": "clear"}
+        ]
+    }
+
+Step actions:
+    display_cell  row, col, grid (10), thickness (2)
+    display_bmp   path
+    white, black  full-field patterns
+    clear         stop the displayed pattern
+    exposure      value_us
+    gain          value
+    wait          seconds
+    capture       frames (1), name ("frame"), format ("tiff"), mode ("snap"
+                  or "video"), dark (false), timeout_ms (30000)
+    scan          every cell of a grid (rows and cols 0..grid): display it,
+                  settle_s (0), then capture with the capture keys; name may
+                  use {row} and {col}
+    sync          every cell of a grid ((grid + 1)**2 patterns, so grid <= 31)
+                  with one frame per pattern stamped by SyncAcquisition:
+                  trigger "hardware" (DMD sequence with TRIG_OUT_1 wired to
+                  the camera trigger; exposure_us (2000), dark_us (0),
+                  repeat (1)) or "soft"; grid (10), thickness (2), timeout_ms
+                  (1000, soft only), name ("sync_{row}_{col}"), format
+                  ("tiff"). With DMD_BACKEND=sim and CAMERA_BACKEND=sim the
+                  simulators are wired together, so it runs without hardware
+
+Captured frames are saved as <output_dir>/<name>_<index>.<format>; "npy"
+writes the raw array.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Run as "python -m GUI.headless" from the repository root or as a script
+sys.path.insert(0, str(Path(__file__).parent))
+
+CAPTURE_KEYS = {'frames', 'name', 'format', 'mode', 'dark', 'timeout_ms'}
+
+# Allowed keys per action, and which device each action needs
+ACTIONS = {
+    'display_cell': ({'row', 'col', 'grid', 'thickness'}, 'dmd'),
+    'display_bmp': ({'path'}, 'dmd'),
+    'white': (set(), 'dmd'),
+    'black': (set(), 'dmd'),
+    'clear': (set(), 'dmd'),
+    'exposure': ({'value_us'}, 'camera'),
+    'gain': ({'value'}, 'camera'),
+    'wait': ({'seconds'}, None),
+    'capture': (CAPTURE_KEYS, 'camera'),
+    'scan': (CAPTURE_KEYS | {'grid', 'thickness', 'settle_s'}, 'both'),
+    'sync': ({'grid', 'thickness', 'trigger', 'exposure_us', 'dark_us', 'repeat',
+              'timeout_ms', 'name', 'format'}, 'both'),
+}
+
+REQUIRED = {
+    'display_cell': {'row', 'col'},
+    'display_bmp': {'path'},
+    'exposure': {'value_us'},
+    'gain': {'value'},
+    'wait': {'seconds'},
+}
+
+IMG_TYPES = ('RAW8', 'RGB24', 'RAW16', 'Y8')
+
+# Pattern LUT size of the DMD library (DMD.MAX_SEQUENCE_PATTERNS)
+MAX_SEQUENCE_PATTERNS = 1024
+
+
+def load_protocol(path: str) -> dict:
+    """
+    Read a protocol file; .yaml/.yml needs PyYAML, anything else is JSON.
+
+    Raises:
+        ValueError: if the file cannot be parsed
+    """
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("YAML protocols need PyYAML (pip install pyyaml); use JSON otherwise") from None
+        protocol = yaml.safe_load(text)
+    else:
+        protocol = json.loads(text)
+    return protocol
+
+
+def validate_protocol(protocol: dict) -> set:
+    """
+    Check the structure of a protocol before any device is opened.
+
+    Returns:
+        Set of devices the steps need ("dmd", "camera")
+
+    Raises:
+        ValueError: naming the first bad step
+    """
+    if not isinstance(protocol, dict) or not isinstance(protocol.get('steps'), list):
+        raise ValueError("Protocol must be a mapping with a 'steps' list")
+    img_type = protocol.get('camera', {}).get('img_type', 'RAW8')
+    if img_type not in IMG_TYPES:
+        raise ValueError(f"camera.img_type must be one of {IMG_TYPES}, got {img_type!r}")
+
+    devices = set()
+    for index, step in enumerate(protocol['steps']):
+        if not isinstance(step, dict) or step.get('action') not in ACTIONS:
+            raise ValueError(f"Step {index}: action must be one of {sorted(ACTIONS)}")
+        action = step['action']
+        allowed, device = ACTIONS[action]
+        unknown = set(step) - allowed - {'action'}
+        if unknown:
+            raise ValueError(f"Step {index} ({action}): unknown keys {sorted(unknown)}")
+        missing = REQUIRED.get(action, set()) - set(step)
+        if missing:
+            raise ValueError(f"Step {index} ({action}): missing keys {sorted(missing)}")
+        if step.get('mode', 'snap') not in ('snap', 'video'):
+            raise ValueError(f"Step {index} ({action}): mode must be 'snap' or 'video'")
+        if step.get('trigger', 'hardware') not in ('hardware', 'soft'):
+            raise ValueError(f"Step {index} ({action}): trigger must be 'hardware' or 'soft'")
+        if action == 'sync' and (step.get('grid', 10) + 1) ** 2 > MAX_SEQUENCE_PATTERNS:
+            raise ValueError(f"Step {index} ({action}): grid {step['grid']} has more than "
+                             f"{MAX_SEQUENCE_PATTERNS} cells")
+        if device == 'both':
+            devices |= {'dmd', 'camera'}
+        elif device:
+            devices.add(device)
+    return devices
+
+
+class ProtocolRunner:
+    """Execute protocol steps against a DMD and an ASICamera"""
+
+    def __init__(self, dmd=None, camera=None, output_dir: str = "."):
+        """
+        Args:
+            dmd: Connected DMD, or None if no step needs it
+            camera: Initialised ASICamera, or None if no step needs it
+            output_dir: Directory for captured frames (created on demand)
+        """
+        self.dmd = dmd
+        self.camera = camera
+        self.output_dir = Path(output_dir)
+        self.saved = 0
+
+    def run(self, steps: list) -> bool:
+        """
+        Run steps in order, stopping at the first failure.
+
+        Returns:
+            True if every step succeeded
+        """
+        for index, step in enumerate(steps):
+            action = step['action']
+            start = time.perf_counter()
+            ok = getattr(self, f"_do_{action}")(step)
+            print(f"[{index}] {action}: {'ok' if ok else 'FAILED'} ({time.perf_counter() - start:.3f} s)")
+            if not ok:
+                return False
+        return True
+
+    # ============== DMD ==============
+
+    def _show_cell(self, row, col, grid, thickness) -> bool:
+        from bmp_generator import generate_pattern
+        return self.dmd.display_array(generate_pattern(row, col, grid, thickness))
+
+    def _do_display_cell(self, step) -> bool:
+        return self._show_cell(step['row'], step['col'], step.get('grid', 10), step.get('thickness', 2))
+
+    def _do_display_bmp(self, step) -> bool:
+        return self.dmd.display_bmp(str(step['path']))
+
+    def _do_white(self, step) -> bool:
+        return self.dmd.load_white()
+
+    def _do_black(self, step) -> bool:
+        return self.dmd.load_black()
+
+    def _do_clear(self, step) -> bool:
+        return self.dmd.clear_pattern()
+
+    # ============== Camera ==============
+
+    def _do_exposure(self, step) -> bool:
+        return self.camera.set_exposure(int(step['value_us'])) == 0
+
+    def _do_gain(self, step) -> bool:
+        return self.camera.set_gain(int(step['value'])) == 0
+
+    def _do_wait(self, step) -> bool:
+        time.sleep(float(step['seconds']))
+        return True
+
+    def _grab(self, step) -> list:
+        """Capture step['frames'] images in snap or video mode."""
+        count = step.get('frames', 1)
+        timeout_ms = step.get('timeout_ms', 30000)
+        if step.get('mode', 'snap') == 'snap':
+            return [self.camera.snap(is_dark=step.get('dark', False), timeout_ms=timeout_ms)
+                    for _ in range(count)]
+        if self.camera.start_video() != 0:
+            return [None]
+        try:
+            return [self.camera.get_video_frame(wait_ms=timeout_ms) for _ in range(count)]
+        finally:
+            self.camera.stop_video()
+
+    def _save(self, image, name: str, index: int, ext: str) -> bool:
+        """Write one frame as <output_dir>/<name>_<index>.<ext>."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{name}_{index:04d}.{ext}"
+        if ext == 'npy':
+            import numpy as np
+            np.save(path, image)
+        elif not self.camera.save_image(image, str(path)):
+            return False
+        self.saved += 1
+        return True
+
+    def _do_capture(self, step, **fields) -> bool:
+        images = self._grab(step)
+        if any(image is None for image in images):
+            return False
+        name = step.get('name', 'frame').format(**fields)
+        ext = step.get('format', 'tiff').lstrip('.')
+        return all(self._save(image, name, index, ext) for index, image in enumerate(images))
+
+    def _do_scan(self, step) -> bool:
+        grid = step.get('grid', 10)
+        capture = {key: value for key, value in step.items() if key in CAPTURE_KEYS}
+        capture.setdefault('name', 'cell_{row}_{col}')
+        for row in range(grid + 1):
+            for col in range(grid + 1):
+                if not self._show_cell(row, col, grid, step.get('thickness', 2)):
+                    print(f"  scan: cannot display cell ({row}, {col})")
+                    return False
+                if step.get('settle_s'):
+                    time.sleep(step['settle_s'])
+                if not self._do_capture(capture, row=row, col=col):
+                    print(f"  scan: capture failed at cell ({row}, {col})")
+                    return False
+        return True
+
+    def _do_sync(self, step) -> bool:
+        from bmp_generator import generate_grid_batch
+        from sync_acquisition import SyncAcquisition
+
+        grid = step.get('grid', 10)
+        patterns = generate_grid_batch(grid, step.get('thickness', 2))
+        sync = SyncAcquisition(self.dmd, self.camera)
+        try:
+            if step.get('trigger', 'hardware') == 'hardware':
+                frames = sync.run_hardware(patterns, int(step.get('exposure_us', 2000)),
+                                           int(step.get('dark_us', 0)), step.get('repeat', 1))
+            else:
+                frames = sync.run_soft(patterns, wait_ms=step.get('timeout_ms', 1000))
+        except ValueError as e:
+            print(f"  sync: {e}")
+            return False
+        if frames is None:
+            return False
+
+        stats = sync.last_stats
+        print(f"  sync: {stats['received']}/{stats['expected']} frames, {stats['dropped']} dropped, "
+              f"{stats['missing']} missing, {stats['fps']:.1f} fps")
+        name = step.get('name', 'sync_{row}_{col}')
+        ext = step.get('format', 'tiff').lstrip('.')
+        for frame in frames:
+            # generate_grid_batch puts cell (row, col) at row * (grid + 1) + col
+            row, col = divmod(frame['pattern_index'], grid + 1)
+            if not self._save(frame['image'], name.format(row=row, col=col), frame['frame_number'], ext):
+                return False
+        return stats['missing'] == 0
+
+
+def open_devices(protocol: dict, devices: set, dmd_dll: str = None, camera_dll: str = None):
+    """
+    Open only the devices the protocol needs.
+
+    Returns:
+        (dmd, camera), either None if unused
+
+    Raises:
+        RuntimeError: if a needed device cannot be opened
+    """
+    dmd = camera = None
+    if 'dmd' in devices:
+        from dmd_wrapper import DMD
+        dmd = DMD(dmd_dll)
+        if not dmd.connect():
+            raise RuntimeError("Cannot connect to the DMD")
+        dmd.set_quiet(protocol.get('dmd', {}).get('quiet', True))
+
+    if 'camera' in devices:
+        from asi_wrapper import ASICamera, ImgType
+        settings = protocol.get('camera', {})
+        camera = ASICamera(camera_dll)
+        result = camera.init_camera(settings.get('width', 1920), settings.get('height', 1080),
+                                    settings.get('bin', 1),
+                                    getattr(ImgType, settings.get('img_type', 'RAW8')))
+        if result != 0:
+            if dmd:
+                dmd.disconnect()
+            raise RuntimeError(f"Cannot initialise the camera ({result})")
+        if 'position' in settings:
+            camera.set_pos(*settings['position'])
+        if 'exposure_us' in settings:
+            camera.set_exposure(int(settings['exposure_us']))
+        if 'gain' in settings:
+            camera.set_gain(int(settings['gain']))
+    return dmd, camera
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m GUI.headless",
+                                     description="Run a DMD/camera protocol without the GUI")
+    parser.add_argument("protocol", help="Protocol file (.json, or .yaml with PyYAML)")
+    parser.add_argument("--output", help="Override the protocol's output_dir")
+    parser.add_argument("--check", action="store_true", help="Validate the protocol and exit")
+    parser.add_argument("--dmd-dll", help="Path to dmd_api.dll")
+    parser.add_argument("--camera-dll", help="Path to asi_api.dll")
+    args = parser.parse_args(argv)
+
+    try:
+        protocol = load_protocol(args.protocol)
+        devices = validate_protocol(protocol)
+    except (OSError, ValueError) as e:
+        print(f"Invalid protocol: {e}")
+        return 2
+    print(f"{len(protocol['steps'])} steps, devices: {', '.join(sorted(devices)) or 'none'}")
+    if args.check:
+        return 0
+
+    try:
+        dmd, camera = open_devices(protocol, devices, args.dmd_dll, args.camera_dll)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    runner = ProtocolRunner(dmd, camera, args.output or protocol.get('output_dir', '.'))
+    start = time.perf_counter()
+    try:
+        ok = runner.run(protocol['steps'])
+    except KeyboardInterrupt:
+        print("Interrupted")
+        ok = False
+    finally:
+        if camera and camera.is_connected:
+            camera.stop_camera()
+        if dmd and dmd.connected:
+            dmd.clear_pattern()
+            dmd.disconnect()
+    print(f"{'Finished' if ok else 'Stopped'} after {time.perf_counter() - start:.1f} s, "
+          f"{runner.saved} frames saved to {runner.output_dir}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+lazy_dll.py
+ctypes library that loads on first call and binds prototypes on first use
+
+Loading dmd_api.dll / asi_api.dll (and the ASI SDK behind it) and declaring
+every signature up front is startup work the GUI does not need before the
+window is shown. LazyDLL defers both: the library is loaded by whichever
+thread makes the first call (a connect on a background thread), and each
+function gets its argtypes/restype when it is first looked up.
+"""
+
+import ctypes
+import os
+import threading
+from pathlib import Path
+
+
+class LazyDLL:
+    """Drop-in for ctypes.CDLL with deferred loading and prototype binding"""
+
+    def __init__(self, path, prototypes: dict):
+        """
+        Args:
+            path: Path to the shared library
+            prototypes: Function name -> (argtypes, restype)
+        """
+        self._path = Path(path).resolve()
+        self._prototypes = prototypes
+        self._dll = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """True once the library has been loaded."""
+        return self._dll is not None
+
+    def load(self) -> ctypes.CDLL:
+        """Load the library now (normally done by the first call)."""
+        with self._lock:
+            if self._dll is None:
+                # Let the library find its dependencies next to it
+                if hasattr(os, "add_dll_directory"):
+                    os.add_dll_directory(str(self._path.parent))
+                self._dll = ctypes.CDLL(str(self._path))
+        return self._dll
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        func = getattr(self._dll or self.load(), name)
+        prototype = self._prototypes.get(name)
+        if prototype is not None:
+            func.argtypes, func.restype = prototype
+        # Cache on the instance so later lookups skip __getattr__
+        setattr(self, name, func)
+        return func
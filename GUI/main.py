@@ -1,12 +1,14 @@
+import time
+_START = time.perf_counter()
+
+import os
 import tkinter as tk
 from status_panel import StatusPanel
-from dmd_controls import DMDControls
-from camera_controls import CameraControls
-from video_panel import VideoPanel
-from asi_wrapper import ASICamera, ImgType
-from dmd_wrapper import DMD
-import ctypes
-import os
+
+# Print startup milestones and exit once the DMD is ready and the first frame
+# is shown (used by benchmarks/bench_startup.py)
+STARTUP_REPORT = bool(os.environ.get("MICROSCOPY_STARTUP_REPORT"))
+startup_marks = {}
 
 window = tk.Tk()
 window.title("Microscopy Control Panel")
@@ -21,6 +23,8 @@ window.columnconfigure(0, weight=0, minsize=400)
 window.columnconfigure(1, weight=3)
 
 # ============== UI ==============
+# Only the Tk-only status panel is built up front; panels that pull in
+# numpy, PIL and the DLL wrappers are imported once the window is on screen
 status_panel = StatusPanel(window)
 status_panel.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
 status_panel.grid_propagate(False)
@@ -31,41 +35,77 @@ control_panel.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 control_panel.grid_propagate(False)
 control_panel.config(width=400)
 
-video_panel = VideoPanel(window)
-video_panel.grid(row=0, column=1, rowspan=3, sticky="nsew")
+video_placeholder = tk.Frame(window, bg="black")
+video_placeholder.grid(row=0, column=1, rowspan=3, sticky="nsew")
 
 # ============== Globals ==============
 camera = None
 dmd = None
 camera_controls = None
 dmd_controls = None
+video_panel = None
+monitor = None
+
+def mark_startup(name):
+    '''Record the first time a startup milestone is reached'''
+    if name in startup_marks:
+        return
+    startup_marks[name] = time.perf_counter() - _START
+    if STARTUP_REPORT:
+        print(f"startup {name} {startup_marks[name] * 1000:.1f} ms", flush=True)
+        if "first_frame" in startup_marks and "dmd_ready" in startup_marks:
+            window.after(0, on_closing)
 
 # ============== Init ==============
 def init_hardware():
-    '''Initialize camera and DMD hardware'''
-    global camera, dmd, camera_controls, dmd_controls
+    '''Build the hardware panels and start connecting to the camera and DMD'''
+    global camera, dmd, camera_controls, dmd_controls, video_panel, monitor
 
+    from dmd_controls import DMDControls
+    from camera_controls import CameraControls
+    from video_panel import VideoPanel
+    from device_monitor import DeviceMonitor
     from asi_wrapper import ASICamera
     from dmd_wrapper import DMD
 
+    # Cheap: the DLLs are only loaded by the first call on the monitor threads
     camera = ASICamera()
     dmd = DMD()
 
-    status_panel.set_dmd(dmd)
+    video_panel = VideoPanel(window)
+    video_panel.grid(row=0, column=1, rowspan=3, sticky="nsew")
+    video_placeholder.destroy()
     video_panel.set_camera(camera)
+    video_panel.on_first_frame = lambda: mark_startup("first_frame")
+
+    status_panel.set_dmd(dmd)
 
     dmd_controls = DMDControls(window, dmd=dmd, status_panel=status_panel)
     dmd_controls.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
     dmd_controls.grid_propagate(False)
     dmd_controls.config(width=400)
+    status_panel.set_dmd_worker(dmd_controls.worker)
 
-    camera_controls = CameraControls(window, camera, video_panel)
+    camera_controls = CameraControls(window, camera, video_panel, status_panel=status_panel)
     camera_controls.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
     camera_controls.grid_propagate(False)
     camera_controls.config(width=400)
+    mark_startup("ui")
+
+    # Each device connects on its own thread, so discovery runs in parallel
+    monitor = DeviceMonitor(on_device_change)
+    monitor.add_device("camera", camera_controls.probe_camera, camera_controls.connect_camera)
+    monitor.add_device("dmd", dmd.probe, dmd_controls.connect_dmd, on_lost=dmd_controls.release_dmd)
+    monitor.start()
+
+    window.bind('<Configure>', keep_video_aspect)
 
-    window.after(100, camera_controls.auto_connect, status_panel)
-    window.after(200, dmd_controls.auto_connect)
+def on_device_change(name, connected, message):
+    '''Forward a DeviceMonitor state change to the Tk thread'''
+    controls = dmd_controls if name == "dmd" else camera_controls
+    if connected:
+        mark_startup("dmd_ready" if name == "dmd" else "camera_ready")
+    window.after(0, controls.on_connection_change, connected, message)
 
 def keep_video_aspect(event=None):
     '''Keep video panel aspect ratio square'''
@@ -73,17 +113,18 @@ def keep_video_aspect(event=None):
     size = min(grid_info[2], grid_info[3])
     video_panel.config(width=size, height=size)
 
-def enable_resize_bind():
-    '''Enable binding to keep video panel aspect ratio'''
-    window.bind('<Configure>', keep_video_aspect)
-
 def on_closing():
     '''Cleanup on window close'''
-    if camera_controls:
-        camera_controls.stop_health_check()
+    if monitor:
+        monitor.stop()
     if dmd_controls:
-        dmd_controls.stop_health_check()
-    video_panel.stop_stream()
+        if dmd_controls.worker:
+            dmd_controls.worker.stop()
+    if camera_controls and camera_controls.recorder:
+        # Finish the files before video capture stops under the recorder
+        camera_controls.recorder.stop()
+    if video_panel:
+        video_panel.stop_stream()
     if camera and camera.is_connected:
         camera.stop_camera()
     if dmd and dmd.connected:
@@ -92,8 +133,9 @@ def on_closing():
 
 window.protocol("WM_DELETE_WINDOW", on_closing)
 
-window.after(0, window.update_idletasks)
-window.after(100, init_hardware)            
-window.after(300, enable_resize_bind)
+# Draw the window before anything heavy is imported
+window.update()
+mark_startup("window")
+window.after_idle(init_hardware)
 
-window.mainloop()
\ No newline at end of file
+window.mainloop()
@@ -0,0 +1,300 @@
+"""
+recorder.py
+Record the live camera stream to a memory-mapped raw file
+
+Recorder reads every frame from the camera's capture ring (start_ring) on a
+reader thread and hands it to a writer thread through a bounded queue, so a
+slow disk costs counted frame drops instead of stalling the capture thread
+or the preview, which keeps reading the newest frame from the same ring.
+
+The writer copies frames into <name>.raw, which grows in preallocated,
+memory-mapped chunks; frame n is at byte offset n * frame_bytes. Alongside
+it go <name>.csv, one row per frame (frame, seq, timestamp_s, exposure_us,
+gain), and <name>.json with the frame shape, dtype and final stats:
+
+    recorder = Recorder(camera, "runs/cells.raw")
+    recorder.start()
+    ...
+    print(recorder.stop())
+
+    meta = json.load(open("runs/cells.json"))
+    frames = np.memmap("runs/cells.raw", dtype=meta['dtype'], mode='r',
+                       shape=(meta['frames'], *meta['shape']))
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+class Recorder:
+    """Streams camera frames to disk on background threads"""
+
+    # The file grows by this much at a time; each chunk is mapped once
+    CHUNK_MB = 1024
+    # Exposure and gain are re-read at most this often for the index
+    SETTINGS_POLL_S = 0.1
+
+    def __init__(self, camera, path: str, max_frames: int = None,
+                 queue_mb: int = 512, ring_slots: int = 8):
+        """
+        Args:
+            camera: Initialised ASICamera instance
+            path: Raw output file; the .csv index and .json metadata go next to it
+            max_frames: Stop by itself after this many frames (None records until stop())
+            queue_mb: Frames waiting for the writer, in MB, before new frames
+                      are dropped
+            ring_slots: Capture ring size if the recorder has to start the
+                        ring itself (it reuses a running one, e.g. the preview's)
+        """
+        self.camera = camera
+        self.path = Path(path)
+        self.max_frames = max_frames
+        self.queue_mb = queue_mb
+        self.ring_slots = ring_slots
+        self.error: str | None = None   # Why the recording ended early, if it did
+
+        self._queue = None
+        self._stop = threading.Event()
+        self._reader = None
+        self._writer = None
+        self._owns_ring = False
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames = 0                 # Frames written
+        self.ring_dropped = 0           # Overwritten in the ring before being read
+        self.queue_dropped = 0          # Discarded because the writer queue was full
+        self.sdk_dropped = 0            # Dropped by the camera SDK while recording
+        self.queue_peak = 0
+        self._sdk_dropped_start = 0
+        self._start_time = None
+        self._end_time = None
+        self._write_time = 0.0
+
+    @property
+    def is_recording(self) -> bool:
+        """True until the writer has finished the files."""
+        return self._writer is not None and self._writer.is_alive()
+
+    # ============== Control ==============
+
+    def start(self) -> bool:
+        """
+        Create the output files and start recording from the next captured frame.
+
+        Returns:
+            True on success
+        """
+        if self.is_recording:
+            print("Recording already running")
+            return False
+        if self.camera is None or not self.camera.is_connected:
+            print("Cannot record: camera not connected")
+            return False
+
+        pool = self.camera.frame_pool()
+        self.shape = pool.shape
+        self.dtype = pool.dtype
+        self.frame_bytes = pool.buffer_size
+        self._chunk_frames = max(1, self.CHUNK_MB * 2**20 // self.frame_bytes)
+
+        self._owns_ring = not self.camera.is_ring_running
+        if self._owns_ring and self.camera.start_ring(self.ring_slots) != 0:
+            print("Cannot record: failed to start video capture")
+            return False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w+b')
+            self._index = open(self.path.with_suffix('.csv'), 'w')
+        except OSError as e:
+            print(f"Cannot record: {e}")
+            if self._owns_ring:
+                self.camera.stop_ring()
+            return False
+        self._index.write("frame,seq,timestamp_s,exposure_us,gain\n")
+        self._chunk = None
+        self._chunk_start = 0
+
+        self.error = None
+        self._reset_stats()
+        self._queue = queue.Queue(maxsize=max(2, self.queue_mb * 2**20 // self.frame_bytes))
+        self._stop.clear()
+        self._sdk_dropped_start = max(self.camera.get_ring_stats()[0], 0)
+        self._start_time = time.perf_counter()
+
+        self._writer = threading.Thread(target=self._write_loop, name="recorder-writer", daemon=True)
+        self._reader = threading.Thread(target=self._read_loop, name="recorder-reader", daemon=True)
+        self._writer.start()
+        self._reader.start()
+        print(f"Recording to {self.path} ({self.shape}, {self.dtype}, "
+              f"{self._queue.maxsize} frame queue)")
+        return True
+
+    def stop(self, wait: bool = True) -> dict:
+        """
+        Stop recording. Frames already queued are still written.
+
+        Args:
+            wait: Block until the files are closed; False returns at once
+                  (poll is_recording), e.g. from the Tk thread
+
+        Returns:
+            stats()
+        """
+        self._stop.set()
+        if wait:
+            for thread in (self._reader, self._writer):
+                if thread is not None:
+                    thread.join()
+        return self.stats()
+
+    def stats(self) -> dict:
+        """Counters and throughput so far (or of the finished recording)."""
+        if self._start_time is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._end_time or time.perf_counter()) - self._start_time
+        written_mb = self.frames * getattr(self, 'frame_bytes', 0) / 2**20
+        return {
+            'frames': self.frames,
+            'ring_dropped': self.ring_dropped,
+            'queue_dropped': self.queue_dropped,
+            'sdk_dropped': self.sdk_dropped,
+            'elapsed_s': elapsed,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            # Sustained rate, and what the writer could manage if never idle
+            'mb_per_s': written_mb / elapsed if elapsed > 0 else 0.0,
+            'writer_mb_per_s': written_mb / self._write_time if self._write_time > 0 else 0.0,
+            'queue_peak': self.queue_peak,
+            'queue_size': self._queue.maxsize if self._queue else 0,
+            'error': self.error,
+        }
+
+    def _fail(self, message: str):
+        if self.error is None:
+            self.error = message
+            print(f"Recording stopped: {message}")
+        self._stop.set()
+
+    # ============== Reader ==============
+
+    def _read_loop(self):
+        """Move every ring frame into the writer queue; never blocks on the writer."""
+        try:
+            _, captured = self.camera.get_ring_stats()
+            seq = max(captured, 0) + 1
+            settings_time = 0.0
+            exposure = gain = 0
+
+            while not self._stop.is_set():
+                lease, got = self.camera.read_frame_lease(seq, wait_ms=100)
+                if lease is None:
+                    if not self.camera.is_ring_running:
+                        self._fail("video capture stopped")
+                    continue
+                now = time.perf_counter()
+                if lease.array.shape != self.shape or lease.array.dtype != self.dtype:
+                    lease.release()
+                    self._fail("frame format changed")
+                    break
+
+                # A jump means the ring overwrote frames before we got to them
+                self.ring_dropped += got - seq
+                seq = got + 1
+
+                if now - settings_time >= self.SETTINGS_POLL_S:
+                    exposure = self.camera.get_exposure()[1]
+                    gain = self.camera.get_gain()[1]
+                    self.sdk_dropped = max(self.camera.get_ring_stats()[0] - self._sdk_dropped_start, 0)
+                    settings_time = now
+
+                try:
+                    self._queue.put_nowait((lease, got, now - self._start_time, exposure, gain))
+                except queue.Full:
+                    lease.release()
+                    self.queue_dropped += 1
+                self.queue_peak = max(self.queue_peak, self._queue.qsize())
+        except Exception as e:
+            self._fail(f"reader error: {e}")
+        finally:
+            self.sdk_dropped = max(self.camera.get_ring_stats()[0] - self._sdk_dropped_start, 0)
+            self._queue.put(None)
+
+    # ============== Writer ==============
+
+    def _map_chunk(self, start: int):
+        """Drop the current mapping, preallocate the next chunk and map it."""
+        self._chunk = None
+        end = (start + self._chunk_frames) * self.frame_bytes
+        if hasattr(os, 'posix_fallocate'):
+            # Reserve the blocks now so a full disk fails here, not mid-copy
+            os.posix_fallocate(self._file.fileno(), start * self.frame_bytes, end - start * self.frame_bytes)
+        else:
+            self._file.truncate(end)
+        self._chunk = np.memmap(self._file, dtype=self.dtype, mode='r+',
+                                offset=start * self.frame_bytes,
+                                shape=(self._chunk_frames,) + self.shape)
+        self._chunk_start = start
+
+    def _write_loop(self):
+        """Copy queued frames into the mapped file until the reader's end marker."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            lease, seq, timestamp, exposure, gain = item
+            if self.error is not None or (self.max_frames is not None and self.frames >= self.max_frames):
+                lease.release()
+                continue
+            try:
+                start = time.perf_counter()
+                if self._chunk is None or self.frames >= self._chunk_start + self._chunk_frames:
+                    self._map_chunk(self.frames)
+                self._chunk[self.frames - self._chunk_start] = lease.array
+                self._write_time += time.perf_counter() - start
+            except (OSError, ValueError) as e:
+                self._fail(f"write failed: {e}")
+                continue
+            finally:
+                lease.release()
+            self._index.write(f"{self.frames},{seq},{timestamp:.6f},{exposure},{gain}\n")
+            self.frames += 1
+            if self.max_frames is not None and self.frames >= self.max_frames:
+                self._stop.set()
+        self._end_time = time.perf_counter()
+        self._finish()
+
+    def _finish(self):
+        """Flush and trim the raw file, close the index and write the metadata."""
+        try:
+            # fsync after unmapping, rather than flushing the mapping, which
+            # holds the GIL and would stall the preview for the whole write-back
+            self._chunk = None
+            self._file.truncate(self.frames * self.frame_bytes)
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            self._fail(f"closing raw file failed: {e}")
+        finally:
+            self._file.close()
+            self._index.close()
+        if self._owns_ring:
+            self.camera.stop_ring()
+
+        meta = {
+            'raw': self.path.name,
+            'index': self.path.with_suffix('.csv').name,
+            'shape': list(self.shape),
+            'dtype': self.dtype.name,
+            'frame_bytes': self.frame_bytes,
+            **self.stats(),
+        }
+        with open(self.path.with_suffix('.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        print(f"Recorded {self.frames} frames to {self.path}")
@@ -0,0 +1,598 @@
+"""
+sim_camera.py
+Synthetic asi_api library: a ZWO camera that renders its own frames
+
+SimulatedCameraLibrary implements every cam_* function of
+asi_wrapper.CAMERA_PROTOTYPES with the same ctypes calling convention, so
+ASICamera(backend="sim") drives VideoPanel, the recording and analysis code
+and headless runs on a Linux box without the ASI SDK.
+
+Frames follow the settings the real SDK honours: ROI size, start position
+and binning crop and bin a sensor-sized scene, the image type selects the
+pixel format, exposure and gain scale the signal, and video mode delivers
+one frame per max(1 / fps, exposure) with frames dropped (and counted) when
+the reader falls behind the SDK's small buffer. cam_get_frame blocks until
+the next frame is due and fails after wait_ms. In the trigger modes frames
+are only produced by cam_send_soft_trigger or external_trigger().
+cam_ring_* run a capture thread into a frame ring like asi_api.cpp does.
+
+Noise is pre-rendered into a small bank of frames per setting, so a frame
+costs one copy into the caller's buffer and 1080p runs well past 200 fps.
+The frame number is written into the first four bytes of every frame
+(little endian) unless stamp_frames is off, so consumers can check order
+and drops.
+"""
+
+import ctypes
+import threading
+import time
+from ctypes import c_ubyte, POINTER
+
+import numpy as np
+
+# ImgType / ExpStatus / CameraMode values (asi_wrapper.py)
+RAW8, RGB24, RAW16, Y8 = 0, 1, 2, 3
+EXP_IDLE, EXP_WORKING, EXP_SUCCESS, EXP_FAILED = 0, 1, 2, 3
+MODE_NORMAL, MODE_TRIG_SOFT_EDGE, MODE_TRIG_SOFT_LEVEL = 0, 1, 4
+
+BYTES_PER_PIXEL = {RAW8: 1, RGB24: 3, RAW16: 2, Y8: 1}
+CAMERA_ID = 0
+EXPOSURE_RANGE_US = (32, 2000000000)
+GAIN_RANGE = (0, 500)
+# Frames the SDK holds for a reader that falls behind before dropping
+VIDEO_BUFFER_FRAMES = 2
+# Distinct noise realisations cycled through
+NOISE_BANK_FRAMES = 8
+
+
+def _out(ref, value):
+    """Store value through a byref() argument."""
+    ref._obj.value = value
+
+
+def _view(buffer, size: int) -> np.ndarray:
+    """uint8 view of a ctypes array or pointer passed as a frame buffer."""
+    return np.ctypeslib.as_array(ctypes.cast(buffer, POINTER(c_ubyte)), shape=(size,))
+
+
+class _CaptureRing:
+    """Newest frames kept by the ring capture thread (cam_ring_start)"""
+
+    def __init__(self, slots: int, frame_size: int):
+        self.frame_size = frame_size
+        self.slots = [np.empty(frame_size, dtype=np.uint8) for _ in range(slots)]
+        self.spare = np.empty(frame_size, dtype=np.uint8)
+        self.captured = 0               # Sequence number of the newest frame
+        self.dropped = 0
+        self.running = True
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def copy(self, seq: int, buffer) -> int:
+        """Copy frame seq, or the oldest held if it was overwritten; caller holds cond."""
+        if seq == 0 or seq > self.captured:
+            return 0
+        seq = max(seq, self.captured - len(self.slots) + 1)
+        slot = (seq - 1) % len(self.slots)
+        _view(buffer, self.frame_size)[:] = self.slots[slot]
+        return seq
+
+
+class SimulatedCameraLibrary:
+    """In-memory stand-in for asi_api.dll rendering synthetic frames"""
+
+    def __init__(self, fps: float = 60.0, sensor_width: int = 1920, sensor_height: int = 1080,
+                 scene="gradient", noise: float = 2.0, trigger_cam: bool = True,
+                 realtime: bool = True, stamp_frames: bool = True, seed: int = 0):
+        """
+        Args:
+            fps: Video frame rate when exposure is shorter than the frame time
+            sensor_width: Full sensor width in pixels
+            sensor_height: Full sensor height in pixels
+            scene: "gradient" (diagonal ramp with a bar moving one column
+                   per frame), "flat", or a callable scene(t) returning a
+                   sensor-sized float array in 0..1; callables are rendered
+                   every frame and so are slower
+            noise: Read noise standard deviation in 8-bit counts
+            trigger_cam: Report a trigger port, enabling the trigger modes
+            realtime: Wait for exposures and frame times; False delivers
+                      every frame immediately
+            stamp_frames: Write the frame number into the first 4 bytes
+            seed: Noise generator seed
+        """
+        self.fps = fps
+        self.sensor_width = sensor_width
+        self.sensor_height = sensor_height
+        self.scene = scene
+        self.noise = noise
+        self.trigger_cam = trigger_cam
+        self.realtime = realtime
+        self.stamp_frames = stamp_frames
+
+        # Set present = False to simulate an unplugged camera
+        self.present = True
+        self.open = False
+        self.width, self.height, self.bin, self.img_type = sensor_width, sensor_height, 1, RAW8
+        self.start_x = self.start_y = 0
+        self.controls = {'exposure': [10000, 0], 'gain': [0, 0], 'offset': [0, 0]}
+        self.mode = MODE_NORMAL
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._bank = None
+        self._video = False
+        self._video_start = 0.0
+        self._delivered = 0         # Frames handed out since video start
+        self._dropped = 0
+        self._triggers = []         # perf_counter times of pending triggered frames
+        self._exposure = None       # (start, is_dark) of the snap exposure
+        self._exp_status = EXP_IDLE
+        self._ring = None
+
+    # ============== Model ==============
+
+    def external_trigger(self):
+        """Simulate an edge on the trigger input (hardware trigger modes)."""
+        with self._lock:
+            if self._video and self.mode != MODE_NORMAL:
+                self._triggers.append(time.perf_counter())
+
+    def _frame_bytes(self) -> int:
+        return self.width * self.height * BYTES_PER_PIXEL[self.img_type]
+
+    def _exposure_s(self) -> float:
+        return self.controls['exposure'][0] / 1e6
+
+    def _frame_period(self) -> float:
+        return max(1.0 / self.fps, self._exposure_s())
+
+    def _signal(self, t: float, dark: bool) -> np.ndarray:
+        """Scene over the ROI in 8-bit counts, before noise and offset."""
+        if dark:
+            return np.zeros((self.height, self.width), dtype=np.float32)
+        if callable(self.scene):
+            scene = np.asarray(self.scene(t), dtype=np.float32)
+        elif self.scene == 'flat':
+            scene = np.full((self.sensor_height, self.sensor_width), 0.5, dtype=np.float32)
+        else:
+            y, x = np.ogrid[:self.sensor_height, :self.sensor_width]
+            scene = ((x / self.sensor_width + y / self.sensor_height) / 2).astype(np.float32)
+        scene = scene[self.start_y:self.start_y + self.height * self.bin,
+                      self.start_x:self.start_x + self.width * self.bin]
+        if self.bin > 1:
+            scene = scene.reshape(self.height, self.bin, self.width, self.bin).mean(axis=(1, 3))
+        # Exposure relative to 10 ms, gain in 0.1 dB steps as on ASI cameras
+        level = 255.0 * self._exposure_s() / 0.01 * 10 ** (self.controls['gain'][0] / 200)
+        return scene * level
+
+    def _render(self, t: float, dark: bool = False) -> bytes:
+        """One frame in the current pixel format."""
+        image = self._signal(t, dark) + self.controls['offset'][0]
+        if self.noise > 0:
+            image = image + self._rng.normal(0.0, self.noise, image.shape).astype(np.float32)
+        image = np.clip(image, 0, 255)
+        if self.img_type == RAW16:
+            image = (image * 257).astype(np.uint16)
+        else:
+            image = image.astype(np.uint8)
+            if self.img_type == RGB24:
+                image = np.repeat(image[:, :, None], 3, axis=2)
+        return image.tobytes()
+
+    def _settings(self):
+        return (self.width, self.height, self.bin, self.img_type, self.start_x, self.start_y,
+                self.controls['exposure'][0], self.controls['gain'][0], self.controls['offset'][0])
+
+    def _fill(self, buffer, size: int, index: int, t: float, dark: bool = False) -> bool:
+        """Write frame number index into the caller's buffer."""
+        needed = self._frame_bytes()
+        if size < needed:
+            return False
+        if callable(self.scene) or dark:
+            ctypes.memmove(buffer, self._render(t, dark), needed)
+        else:
+            ctypes.memmove(buffer, self._noise_bank(t)[index % NOISE_BANK_FRAMES], needed)
+            if self.scene == 'gradient':
+                # A bright bar one column further each frame makes motion and tearing visible
+                channels = BYTES_PER_PIXEL[self.img_type]
+                rows = _view(buffer, needed).reshape(self.height, self.width * channels)
+                column = (index * channels) % (self.width * channels)
+                rows[:, column:column + channels] = 255
+        if self.stamp_frames and needed >= 4:
+            ctypes.memmove(buffer, index.to_bytes(4, 'little'), 4)
+        return True
+
+    def _noise_bank(self, t: float) -> list:
+        """Pre-rendered noisy frames for the current settings."""
+        if self._bank is None or self._bank[0] != self._settings():
+            self._bank = (self._settings(), [self._render(t) for _ in range(NOISE_BANK_FRAMES)])
+        return self._bank[1]
+
+    def _wait_until(self, due: float, deadline: float) -> bool:
+        """Sleep until due; False if that is after the deadline."""
+        if not self.realtime:
+            return True
+        if due > deadline:
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            return False
+        time.sleep(max(0.0, due - time.perf_counter()))
+        return True
+
+    def _check(self, camera_id) -> bool:
+        return camera_id == CAMERA_ID and self.open and self.present
+
+    # ============== Connection ==============
+
+    def num_of_camera_connected(self):
+        return 1 if self.present else 0
+
+    def cam_init_camera(self, camera_id, roi_width, roi_height, roi_bin, img_type):
+        if camera_id is None:
+            return -1
+        if not self.present:
+            return -2
+        _out(camera_id, CAMERA_ID)
+        self.open = True
+        self.mode = MODE_NORMAL
+        if self.cam_set_ROI(CAMERA_ID, roi_width, roi_height, roi_bin, img_type) != 0:
+            return -6
+        if self.cam_set_pos(CAMERA_ID, (self.sensor_width // roi_bin - roi_width) // 2,
+                            (self.sensor_height // roi_bin - roi_height) // 2) != 0:
+            return -7
+        return 0
+
+    def cam_stop_camera(self, camera_id):
+        if camera_id != CAMERA_ID or not self.open:
+            return -1
+        self._ring_halt()
+        with self._lock:
+            self._video = False
+            self._triggers.clear()
+        self.mode = MODE_NORMAL
+        self._exp_status = EXP_IDLE
+        self.open = False
+        return 0
+
+    # ============== Controls ==============
+
+    def cam_set_pos(self, camera_id, start_x, start_y):
+        if not self._check(camera_id):
+            return -1
+        if (start_x < 0 or start_y < 0 or (start_x + self.width) * self.bin > self.sensor_width
+                or (start_y + self.height) * self.bin > self.sensor_height):
+            return -1
+        # Start position is in binned pixels, as in ASISetStartPos
+        with self._lock:
+            self.start_x, self.start_y = start_x * self.bin, start_y * self.bin
+        return 0
+
+    def cam_get_pos(self, camera_id, start_x, start_y):
+        if not self._check(camera_id):
+            return -1
+        _out(start_x, self.start_x // self.bin)
+        _out(start_y, self.start_y // self.bin)
+        return 0
+
+    def cam_set_ROI(self, camera_id, roi_width, roi_height, roi_bin, img_type):
+        if not self._check(camera_id):
+            return -1
+        # ASI constraints: width a multiple of 8, height of 2, inside the binned sensor
+        if (img_type not in BYTES_PER_PIXEL or roi_bin not in (1, 2, 3, 4) or roi_width <= 0
+                or roi_height <= 0 or roi_width % 8 or roi_height % 2
+                or roi_width * roi_bin > self.sensor_width or roi_height * roi_bin > self.sensor_height):
+            return -1
+        with self._lock:
+            self.width, self.height, self.bin, self.img_type = roi_width, roi_height, roi_bin, img_type
+            # The SDK keeps the ROI on the sensor by moving it back to the origin if needed
+            if (self.start_x + roi_width * roi_bin > self.sensor_width
+                    or self.start_y + roi_height * roi_bin > self.sensor_height):
+                self.start_x = self.start_y = 0
+        return 0
+
+    def cam_get_ROI(self, camera_id, roi_width, roi_height, roi_bin, img_type):
+        if not self._check(camera_id):
+            return -1
+        for ref, value in zip((roi_width, roi_height, roi_bin, img_type),
+                              (self.width, self.height, self.bin, self.img_type)):
+            _out(ref, value)
+        return 0
+
+    def _set_control(self, camera_id, name, value, auto, low, high):
+        if not self._check(camera_id) or not low <= value <= high:
+            return -1
+        with self._lock:
+            self.controls[name] = [value, auto]
+        return 0
+
+    def _get_control(self, camera_id, name, value, auto):
+        if not self._check(camera_id):
+            return -1
+        _out(value, self.controls[name][0])
+        _out(auto, self.controls[name][1])
+        return 0
+
+    def cam_set_exposure(self, camera_id, value, auto):
+        return self._set_control(camera_id, 'exposure', value, auto, *EXPOSURE_RANGE_US)
+
+    def cam_get_exposure(self, camera_id, value, auto):
+        return self._get_control(camera_id, 'exposure', value, auto)
+
+    def cam_get_exposure_range(self, camera_id, min_value, max_value):
+        if not self._check(camera_id):
+            return -1
+        _out(min_value, EXPOSURE_RANGE_US[0])
+        _out(max_value, EXPOSURE_RANGE_US[1])
+        return 0
+
+    def cam_set_gain(self, camera_id, value, auto):
+        return self._set_control(camera_id, 'gain', value, auto, *GAIN_RANGE)
+
+    def cam_get_gain(self, camera_id, value, auto):
+        return self._get_control(camera_id, 'gain', value, auto)
+
+    def cam_get_gain_range(self, camera_id, min_value, max_value):
+        if not self._check(camera_id):
+            return -1
+        _out(min_value, GAIN_RANGE[0])
+        _out(max_value, GAIN_RANGE[1])
+        return 0
+
+    def cam_set_offset(self, camera_id, value, auto):
+        return self._set_control(camera_id, 'offset', value, auto, 0, 255)
+
+    def cam_get_offset(self, camera_id, value, auto):
+        return self._get_control(camera_id, 'offset', value, auto)
+
+    def cam_get_dimension_range(self, camera_id, min_width, max_width, min_height, max_height):
+        if not self._check(camera_id):
+            return -2
+        for ref, value in zip((min_width, max_width, min_height, max_height),
+                              (1, self.sensor_width, 1, self.sensor_height)):
+            _out(ref, value)
+        return 0
+
+    # ============== Video Mode ==============
+
+    def cam_start_video(self, camera_id):
+        if not self._check(camera_id):
+            return -1
+        if not callable(self.scene):
+            # Render the bank now so it does not stall (and drop) the first frames
+            self._noise_bank(0.0)
+        with self._lock:
+            self._video = True
+            self._video_start = time.perf_counter()
+            self._delivered = 0
+            self._dropped = 0
+            self._triggers.clear()
+        return 0
+
+    def cam_stop_video(self, camera_id):
+        if not self._check(camera_id):
+            return -1
+        self._ring_halt()
+        with self._lock:
+            self._video = False
+            self._triggers.clear()
+        return 0
+
+    def cam_get_frame(self, camera_id, buffer, buffer_size, wait_ms):
+        if not buffer or buffer_size <= 0:
+            return -100
+        if not self._check(camera_id) or not self._video:
+            return -1
+        now = time.perf_counter()
+        # Negative wait_ms waits forever, as in ASIGetVideoData
+        deadline = now + wait_ms / 1000 if wait_ms >= 0 else float('inf')
+
+        if self.mode != MODE_NORMAL:
+            while True:
+                with self._lock:
+                    due = self._triggers[0] + self._exposure_s() if self._triggers else None
+                if due is not None:
+                    break
+                if time.perf_counter() >= deadline:
+                    return -1
+                time.sleep(0.001)
+            if not self._wait_until(due, deadline):
+                return -1
+            with self._lock:
+                self._triggers.pop(0)
+                index = self._delivered
+                self._delivered += 1
+            return 0 if self._fill(buffer, buffer_size, index, due) else -1
+
+        period = self._frame_period()
+        with self._lock:
+            index = self._delivered
+            if self.realtime:
+                # Frames finished so far; the SDK keeps only the newest few
+                produced = int((now - self._video_start) / period)
+                if produced - index > VIDEO_BUFFER_FRAMES:
+                    self._dropped += produced - VIDEO_BUFFER_FRAMES - index
+                    index = produced - VIDEO_BUFFER_FRAMES
+            due = self._video_start + (index + 1) * period
+        if not self._wait_until(due, deadline):
+            return -1
+        with self._lock:
+            self._delivered = index + 1
+        return 0 if self._fill(buffer, buffer_size, index, due) else -1
+
+    def cam_get_dropped_frames(self, camera_id, dropped):
+        if not self._check(camera_id):
+            return -1
+        _out(dropped, self._dropped)
+        return 0
+
+    # ============== Capture Ring ==============
+
+    def _ring_loop(self, ring: _CaptureRing):
+        pointer = ring.spare.ctypes.data_as(POINTER(c_ubyte))
+        while ring.running:
+            if self.cam_get_frame(CAMERA_ID, pointer, ring.frame_size, 100) != 0:
+                if not self._video or not self.present:
+                    time.sleep(0.1)
+                continue
+            with ring.cond:
+                seq = ring.captured + 1
+                slot = (seq - 1) % len(ring.slots)
+                ring.slots[slot], ring.spare = ring.spare, ring.slots[slot]
+                pointer = ring.spare.ctypes.data_as(POINTER(c_ubyte))
+                ring.captured = seq
+                ring.dropped = self._dropped
+                ring.cond.notify_all()
+
+    def _ring_halt(self):
+        ring = self._ring
+        if ring is None or not ring.running:
+            return
+        with ring.cond:
+            ring.running = False
+            ring.cond.notify_all()
+        if ring.thread is not threading.current_thread():
+            ring.thread.join()
+
+    def cam_ring_start(self, camera_id, n_slots):
+        if n_slots < 2:
+            return -1
+        self._ring_halt()
+        if not self._check(camera_id):
+            return -2
+        ring = _CaptureRing(n_slots, self._frame_bytes())
+        if self.cam_start_video(camera_id) != 0:
+            return -3
+        ring.thread = threading.Thread(target=self._ring_loop, args=(ring,),
+                                       name="sim-camera-ring", daemon=True)
+        self._ring = ring
+        ring.thread.start()
+        return 0
+
+    def cam_ring_stop(self, camera_id):
+        self._ring_halt()
+        return self.cam_stop_video(camera_id)
+
+    def cam_ring_latest(self, camera_id, buffer, buffer_size, seq):
+        if not buffer or seq is None:
+            return -100
+        ring = self._ring
+        if camera_id != CAMERA_ID or ring is None or not ring.running:
+            return -1
+        if buffer_size < ring.frame_size:
+            return -100
+        with ring.cond:
+            if ring.captured <= seq._obj.value:
+                return 1
+            _out(seq, ring.copy(ring.captured, buffer))
+        return 0
+
+    def cam_ring_read(self, camera_id, seq, buffer, buffer_size, wait_ms):
+        if not buffer or seq is None or seq._obj.value == 0:
+            return -100
+        ring = self._ring
+        if camera_id != CAMERA_ID or ring is None or not ring.running:
+            return -1
+        if buffer_size < ring.frame_size:
+            return -100
+        wanted = seq._obj.value
+        with ring.cond:
+            arrived = ring.cond.wait_for(lambda: not ring.running or ring.captured >= wanted,
+                                         wait_ms / 1000 if wait_ms >= 0 else None)
+            if not arrived:
+                return -2
+            if not ring.running:
+                return -1
+            _out(seq, ring.copy(wanted, buffer))
+        return 0
+
+    def cam_ring_stats(self, camera_id, dropped, captured):
+        ring = self._ring
+        if camera_id != CAMERA_ID or ring is None:
+            return -1
+        with ring.cond:
+            _out(dropped, ring.dropped)
+            _out(captured, ring.captured)
+        return 0
+
+    # ============== Trigger Mode ==============
+
+    def cam_is_trigger_cam(self, camera_id, is_trigger):
+        if not self._check(camera_id):
+            return -1
+        _out(is_trigger, 1 if self.trigger_cam else 0)
+        return 0
+
+    def cam_set_camera_mode(self, camera_id, mode):
+        if not self._check(camera_id) or not 0 <= mode <= 6:
+            return -1
+        if mode != MODE_NORMAL and not self.trigger_cam:
+            return -1
+        with self._lock:
+            self.mode = mode
+            self._triggers.clear()
+        return 0
+
+    def cam_get_camera_mode(self, camera_id, mode):
+        if not self._check(camera_id):
+            return -1
+        _out(mode, self.mode)
+        return 0
+
+    def cam_send_soft_trigger(self, camera_id, start):
+        if not self._check(camera_id) or self.mode not in (MODE_TRIG_SOFT_EDGE, MODE_TRIG_SOFT_LEVEL):
+            return -1
+        if start:
+            self.external_trigger()
+        return 0
+
+    # ============== Snap Mode ==============
+
+    def cam_start_exposure(self, camera_id, is_dark):
+        if not self._check(camera_id) or self._exp_status == EXP_WORKING:
+            return -1
+        self._exposure = (time.perf_counter(), bool(is_dark))
+        self._exp_status = EXP_WORKING
+        return 0
+
+    def cam_get_exposure_status(self, camera_id, status):
+        if not self._check(camera_id):
+            return -1
+        if self._exp_status == EXP_WORKING and (
+                not self.realtime or time.perf_counter() >= self._exposure[0] + self._exposure_s()):
+            self._exp_status = EXP_SUCCESS
+        _out(status, self._exp_status)
+        return 0
+
+    def cam_stop_exposure(self, camera_id):
+        if not self._check(camera_id):
+            return -1
+        if self._exp_status == EXP_WORKING:
+            self._exp_status = EXP_IDLE
+        return 0
+
+    def cam_get_data_after_exp(self, camera_id, buffer, buffer_size):
+        if not buffer or buffer_size <= 0 or not self._check(camera_id) or self._exp_status != EXP_SUCCESS:
+            return -1
+        start, is_dark = self._exposure
+        self._exp_status = EXP_IDLE
+        with self._lock:
+            index = self._delivered
+            self._delivered += 1
+        return 0 if self._fill(buffer, buffer_size, index, start, dark=is_dark) else -1
+
+    def cam_snap(self, camera_id, buffer, buffer_size, is_dark, timeout_ms):
+        if not buffer or buffer_size <= 0:
+            return -1
+        if not self._check(camera_id):
+            return -2
+        self.cam_stop_video(camera_id)
+        if self.cam_start_exposure(camera_id, is_dark) != 0:
+            return -2
+        start = self._exposure[0]
+        deadline = start + timeout_ms / 1000 if timeout_ms > 0 else float('inf')
+        if not self._wait_until(start + self._exposure_s(), deadline):
+            self.cam_stop_exposure(camera_id)
+            return -5
+        self._exp_status = EXP_SUCCESS
+        if self.cam_get_data_after_exp(camera_id, buffer, buffer_size) != 0:
+            return -6
+        return 0
@@ -0,0 +1,717 @@
+"""
+sim_dmd.py
+Simulated dmd_api library for machines without a DLPC900 or Windows
+
+SimulatedDMDLibrary implements every function of dmd_wrapper.DMD_PROTOTYPES
+with the same ctypes calling convention, so DMD(backend="sim") runs the
+wrapper, DMDWorker and everything above them unchanged. The displayed
+pattern is kept in an in-memory framebuffer. The device side of each call is
+charged from a USB model instead of being measured: the splash size is
+computed the way the native RLE encoder lays it out, split into 504-byte
+PATMEM_LOAD_DATA commands, 64-byte HID reports and error-check round trips,
+as in LCR_PatternMemLoadStream. The modelled stage times are returned by
+dmd_get_last_timings and, in realtime mode, slept for, so host-side
+benchmarks see the same waits they would on hardware.
+
+The pattern cache, command elision and playback rules follow dmd_image.c.
+
+TRIG_OUT_1 is modelled by trigger_out_callback: set it to a callable (for
+example SimulatedCameraLibrary.external_trigger) and it is called at the
+start of every pattern exposure of the running LUT, shifted by the rising
+edge delay of dmd_configure_trigger_out, on a timer thread.
+"""
+
+import ctypes
+import threading
+import time
+
+import numpy as np
+
+from bmp_generator import CANVAS_W, CANVAS_H
+
+# Mirror array the patterns are generated for (bmp_generator canvas, and the
+# size of test_patterns/testBMP*.bmp shown by dmd_load_white/black/half)
+DMD_WIDTH = CANVAS_W
+DMD_HEIGHT = CANVAS_H
+
+PATTERNS_PER_IMAGE = 24
+MAX_SEQUENCE_PATTERNS = 1024
+MIN_EXPOSURE_US = 105
+MAX_LUT_TIME_US = 0xFFFFFF
+MIN_TRIG_OUT_DELAY_US = -20
+MAX_TRIG_OUT_DELAY_US = 20000
+MAX_CACHE_SLOTS = 16
+DEFAULT_CACHE_SLOTS = 16
+REPEAT_FOREVER = 0xFFFFFFFF
+
+# Splash and upload framing (splash.c, API.c)
+SPLASH_HEADER_BYTES = 48
+UPLOAD_CHUNK_BYTES = 504
+UPLOAD_OVERHEAD_BYTES = 8       # HID head, command and length of one PATMEM_LOAD_DATA
+HID_REPORT_BYTES = 64
+LUT_ENTRY_COMMANDS = 1          # One MBOX_DATA command per 12-byte LUT entry
+
+
+def _runs_size(pixels: np.ndarray) -> int:
+    """
+    Size of the RLE stream (without splash header) that RLE_CompressBits or
+    RLE_CompressBMP produce for a 2-D array of pixel values.
+    """
+    height, width = pixels.shape
+    starts = np.ones((height, width), dtype=bool)
+    starts[:, 1:] = pixels[:, 1:] != pixels[:, :-1]
+    rows, cols = np.nonzero(starts)
+    bounds = np.searchsorted(rows, np.arange(height + 1))
+
+    def raw_bytes(raw):
+        return 0 if raw == 0 else (4 if raw == 1 else 2 + raw * 3)
+
+    pos = 0
+    for y in range(height):
+        row_starts = cols[bounds[y]:bounds[y + 1]]
+        raw = 0
+        for length in np.diff(np.append(row_starts, width)).tolist():
+            # Runs are capped at 255 pixels; a single pixel left over is raw
+            while length > 0:
+                chunk = min(length, 255)
+                length -= chunk
+                if chunk > 1:
+                    pos += raw_bytes(raw) + 4
+                    raw = 0
+                else:
+                    raw += 1
+                    if raw == 255:
+                        pos += raw_bytes(raw)
+                        raw = 0
+        pos += raw_bytes(raw)
+        if y == height - 1:
+            break
+        pos += 2                        # End of line
+        pos += (4 - (pos & 3)) & 3      # Lines start on a 4-byte boundary
+    pos += 2                            # End of image
+    pos += (16 - (pos & 0xF)) & 0xF
+    return pos
+
+
+def splash_size(pixels: np.ndarray) -> int:
+    """Size in bytes of the RLE splash image for a 2-D array of pixel values."""
+    return SPLASH_HEADER_BYTES + _runs_size(pixels)
+
+
+def upload_counts(size: int, ack_interval: int) -> tuple[int, int]:
+    """
+    HID reports and error-check round trips LCR_PatternMemLoadStream needs
+    for size bytes of splash data.
+
+    Returns:
+        (packets, acks)
+    """
+    messages, tail = divmod(size, UPLOAD_CHUNK_BYTES)
+    per_message = -(-(UPLOAD_CHUNK_BYTES + UPLOAD_OVERHEAD_BYTES) // HID_REPORT_BYTES)
+    packets = messages * per_message
+    if tail:
+        packets += -(-(tail + UPLOAD_OVERHEAD_BYTES) // HID_REPORT_BYTES)
+        messages += 1
+    if ack_interval <= 0:
+        return packets, 1 if messages else 0
+    return packets, -(-messages // ack_interval)
+
+
+def _out(ref, value):
+    """Store value through a byref() argument."""
+    ref._obj.value = value
+
+
+def _unpack(ptr, count: int, width: int, height: int) -> np.ndarray:
+    """Copy count packed 1-bit patterns from a ctypes pointer into a bool stack."""
+    row_bytes = (width + 7) // 8
+    data = np.frombuffer(ctypes.string_at(ptr, count * row_bytes * height), dtype=np.uint8)
+    bits = np.unpackbits(data.reshape(count, height, row_bytes), axis=2, count=width)
+    return bits.astype(bool)
+
+
+class SimulatedDMDLibrary:
+    """In-memory stand-in for dmd_api.dll with a USB timing model"""
+
+    def __init__(self, realtime: bool = True, report_us: float = 1000.0, ack_us: float = 1000.0,
+                 width: int = DMD_WIDTH, height: int = DMD_HEIGHT):
+        """
+        Args:
+            realtime: Sleep for the modelled device time of every call
+            report_us: Cost of one 64-byte HID report (full-speed HID sends
+                       one per 1 ms frame)
+            ack_us: Cost of reading one reply (error check or command ack)
+            width: Mirror columns of the simulated DMD
+            height: Mirror rows of the simulated DMD
+        """
+        self.realtime = realtime
+        self.report_us = report_us
+        self.ack_us = ack_us
+        self.width = width
+        self.height = height
+
+        # Set present = False to simulate an unplugged device
+        self.present = True
+        self.connected = False
+        self.quiet = False
+        self.power_mode = 0
+        self.idle = False
+        self.pattern_mode = 0
+        self.leds = [1, 1, 1, 1]
+        self.trigger_out = {1: (0, 0, 0), 2: (0, 0, 0)}
+        # Called with no arguments on every TRIG_OUT_1 rising edge
+        self.trigger_out_callback = None
+
+        self.playback = (500000, 0, 7, REPEAT_FOREVER, 0)
+        self.ack_interval = 0
+        self.cache_num_slots = DEFAULT_CACHE_SLOTS
+        self.cache_stats = [0, 0, 0]
+        self.elided = [0, 0, 0]
+        self.timings = {}
+        self._modelled_us = 0.0
+
+        # Pattern memory: image index -> bool stack of its bit planes
+        self.memory = {}
+        self._slots = [None] * MAX_CACHE_SLOTS     # [hash, last_use] per image index
+        self._clock = 0
+        self._state = {}
+        self._sequence = None
+        self._sequence_images = 0   # Image indices 0..n-1 held by a running sequence
+        self._lock = threading.Lock()
+        self._invalidate_cache()
+
+    # ============== Framebuffer ==============
+
+    def framebuffer(self, t: float = None):
+        """
+        Pattern on the mirrors at time t (time.perf_counter(), default now),
+        following the running LUT's exposure, dark time and repeat count.
+
+        Returns:
+            2-D bool array, or None when no pattern is displayed
+        """
+        with self._lock:
+            sequence = self._sequence
+        if sequence is None:
+            return None
+        planes, exposure_us, dark_us, repeat, start = sequence
+        period_us = exposure_us + dark_us
+        elapsed_us = ((time.perf_counter() if t is None else t) - start) * 1e6
+        step, within = divmod(max(elapsed_us, 0.0), period_us)
+        step = int(step)
+        if repeat != REPEAT_FOREVER and step >= len(planes) * repeat:
+            return np.zeros_like(planes[0])
+        if within >= exposure_us:
+            return np.zeros_like(planes[0])
+        return planes[step % len(planes)]
+
+    # ============== Model ==============
+
+    def _log(self, message):
+        if not self.quiet:
+            print(message)
+
+    def _spend(self, stage: str, us: float):
+        """Charge modelled device time to a timing stage."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + us
+        self._modelled_us += us
+        if self.realtime and us > 0:
+            time.sleep(us / 1e6)
+
+    def _commands(self, count: int) -> float:
+        """Cost of count acknowledged single-report commands."""
+        return count * (self.report_us + self.ack_us)
+
+    def _begin(self):
+        self.timings = {}
+        self._modelled_us = 0.0
+        return time.perf_counter()
+
+    def _finish(self, start):
+        # Host time, plus the device time that was not slept for
+        total_us = (time.perf_counter() - start) * 1e6
+        self.timings['total_us'] = total_us if self.realtime else total_us + self._modelled_us
+
+    def _require_connection(self) -> bool:
+        if not (self.connected and self.present):
+            print("ERROR: DLPC900 not connected")
+            return False
+        return True
+
+    def _invalidate_cache(self):
+        self._slots = [None] * MAX_CACHE_SLOTS
+        self._sequence_images = 0
+        self._invalidate_state()
+
+    def _invalidate_state(self):
+        self._state = {'otf': False, 'leds': False, 'displaying': False,
+                       'hash': None, 'image': 0, 'bit': 0, 'playback': None}
+
+    def _show(self, planes, exposure_us, dark_us, repeat, lut: bool = True):
+        with self._lock:
+            self._sequence = (planes, exposure_us, dark_us, repeat, time.perf_counter())
+            sequence = self._sequence
+        # TRIG_OUT_1 frames LUT exposures only, not the test pattern
+        if lut and self.trigger_out_callback is not None:
+            threading.Thread(target=self._trigger_out_loop, args=(sequence,),
+                             name="sim-dmd-trig-out", daemon=True).start()
+
+    def _trigger_out_loop(self, sequence):
+        """Fire trigger_out_callback at every exposure start until the LUT stops or ends."""
+        planes, exposure_us, dark_us, repeat, start = sequence
+        period_s = (exposure_us + dark_us) / 1e6
+        rising_s = self.trigger_out[1][1] / 1e6
+        total = None if repeat == REPEAT_FOREVER else len(planes) * repeat
+        step = 0
+        while total is None or step < total:
+            delay = start + step * period_s + rising_s - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                if self._sequence is not sequence:
+                    return
+            callback = self.trigger_out_callback
+            if callback is None:
+                return
+            callback()
+            step += 1
+
+    def _stop(self):
+        with self._lock:
+            self._sequence = None
+        self._state['displaying'] = False
+        self._sequence_images = 0
+
+    # ============== Connection ==============
+
+    def dmd_is_connected(self):
+        return 0 if self.connected and self.present else -1
+
+    def dmd_connect(self):
+        self._invalidate_cache()
+        self.connected = False
+        if not self.present:
+            print("ERROR: Cannot connect to DLPC900. Is the device connected?")
+            return -1
+        self.connected = True
+        print("Connected to DLPC900 (simulated)")
+        return 0
+
+    def dmd_disconnect(self):
+        self._invalidate_cache()
+        self.connected = False
+        return 0
+
+    # ============== Status ==============
+
+    def dmd_get_status(self, hw, sys, main, dlpa, dmd):
+        if not self._require_connection():
+            return -1
+        _out(hw, 0x01)
+        _out(sys, 0x01)
+        _out(main, 0x00 if self._sequence is None else 0x04)
+        _out(dlpa, 0x00)
+        _out(dmd, 0x00)
+        return 0
+
+    def dmd_get_version(self, app, api, swconfig, seqconfig):
+        if not self._require_connection():
+            return -1
+        for ref, version in ((app, 0x06000000), (api, 0x06000000),
+                             (swconfig, 0x01000000), (seqconfig, 0x01000000)):
+            _out(ref, version)
+        return 0
+
+    def dmd_get_power_mode(self, mode):
+        if not self._require_connection():
+            return -1
+        _out(mode, self.power_mode)
+        return 0
+
+    def dmd_set_standby(self):
+        if not self._require_connection():
+            return -1
+        self._invalidate_cache()
+        self._stop()
+        self.power_mode = 1
+        return 0
+
+    def dmd_set_normal(self):
+        if not self._require_connection():
+            return -1
+        self.power_mode = 0
+        return 0
+
+    def dmd_toggle_idle(self):
+        if not self._require_connection():
+            return -1
+        self.idle = not self.idle
+        return 0
+
+    # ============== Pattern Mode ==============
+
+    def dmd_set_otf_mode(self):
+        if not self._require_connection():
+            return -1
+        self._invalidate_cache()
+        self._stop()
+        self.pattern_mode = 3
+        return 0
+
+    def dmd_set_disable_mode(self):
+        if not self._require_connection():
+            return -1
+        self._invalidate_cache()
+        self._stop()
+        self.pattern_mode = 0
+        return 0
+
+    def dmd_get_pattern_mode(self, mode):
+        if not self._require_connection():
+            return -1
+        _out(mode, self.pattern_mode)
+        return 0
+
+    def dmd_clear_pattern(self):
+        self._invalidate_state()
+        if not self._require_connection():
+            return -1
+        self._stop()
+        return 0
+
+    def dmd_show_tpg(self):
+        if not self._require_connection():
+            return -1
+        self._invalidate_cache()
+        y, x = np.indices((self.height, self.width))
+        checkerboard = ((y // 120 + x // 120) % 2).astype(bool)
+        self.pattern_mode = 0
+        self._show(checkerboard[None], 1, 0, REPEAT_FOREVER, lut=False)
+        return 0
+
+    # ============== LED Control ==============
+
+    def dmd_set_led_enables(self, seq, red, green, blue):
+        if not self._require_connection():
+            return -1
+        # As dmd_api.c: the next display sends the full command sequence
+        self._invalidate_state()
+        self.leds = [seq, red, green, blue]
+        return 0
+
+    def dmd_get_led_enables(self, seq, red, green, blue):
+        if not self._require_connection():
+            return -1
+        for ref, value in zip((seq, red, green, blue), self.leds):
+            _out(ref, value)
+        return 0
+
+    # ============== Image Display ==============
+
+    def _prepare_display(self) -> bool:
+        """Switch to OTF mode and enable the LEDs unless already done."""
+        if self._state['otf']:
+            self.elided[0] += 1
+        elif self.pattern_mode != 3:
+            # Mode switch: stop, set mode, read back
+            self._spend('otf_us', self._commands(3))
+            self._invalidate_cache()
+            self.pattern_mode = 3
+        self._state['otf'] = True
+
+        if self._state['leds']:
+            self.elided[1] += 1
+        else:
+            self._spend('led_us', self._commands(1))
+            self.leds = [1, 1, 1, 1]
+            self._state['leds'] = True
+        return True
+
+    def _upload(self, planes: np.ndarray, image_index: int) -> bool:
+        """Charge the splash conversion and upload of one image index."""
+        start = time.perf_counter()
+        if len(planes) == 1:
+            pixels = planes[0]
+        else:
+            # Pattern k in bit k of the 24-bit pixel, as pack_bit_planes does
+            pixels = np.zeros(planes.shape[1:], dtype=np.uint32)
+            for k, plane in enumerate(planes):
+                pixels |= plane.astype(np.uint32) << np.uint32(k)
+        size = splash_size(pixels)
+        self.timings['splash_us'] = self.timings.get('splash_us', 0.0) + (time.perf_counter() - start) * 1e6
+
+        packets, acks = upload_counts(size, self.ack_interval)
+        self.timings['upload_bytes'] = self.timings.get('upload_bytes', 0) + size
+        self.timings['upload_packets'] = self.timings.get('upload_packets', 0) + packets
+        self.timings['upload_acks'] = self.timings.get('upload_acks', 0) + acks
+        # InitPatternMemLoad, then the stream
+        self._spend('upload_us', self._commands(1) + packets * self.report_us + acks * self.ack_us)
+        self.memory[image_index] = planes
+        self._log(f"  Simulated upload to image index {image_index} ({size} bytes, {packets} reports, {acks} acks)")
+        return True
+
+    def _send_lut(self, entries: int):
+        """Charge PatternDisplay(0), the mailbox LUT and the validate/start commands."""
+        self._spend('lut_us', self._commands(1 + 3 + entries * LUT_ENTRY_COMMANDS + 3))
+
+    def _cache_lookup(self, key):
+        for index in range(self.cache_num_slots):
+            slot = self._slots[index]
+            if slot and slot[0] == key:
+                self._clock += 1
+                slot[1] = self._clock
+                return index
+        return None
+
+    def _cache_claim(self, key):
+        """Slot for a new pattern, or None when the running LUT holds every slot."""
+        choice = None
+        for index in range(self._sequence_images, self.cache_num_slots):
+            slot = self._slots[index]
+            if slot is None:
+                choice = index
+                break
+            # Never evict the pattern on the mirrors
+            if self._state['displaying'] and slot[0] == self._state['hash']:
+                continue
+            if choice is None or slot[1] < self._slots[choice][1]:
+                choice = index
+        if choice is None:
+            return None
+        if self._slots[choice] is not None:
+            self.cache_stats[2] += 1
+        self._clock += 1
+        self._slots[choice] = [key, self._clock]
+        return choice
+
+    def _ensure_uploaded(self, pattern: np.ndarray, key, stop_display: bool):
+        index = self._cache_lookup(key)
+        if index is not None:
+            self.cache_stats[0] += 1
+            return index
+        self.cache_stats[1] += 1
+        index = self._cache_claim(key)
+        if index is None and stop_display:
+            self._spend('lut_us', self._commands(1))
+            self._stop()
+            index = self._cache_claim(key)
+        if index is None:
+            print("ERROR: Every cache slot holds an image of the running pattern LUT")
+            return None
+        self._upload(pattern[None], index)
+        return index
+
+    def _display_pattern(self, pattern: np.ndarray) -> int:
+        if not self._require_connection():
+            return -1
+        key = (pattern.shape, hash(np.packbits(pattern).tobytes()))
+        # A finite LUT may have run out, so only a looping one is skipped
+        if (self._state['displaying'] and self._state['hash'] == key and self.playback[3] == REPEAT_FOREVER
+                and self._state['playback'] == self.playback):
+            self.elided[2] += 1
+            return 0
+        self._prepare_display()
+        index = self._ensure_uploaded(pattern, key, stop_display=True)
+        if index is None:
+            return -1
+        self._send_lut(1)
+        exposure_us, dark_us, _, repeat, _ = self.playback
+        self._show(self.memory[index][:1], exposure_us, dark_us, repeat)
+        self._sequence_images = 0
+        self._state.update(displaying=True, hash=key, image=index, bit=0, playback=self.playback)
+        return 0
+
+    def dmd_display_bmp(self, filename):
+        start = self._begin()
+        try:
+            from PIL import Image
+            with Image.open(filename.decode('utf-8')) as image:
+                if image.mode != '1':
+                    print(f"ERROR: Only 1-bit BMP images are supported (got {image.mode})")
+                    return -1
+                pattern = np.array(image, dtype=bool)
+        except OSError:
+            print(f"ERROR: Cannot read BMP file: {filename.decode('utf-8')}")
+            return -1
+        self.timings['load_us'] = (time.perf_counter() - start) * 1e6
+        result = self._display_pattern(pattern)
+        self._finish(start)
+        return result
+
+    def dmd_display_buffer(self, bits, width, height):
+        start = self._begin()
+        if not bits or width <= 0 or height <= 0:
+            print("ERROR: Invalid pattern buffer")
+            return -1
+        result = self._display_pattern(_unpack(bits, 1, width, height)[0])
+        self._finish(start)
+        return result
+
+    def dmd_preload_buffer(self, bits, width, height):
+        start = self._begin()
+        if not bits or width <= 0 or height <= 0:
+            print("ERROR: Invalid pattern buffer")
+            return -1
+        if not self._require_connection():
+            return -1
+        pattern = _unpack(bits, 1, width, height)[0]
+        self._prepare_display()
+        index = self._ensure_uploaded(pattern, (pattern.shape, hash(np.packbits(pattern).tobytes())),
+                                      stop_display=False)
+        self._finish(start)
+        return 0 if index is not None else -1
+
+    def _check_playback(self, exposure_us, dark_us, led_select, wait_for_trigger) -> bool:
+        if not MIN_EXPOSURE_US <= exposure_us <= MAX_LUT_TIME_US:
+            print(f"ERROR: 1-bit exposure must be {MIN_EXPOSURE_US}..{MAX_LUT_TIME_US} us (got {exposure_us})")
+            return False
+        if not 0 <= dark_us <= MAX_LUT_TIME_US:
+            print(f"ERROR: Dark time must be 0..{MAX_LUT_TIME_US} us (got {dark_us})")
+            return False
+        if not 0 <= led_select <= 7:
+            print(f"ERROR: LED select must be 0..7 (got {led_select})")
+            return False
+        if wait_for_trigger not in (0, 1):
+            print(f"ERROR: Wait for trigger must be 0 or 1 (got {wait_for_trigger})")
+            return False
+        return True
+
+    def dmd_play_sequence(self, bits, count, width, height, exposure_us, dark_us, repeat):
+        start = self._begin()
+        if not bits or width <= 0 or height <= 0:
+            print("ERROR: Invalid pattern buffer")
+            return -1
+        if not 1 <= count <= MAX_SEQUENCE_PATTERNS:
+            print(f"ERROR: Sequence must have 1..{MAX_SEQUENCE_PATTERNS} patterns (got {count})")
+            return -1
+        if not self._check_playback(exposure_us, dark_us, self.playback[2], self.playback[4]):
+            return -1
+        if not self._require_connection():
+            return -1
+        patterns = _unpack(bits, count, width, height)
+        self._prepare_display()
+        self._stop()
+
+        num_images = -(-count // PATTERNS_PER_IMAGE)
+        for index in range(self.cache_num_slots):
+            if self._slots[index] is not None and index < num_images:
+                self._slots[index] = None
+        for image in range(num_images):
+            self._upload(patterns[image * PATTERNS_PER_IMAGE:(image + 1) * PATTERNS_PER_IMAGE], image)
+
+        self._send_lut(count)
+        self._show(patterns, exposure_us, dark_us, repeat)
+        self._sequence_images = num_images
+        self._finish(start)
+        return 0
+
+    def dmd_configure_playback(self, exposure_us, dark_us, led_select, repeat, wait_for_trigger):
+        if not self._check_playback(exposure_us, dark_us, led_select, wait_for_trigger):
+            return -1
+        if repeat == 0:
+            print("ERROR: Repeat must be at least 1 (0xFFFFFFFF loops forever)")
+            return -1
+        self.playback = (exposure_us, dark_us, led_select, repeat, wait_for_trigger)
+        if not self._state['displaying'] or (repeat == REPEAT_FOREVER and self._state['playback'] == self.playback):
+            return 0
+
+        # Restart the displayed pattern from device memory
+        start = self._begin()
+        self._send_lut(1)
+        planes = self.memory[self._state['image']][self._state['bit']:self._state['bit'] + 1]
+        self._show(planes, exposure_us, dark_us, repeat)
+        self._state['playback'] = self.playback
+        self._finish(start)
+        return 0
+
+    def dmd_get_playback(self, exposure_us, dark_us, led_select, repeat, wait_for_trigger):
+        for ref, value in zip((exposure_us, dark_us, led_select, repeat, wait_for_trigger), self.playback):
+            _out(ref, value)
+
+    def dmd_configure_trigger_out(self, trig_out, invert, rising_us, falling_us):
+        if trig_out not in (1, 2):
+            print(f"ERROR: Trigger output must be 1 or 2 (got {trig_out})")
+            return -1
+        for delay in (rising_us, falling_us):
+            if not MIN_TRIG_OUT_DELAY_US <= delay <= MAX_TRIG_OUT_DELAY_US:
+                print(f"ERROR: Trigger delays must be {MIN_TRIG_OUT_DELAY_US}..{MAX_TRIG_OUT_DELAY_US} us "
+                      f"(got {rising_us}, {falling_us})")
+                return -1
+        if not self._require_connection():
+            return -1
+        self._stop()
+        self.trigger_out[trig_out] = (1 if invert else 0, rising_us, falling_us)
+        return 0
+
+    def _load_full(self, fill) -> int:
+        start = self._begin()
+        pattern = np.zeros((self.height, self.width), dtype=bool)
+        if fill == 'white':
+            pattern[:] = True
+        elif fill == 'half':
+            pattern[:, :self.width // 2] = True
+        result = self._display_pattern(pattern)
+        self._finish(start)
+        return result
+
+    def dmd_load_white(self):
+        return self._load_full('white')
+
+    def dmd_load_black(self):
+        return self._load_full('black')
+
+    def dmd_load_half(self):
+        return self._load_full('half')
+
+    def dmd_software_reset(self):
+        self._invalidate_cache()
+        if not self._require_connection():
+            return -1
+        self._stop()
+        self.memory.clear()
+        self.pattern_mode = 0
+        return 0
+
+    # ============== Pattern Cache ==============
+
+    def dmd_get_cache_stats(self, hits, misses, evictions):
+        for ref, value in zip((hits, misses, evictions), self.cache_stats):
+            _out(ref, value)
+        return 0
+
+    def dmd_set_cache_slots(self, slots):
+        if not 1 <= slots <= MAX_CACHE_SLOTS:
+            print(f"ERROR: Pattern cache slots must be 1..{MAX_CACHE_SLOTS}")
+            return -1
+        self._invalidate_cache()
+        self.cache_num_slots = slots
+        return 0
+
+    def dmd_invalidate_cache(self):
+        self._invalidate_cache()
+
+    def dmd_get_elided_stats(self, otf, led, display):
+        for ref, value in zip((otf, led, display), self.elided):
+            _out(ref, value)
+        return 0
+
+    def dmd_invalidate_display_state(self):
+        self._invalidate_state()
+
+    # ============== Timing ==============
+
+    def dmd_get_last_timings(self, timings):
+        target = timings._obj
+        for name, _ in target._fields_:
+            setattr(target, name, type(getattr(target, name))(self.timings.get(name, 0)))
+        return 0
+
+    def dmd_set_upload_ack_interval(self, interval):
+        if interval < 0:
+            print("ERROR: Upload ack interval must be >= 0")
+            return -1
+        self.ack_interval = interval
+        return 0
+
+    def dmd_set_quiet(self, quiet):
+        self.quiet = bool(quiet)
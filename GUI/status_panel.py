@@ -13,6 +13,7 @@ class StatusPanel(tk.Frame):
         self.dmd_status.pack(side="left")
 
         self.reset_dmd_callback = None
+        self.dmd_worker = None
         self.reset_btn = tk.Button(self.dmd_row, text="Reset DMD", command=self._on_reset_dmd, padx=6, pady=2)
         self.reset_btn.pack(side="left", padx=6)
 
@@ -28,6 +29,15 @@ class StatusPanel(tk.Frame):
         """
         self.dmd = dmd
 
+    def set_dmd_worker(self, worker):
+        """
+        Set the worker that owns the DMD; commands are queued on it instead
+        of being called from the Tk thread.
+
+        Args:
+            worker: DMDWorker instance
+        """
+        self.dmd_worker = worker
 
     def set_camera_status(self, message: str, connected: bool):
         """
@@ -58,6 +68,12 @@ class StatusPanel(tk.Frame):
     def _on_reset_dmd(self):
         """Software reset the DMD"""
         if self.dmd and self.dmd.connected:
+            if self.dmd_worker:
+                self.dmd_worker.call("software_reset")
+                self.dmd_worker.call("set_disable_mode")
+                done = self.dmd_worker.call("set_otf_mode")
+                done.add_done_callback(lambda f: self.after(0, lambda: messagebox.showinfo("Info", "DMD has been reset.")))
+                return
             self.dmd.software_reset()
             self.dmd.set_disable_mode()
             self.dmd.set_otf_mode()
@@ -0,0 +1,246 @@
+"""
+sync_acquisition.py
+Camera frames exposed under a known DMD pattern
+
+In hardware mode the DMD plays the pattern sequence from its LUT and
+TRIG_OUT_1 (wired to the camera trigger input) starts one exposure per
+pattern, so a scan runs at the camera's frame rate with no host round trip
+per pattern. Soft mode needs no trigger cable: each pattern is shown, then a
+soft trigger (or a snap exposure on cameras without a trigger port) starts
+the exposure while the next pattern uploads.
+
+Every frame comes back stamped with the index of the pattern that was on the
+mirrors:
+
+    sync = SyncAcquisition(dmd, camera)
+    for frame in sync.run_hardware(generate_grid_batch(10), exposure_us=2000):
+        print(frame['pattern_index'], frame['image'].shape)
+
+Both runs call the DMD directly, so use them while no DMDWorker owns it.
+With the simulated DMD and camera (backend="sim") run_hardware connects the
+DMD's TRIG_OUT_1 to the camera's trigger input for the run, as the cable
+would, so it can be tried without hardware. From a protocol file, the
+headless runner's "sync" step runs either mode over a grid.
+"""
+
+import time
+from asi_wrapper import CameraMode, ExpStatus
+
+
+class SyncAcquisition:
+    """Pattern-stamped acquisition with the camera slaved to the DMD"""
+
+    # Extra time allowed for each triggered frame to arrive, in ms
+    FRAME_MARGIN_MS = 500
+
+    def __init__(self, dmd, camera, rising_delay_us: int = 0, falling_delay_us: int = 0):
+        """
+        Args:
+            dmd: Connected DMD instance
+            camera: Initialised ASICamera instance
+            rising_delay_us: TRIG_OUT_1 rising edge delay from the start of exposure
+            falling_delay_us: TRIG_OUT_1 falling edge delay from the end of exposure
+        """
+        self.dmd = dmd
+        self.camera = camera
+        self.rising_delay_us = rising_delay_us
+        self.falling_delay_us = falling_delay_us
+        self.last_stats: dict = {}
+
+    def _stamp(self, image, frame_number: int, pattern_index: int) -> dict:
+        return {
+            'frame_number': frame_number,
+            'pattern_index': pattern_index,
+            'timestamp': time.perf_counter(),
+            'image': image,
+        }
+
+    def run_hardware(self, patterns, exposure_us: int, dark_us: int = 0, repeat: int = 1,
+                     camera_mode: int = CameraMode.TRIG_RISE_EDGE, wait_ms: int = None) -> list[dict] | None:
+        """
+        Play a pattern sequence on the DMD and capture one triggered frame per
+        pattern exposure.
+
+        Frame n was exposed under pattern n % len(patterns). Frames the camera
+        reports as dropped still advance n, so the stamps stay correct after a
+        buffer overrun; only the dropped images are missing.
+
+        Args:
+            patterns: Pattern stack accepted by DMD.play_sequence
+            exposure_us: DMD exposure of each pattern in microseconds
+            dark_us: Dark time after each pattern in microseconds
+            repeat: Number of passes through the sequence (at least 1)
+            camera_mode: CameraMode.TRIG_RISE_EDGE (camera exposure must fit in
+                         exposure_us) or TRIG_HIGH_LEVEL (camera exposes for
+                         exactly as long as TRIG_OUT_1 is high)
+            wait_ms: Per-frame timeout (defaults to one pattern period plus
+                     FRAME_MARGIN_MS)
+
+        Returns:
+            List of dicts with frame_number, pattern_index, timestamp
+            (perf_counter at arrival) and image, or None if setup failed.
+            Counters of the run are left in last_stats.
+        """
+        count = len(patterns)
+        if repeat < 1:
+            raise ValueError(f"Repeat must be at least 1, got {repeat}")
+        if camera_mode not in (CameraMode.TRIG_RISE_EDGE, CameraMode.TRIG_HIGH_LEVEL):
+            raise ValueError(f"Camera mode must be TRIG_RISE_EDGE or TRIG_HIGH_LEVEL, got {camera_mode}")
+        if not self.camera.is_trigger_camera():
+            print("Sync acquisition failed: camera has no trigger port (use run_soft)")
+            return None
+        if camera_mode == CameraMode.TRIG_RISE_EDGE:
+            _, camera_exposure_us, _ = self.camera.get_exposure()
+            if camera_exposure_us + self.rising_delay_us > exposure_us:
+                raise ValueError(f"Camera exposure {camera_exposure_us} us does not fit in the "
+                                 f"{exposure_us} us pattern exposure")
+        if wait_ms is None:
+            wait_ms = (exposure_us + dark_us) // 1000 + self.FRAME_MARGIN_MS
+
+        if not self.dmd.configure_trigger_out(1, False, self.rising_delay_us, self.falling_delay_us):
+            print("Sync acquisition failed: cannot configure TRIG_OUT_1")
+            return None
+        if self.camera.set_camera_mode(camera_mode) != 0:
+            print("Sync acquisition failed: cannot set camera trigger mode")
+            return None
+
+        # No cable between the simulators: wire the DMD trigger output in software
+        simulated = self.dmd.backend == "sim" and self.camera.backend == "sim"
+        if simulated:
+            self.dmd.dll.trigger_out_callback = self.camera.dll.external_trigger
+
+        frames = []
+        expected = count * repeat
+        received = dropped = 0
+        start = time.perf_counter()
+        try:
+            # Arm the camera before the first pattern can fire the trigger
+            if self.camera.start_video() != 0:
+                print("Sync acquisition failed: cannot start video capture")
+                return None
+            if not self.dmd.play_sequence(patterns, exposure_us, dark_us, repeat):
+                print("Sync acquisition failed: cannot play pattern sequence")
+                return None
+
+            while received + dropped < expected:
+                image = self.camera.get_video_frame(wait_ms)
+                if image is None:
+                    break
+                dropped = max(self.camera.get_dropped_frames(), dropped)
+                frame_number = received + dropped
+                frames.append(self._stamp(image, frame_number, frame_number % count))
+                received += 1
+        finally:
+            self.camera.stop_video()
+            self.camera.set_camera_mode(CameraMode.NORMAL)
+            self.dmd.clear_pattern()
+            if simulated:
+                self.dmd.dll.trigger_out_callback = None
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            'expected': expected,
+            'received': received,
+            'dropped': dropped,
+            'missing': expected - received - dropped,
+            'fps': received / elapsed if elapsed > 0 else 0.0,
+        }
+        return frames
+
+    def _expose_soft(self, trigger_camera: bool, wait_ms: int):
+        """Start one exposure under the pattern now on the mirrors; returns a callable collecting it."""
+        if trigger_camera:
+            if self.camera.send_soft_trigger(True) != 0:
+                return None
+            return lambda: self.camera.get_video_frame(wait_ms)
+        if self.camera.start_exposure() != 0:
+            return None
+
+        def collect():
+            deadline = time.monotonic() + wait_ms / 1000
+            while self.camera.get_exposure_status() == ExpStatus.WORKING:
+                if time.monotonic() >= deadline:
+                    self.camera.stop_exposure()
+                    return None
+                time.sleep(0.001)
+            return self.camera.get_data_after_exp()
+        return collect
+
+    def run_soft(self, patterns, wait_ms: int = 1000) -> list[dict] | None:
+        """
+        Show each pattern, then start one exposure under it: a soft trigger in
+        video mode on trigger cameras, a snap exposure on the others. The
+        next pattern is preloaded into a spare image index while the frame is
+        exposed and read out, so each step costs a LUT swap and a frame.
+
+        Args:
+            patterns: Sequence of patterns accepted by DMD.display_array
+            wait_ms: Per-frame timeout
+
+        Returns:
+            List of dicts as run_hardware, or None if setup failed
+        """
+        count = len(patterns)
+        trigger_camera = self.camera.is_trigger_camera()
+        if trigger_camera and self.camera.set_camera_mode(CameraMode.TRIG_SOFT_EDGE) != 0:
+            print("Sync acquisition failed: cannot set camera soft trigger mode")
+            return None
+
+        frames = []
+        start = time.perf_counter()
+        try:
+            if trigger_camera and self.camera.start_video() != 0:
+                print("Sync acquisition failed: cannot start video capture")
+                return None
+            for index in range(count):
+                if not self.dmd.display_array(patterns[index]):
+                    print(f"Sync acquisition failed: cannot display pattern {index}")
+                    break
+                collect = self._expose_soft(trigger_camera, wait_ms)
+                if collect is None:
+                    print(f"Sync acquisition failed: cannot start exposure {index}")
+                    break
+                if index + 1 < count:
+                    self.dmd.preload_array(patterns[index + 1])
+                image = collect()
+                if image is None:
+                    print(f"Sync acquisition: frame {index} timed out")
+                    break
+                frames.append(self._stamp(image, index, index))
+        finally:
+            if trigger_camera:
+                self.camera.stop_video()
+                self.camera.set_camera_mode(CameraMode.NORMAL)
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            'expected': count,
+            'received': len(frames),
+            'dropped': 0,
+            'missing': count - len(frames),
+            'fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+        }
+        return frames
+
+
+# ============== Usage Example ==============
+
+if __name__ == "__main__":
+    from asi_wrapper import ASICamera, ImgType
+    from bmp_generator import generate_grid_batch
+    from dmd_wrapper import DMD
+
+    camera = ASICamera()
+    dmd = DMD()
+    if camera.init_camera(1920, 1080, img_type=ImgType.RAW8) == 0 and dmd.connect():
+        camera.set_exposure(1500)
+        dmd.set_quiet()
+        sync = SyncAcquisition(dmd, camera)
+        patterns = generate_grid_batch(10)
+        if camera.is_trigger_camera():
+            frames = sync.run_hardware(patterns, exposure_us=2000)
+        else:
+            frames = sync.run_soft(patterns)
+        print(f"{len(frames or [])} frames, {sync.last_stats}")
+        camera.stop_camera()
+        dmd.disconnect()
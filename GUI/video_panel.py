@@ -2,9 +2,6 @@ import tkinter as tk
 from PIL import Image, ImageTk
 import numpy as np
 import threading
-import queue
-import time
-import contextlib
 
 
 class VideoPanel(tk.Frame):
@@ -25,10 +22,17 @@ class VideoPanel(tk.Frame):
         self._current_image = None
         self._image_id = None
 
-        self.frame_queue = queue.Queue(maxsize=1)  
-        self._capture_thread = None
-        self._stop_event = threading.Event()
+        # The camera's capture thread fills a frame ring; each UI tick copies
+        # out the newest frame, so nothing here polls or sleeps. An
+        # asi_api.dll without the ring is polled on the start thread instead,
+        # which keeps the newest frame in _polled
+        self.ring_slots = 4
+        self._start_thread = None
+        self._seq = 0  # Last frame shown
+        self._polled = None
+        self._polled_lock = threading.Lock()
         self._last_canvas_size = (0, 0)
+        self.on_first_frame = None  # One-shot callback after the first frame is drawn
 
         self.canvas.bind("<Configure>", self._on_resize)
     
@@ -54,13 +58,14 @@ class VideoPanel(tk.Frame):
         if self.camera is None or not self.camera.is_connected:
             print("Cannot start stream: camera not connected")
             return False
-        # Start capture thread; the thread will start camera video mode
-        self._stop_event.clear()
-        if not self._capture_thread or not self._capture_thread.is_alive():
-            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
-            self._capture_thread.start()
-
+        # Start video mode off the UI thread; a polling start thread runs
+        # while is_streaming is set
+        self._seq = 0
         self.is_streaming = True
+        if not self._start_thread or not self._start_thread.is_alive():
+            self._start_thread = threading.Thread(target=self._start_capture, daemon=True)
+            self._start_thread.start()
+
         self.canvas.itemconfig(self.placeholder_text, state="hidden")
         # Start UI updater
         self._update_frame()
@@ -70,43 +75,45 @@ class VideoPanel(tk.Frame):
         """Stop the video stream"""
         self.is_streaming = False
 
-        # Stop capture thread
-        self._stop_event.set()
-        if self._capture_thread and self._capture_thread.is_alive():
-            self._capture_thread.join(timeout=0.2)
+        # Let a pending start finish so the ring is not left running
+        if self._start_thread and self._start_thread.is_alive():
+            self._start_thread.join(timeout=1.0)
 
         if self.camera is not None and self.camera.is_connected:
             try:
-                self.camera.stop_video()
+                self.camera.stop_ring()
             except Exception:
                 pass
 
         # Show placeholder
         self.canvas.itemconfig(self.placeholder_text, state="normal")
 
-        # Clear current image and queue
+        # Clear current image
         if self._image_id is not None:
             self.canvas.delete(self._image_id)
             self._image_id = None
         self._current_image = None
-        with contextlib.suppress(Exception):
-            while True:
-                self.frame_queue.get_nowait()
     
     def _update_frame(self):
         """Fetch and display the next frame."""
         if not self.is_streaming:
             return
 
-        # Try to get the latest frame from the queue without blocking
-        frame = None
-        with contextlib.suppress(queue.Empty):
-            # Drain queue to get the most recent frame
-            while True:
-                frame = self.frame_queue.get_nowait()
+        # Newest frame since the last one shown, if any; never blocks
+        lease = None
+        if self._polled is not None:
+            with self._polled_lock:
+                lease, self._polled = self._polled, None
+        elif self.camera is not None and self.camera.is_connected:
+            try:
+                lease, self._seq = self.camera.get_latest_frame_lease(self._seq)
+            except Exception:
+                lease = None
 
-        if frame is not None:
-            self._display_frame(frame)
+        if lease is not None:
+            # PhotoImage copies the pixels, so the buffer can go back to the pool
+            self._display_frame(lease.array)
+            lease.release()
 
         # Schedule next update
         self.after(self.update_interval, self._update_frame)
@@ -147,6 +154,10 @@ class VideoPanel(tk.Frame):
             else:
                 self.canvas.itemconfig(self._image_id, image=self._current_image)
                 self.canvas.coords(self._image_id, canvas_width // 2, canvas_height // 2)
+
+            if self.on_first_frame:
+                callback, self.on_first_frame = self.on_first_frame, None
+                callback()
                 
         except Exception as e:
             print(f"Error displaying frame: {e}")
@@ -172,53 +183,59 @@ class VideoPanel(tk.Frame):
         
         return image.resize((new_width, new_height), Image.Resampling.BILINEAR)
 
-    def _capture_loop(self):
-        """Background thread: capture frames from camera and keep latest in queue."""
+    def _start_capture(self):
+        """Background thread: start the camera's capture ring."""
+        if not self.camera.has_ring:
+            self._poll_video()
+            return
         try:
-            # Attempt to start camera video mode from background thread
-            try:
-                res = self.camera.start_video()
-            except Exception as e:
-                res = -1
-                print(f"start_video error: {e}")
-
-            if res != 0:
-                # notify UI and exit capture loop
-                try:
-                    self.after(0, lambda: print(f"Failed to start video mode: {res}"))
-                except Exception:
-                    pass
-                return
-
-            while not self._stop_event.is_set():
-                if not self.camera or not getattr(self.camera, 'is_connected', False):
-                    time.sleep(0.05)
-                    continue
-
-                # Small wait to avoid blocking too long in the capture thread
-                frame = None
-                try:
-                    frame = self.camera.get_video_frame(wait_ms=10)
-                except Exception:
-                    frame = None
-
-                if frame is None:
-                    # Sleep briefly to avoid a tight loop when no frames available
-                    time.sleep(0.005)
-                    continue
-
-                # Put latest frame into queue, dropping older one if necessary
-                try:
-                    self.frame_queue.put_nowait(frame)
-                except queue.Full:
-                    with contextlib.suppress(Exception):
-                        _ = self.frame_queue.get_nowait()
-                    with contextlib.suppress(Exception):
-                        self.frame_queue.put_nowait(frame)
-
+            res = self.camera.start_ring(self.ring_slots)
         except Exception as e:
-            print(f"Capture thread error: {e}")
+            res = -1
+            print(f"start_ring error: {e}")
+
+        if res != 0:
+            # notify UI
+            try:
+                self.after(0, lambda: print(f"Failed to start video mode: {res}"))
+            except Exception:
+                pass
     
+    def _poll_video(self):
+        """Background thread: stream with start_video/get_video_frame_lease until stopped."""
+        print("asi_api.dll has no capture ring, polling video frames instead")
+        try:
+            res = self.camera.start_video()
+        except Exception as e:
+            res = -1
+            print(f"start_video error: {e}")
+        if res != 0:
+            try:
+                self.after(0, lambda: print(f"Failed to start video mode: {res}"))
+            except Exception:
+                pass
+            return
+
+        while self.is_streaming:
+            try:
+                lease = self.camera.get_video_frame_lease(wait_ms=100)
+            except Exception:
+                lease = None
+            if lease is None:
+                if not self.camera.is_connected:
+                    break
+                continue
+            # Keep only the newest frame for the next UI tick
+            with self._polled_lock:
+                old, self._polled = self._polled, lease
+            if old is not None:
+                old.release()
+
+        with self._polled_lock:
+            old, self._polled = self._polled, None
+        if old is not None:
+            old.release()
+
     def display_single_frame(self, frame: np.ndarray):
         """
         Display a single frame (for snapshot preview).
@@ -10,6 +10,7 @@ gcc -shared -o bin\dmd_api.dll ^
     src\dmd\dmd_status.c ^
     src\dmd\dmd_pattern.c ^
     src\dmd\dmd_image.c ^
+    src\dmd\dmd_timing.c ^
     lib\API.c ^
     lib\usb.c ^
     lib\pattern.c ^
@@ -0,0 +1,113 @@
+"""
+bench_bmp_generator.py
+Compare the vectorized generate_bmp against the original per-pixel loop,
+time PatternCache misses and hits, time generate_grid_batch against
+rendering every cell one by one, and time Mask composition of many cells.
+
+Run from the repository root:
+    python benchmarks/bench_bmp_generator.py
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "GUI"))
+import numpy as np  # noqa: E402
+from bmp_generator import (  # noqa: E402
+    CANVAS_W, CANVAS_H, SQUARE, Mask, PatternCache, generate_bmp, generate_grid_batch, render_pattern,
+)
+
+GRID_SIZES = (10, 50, 200)
+BATCH_GRID_SIZES = (10, 30)
+MASK_CELL_COUNTS = (1, 50, 500)
+
+
+def generate_bmp_loop(row, column, grid_size, grid_line_thickness, filename):
+    """Original per-pixel implementation, kept as the reference output."""
+    pad_x = (CANVAS_W - SQUARE) // 2
+    N = grid_size + 1
+    cell_size = SQUARE // N
+    grid_w = N * cell_size
+    grid_h = N * cell_size
+    offset_x = pad_x + (SQUARE - grid_w) // 2
+    offset_y = (SQUARE - grid_h) // 2
+
+    img = Image.new("1", (CANVAS_W, CANVAS_H), 1)
+    pixels = img.load()
+    for y in range(CANVAS_H):
+        for x in range(CANVAS_W):
+            if pad_x <= x < pad_x + SQUARE:
+                pixels[x, y] = 0
+                if offset_x <= x < offset_x + grid_w and offset_y <= y < offset_y + grid_h:
+                    gx = (x - offset_x) // cell_size
+                    gy = (y - offset_y) // cell_size
+                    if gx == column and gy == row:
+                        pixels[x, y] = 1
+                    if (x - offset_x) % cell_size < grid_line_thickness:
+                        pixels[x, y] = 1
+                    if (y - offset_y) % cell_size < grid_line_thickness:
+                        pixels[x, y] = 1
+    img.save(filename, "BMP")
+
+
+def timed(fn, *args, repeat=1):
+    """Return the best wall time in seconds over `repeat` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        ref_path = str(Path(tmp) / "loop.bmp")
+        new_path = str(Path(tmp) / "numpy.bmp")
+
+        print(f"{'grid':>6} {'loop (s)':>10} {'numpy (ms)':>11} {'speedup':>9}  identical")
+        for grid in GRID_SIZES:
+            row, col = grid // 3, grid // 2
+            t_loop = timed(generate_bmp_loop, row, col, grid, 2, ref_path)
+            t_new = timed(lambda: generate_bmp(row, col, grid, 2, filename=new_path), repeat=5)
+            identical = Path(ref_path).read_bytes() == Path(new_path).read_bytes()
+            print(f"{grid:>6} {t_loop:>10.2f} {t_new * 1e3:>11.2f} {t_loop / t_new:>8.0f}x  {identical}")
+
+    print()
+    print(f"{'grid':>6} {'new base (ms)':>14} {'cached base (ms)':>17} {'hit (us)':>9}")
+    for grid in GRID_SIZES:
+        cache = PatternCache()
+        t_cold = timed(cache.get, 0, 0, grid, 2)
+        t_warm = timed(cache.get, 1, 1, grid, 2)
+        t_hit = timed(cache.get, 1, 1, grid, 2, repeat=1000)
+        print(f"{grid:>6} {t_cold * 1e3:>14.2f} {t_warm * 1e3:>17.3f} {t_hit * 1e6:>9.2f}")
+
+    print()
+    print(f"{'grid':>6} {'cells':>6} {'per-cell (s)':>13} {'batch (s)':>10} {'speedup':>9}")
+    for grid in BATCH_GRID_SIZES:
+        n = grid + 1
+        t_cells = timed(lambda: [np.packbits(render_pattern(r, c, grid), axis=1)
+                                 for r in range(n) for c in range(n)])
+        t_batch = timed(generate_grid_batch, grid)
+        print(f"{grid:>6} {n * n:>6} {t_cells:>13.2f} {t_batch:>10.2f} {t_cells / t_batch:>8.0f}x")
+
+    print()
+    rng = np.random.default_rng(0)
+    t_single = timed(lambda: np.packbits(render_pattern(3, 3, 50), axis=1), repeat=20)
+    print(f"single-cell render_pattern, grid 50: {t_single * 1e3:.2f} ms")
+    print(f"{'cells':>6} {'Mask.grid | Mask.cells (ms)':>28}")
+    for count in MASK_CELL_COUNTS:
+        cells = rng.integers(0, 51, size=(count, 2))
+        t_mask = timed(lambda: Mask.grid(50) | Mask.cells(cells, 50), repeat=20)
+        print(f"{count:>6} {t_mask * 1e3:>28.2f}")
+
+
+if __name__ == "__main__":
+    main()
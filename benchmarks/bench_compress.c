@@ -0,0 +1,302 @@
+/**
+ * bench_compress.c
+ * Check and time RLE_CompressBMP() against the original pixel-by-pixel
+ * encoder it replaced.
+ *
+ * For every image in the corpus:
+ *   - RLE_CompressBMP() must return the same size and bytes as the reference
+ *     encoder below, including 0 for images that do not compress
+ *   - RLE_DecompressBMP() of the output must reproduce the image
+ * then both encoders are timed.
+ *
+ * Build and run from the repository root:
+ *   gcc -O2 -Ilib -o bin\bench_compress.exe benchmarks\bench_compress.c ^
+ *       lib\compress.c lib\BMPParser.c lib\Error.c
+ *   bin\bench_compress.exe
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "BMPParser.h"
+#include "compress.h"
+
+#define WIDTH       2048
+#define HEIGHT      1200
+#define ROW_BYTES   (WIDTH / 8)
+#define LINE_WIDTH  (WIDTH * 3)
+#define IMAGE_BYTES (LINE_WIDTH * HEIGHT)
+/* Both encoders may run one raw block past the limit before giving up */
+#define OUT_BYTES   (IMAGE_BYTES + 1024)
+#define ITERATIONS  10
+
+typedef struct {
+    char name[32];
+    uint08 *pixels;             /* 24-bit, LINE_WIDTH bytes per line */
+} Image24_t;
+
+static const char *bmp_corpus[] = {
+    "test_patterns/testBMP.bmp",
+    "test_patterns/testBMPwhite.bmp",
+    "test_patterns/testBMPblack.bmp",
+    "row_pattern/0_0.bmp",
+    "row_pattern/0_3.bmp",
+};
+
+/* ============== Reference encoder (previous RLE_CompressBMP) ============== */
+
+static uint16 ref_find_repeat255(uint08 const *Line, uint16 x, uint16 Width) {
+    int i = 0;
+    int Size = Width - x;
+    uint32 Old, New;
+
+    Line += x * 3;
+    Old = PARSE_WORD24_LE(Line);
+    if (Size > 255)
+        Size = 255;
+    while (i < Size) {
+        i++;
+        Line += 3;
+        New = PARSE_WORD24_LE(Line);
+        if (Old != New)
+            break;
+    }
+    return i;
+}
+
+static uint08 *ref_put_raw(uint08 *Output, uint08 const *CopyPtr, uint16 Raw) {
+    if (Raw == 1) {
+        *Output++ = 1;
+        *Output++ = CopyPtr[2];
+        *Output++ = CopyPtr[0];
+        *Output++ = CopyPtr[1];
+    } else if (Raw > 1) {
+        *Output++ = 0;
+        *Output++ = Raw;
+        while (Raw--) {
+            *Output++ = CopyPtr[2];
+            *Output++ = CopyPtr[0];
+            *Output++ = CopyPtr[1];
+            CopyPtr += 3;
+        }
+    }
+    return Output;
+}
+
+static int ref_compress(uint08 const *Input, uint16 Width, uint16 Height,
+                        uint16 FullWidth, uint08 *Output) {
+    uint08 const *Line = Input;
+    uint08 *OutStart = Output;
+    uint08 *OutPtrEnd = Output + Width * Height * 3;
+    uint08 WordAlign;
+
+    for (uint16 y = 0; y < Height; y++) {
+        uint16 x = 0, Raw = 0;
+        while (x < Width) {
+            uint16 Repeat = ref_find_repeat255(Line, x, Width);
+            if (Repeat > 1 || Raw == 255) {
+                Output = ref_put_raw(Output, Line + (x - Raw) * 3, Raw);
+                if (Repeat > 1) {
+                    uint08 const *CopyPtr = Line + x * 3;
+                    *Output++ = Repeat;
+                    *Output++ = CopyPtr[2];
+                    *Output++ = CopyPtr[0];
+                    *Output++ = CopyPtr[1];
+                    x += Repeat;
+                }
+                Raw = 0;
+            } else {
+                x++;
+                Raw++;
+            }
+            if (Output >= OutPtrEnd)
+                return 0;
+        }
+        Output = ref_put_raw(Output, Line + (x - Raw) * 3, Raw);
+
+        if (y == Height - 1)
+            break;
+        *Output++ = 0;
+        *Output++ = 0;
+        WordAlign = (4 - ((Output - OutStart) & 3)) & 3;
+        while (WordAlign--)
+            *Output++ = 0;
+        if (Output >= OutPtrEnd)
+            return 0;
+        Line = Line + FullWidth;
+    }
+
+    *Output++ = 0;
+    *Output++ = 1;
+    WordAlign = (16 - ((Output - OutStart) & 0xF)) & 0xF;
+    while (WordAlign--)
+        *Output++ = 0;
+    return Output - OutStart;
+}
+
+/* ============== Corpus ============== */
+
+static uint08 *expand_bits(const uint08 *bits) {
+    /* One spare line: the reference encoder peeks one pixel past the end */
+    uint08 *pixels = calloc(IMAGE_BYTES + LINE_WIDTH, 1);
+    for (int y = 0; y < HEIGHT; y++)
+        for (int x = 0; x < WIDTH; x++)
+            if (bits[y * ROW_BYTES + (x >> 3)] & (0x80 >> (x & 7)))
+                memset(pixels + y * LINE_WIDTH + x * 3, 0xFF, 3);
+    return pixels;
+}
+
+/**
+ * Grid pattern matching GUI/bmp_generator.py render_pattern()
+ */
+static void fill_grid(uint08 *bits, int grid, int row, int col, int thickness) {
+    int n = grid + 1;
+    int cell = HEIGHT / n;
+    int gridW = n * cell;
+    int padX = (WIDTH - HEIGHT) / 2;
+    int offX = padX + (HEIGHT - gridW) / 2;
+    int offY = (HEIGHT - gridW) / 2;
+
+    for (int y = 0; y < HEIGHT; y++) {
+        for (int x = 0; x < WIDTH; x++) {
+            int white = 1;
+            if (x >= padX && x < padX + HEIGHT) {
+                white = 0;
+                if (x >= offX && x < offX + gridW && y >= offY && y < offY + gridW) {
+                    int gx = (x - offX) / cell, gy = (y - offY) / cell;
+                    if (gx == col && gy == row) white = 1;
+                    if ((x - offX) % cell < thickness || (y - offY) % cell < thickness) white = 1;
+                }
+            }
+            if (white) bits[y * ROW_BYTES + (x >> 3)] |= 0x80 >> (x & 7);
+        }
+    }
+}
+
+static void fill_mask(uint08 *bits, unsigned seed, int density) {
+    srand(seed);
+    for (int i = 0; i < ROW_BYTES * HEIGHT; i++) {
+        uint08 b = 0;
+        for (int k = 0; k < 8; k++)
+            if (rand() % 100 < density) b |= 0x80 >> k;
+        bits[i] = b;
+    }
+}
+
+static Image24_t *add(Image24_t *images, int *count, const char *name, uint08 *pixels) {
+    Image24_t *image = &images[(*count)++];
+    snprintf(image->name, sizeof(image->name), "%s", name);
+    image->pixels = pixels;
+    return image;
+}
+
+static void add_bits(Image24_t *images, int *count, const char *name, uint08 *bits) {
+    add(images, count, name, expand_bits(bits));
+    free(bits);
+}
+
+static int build_corpus(Image24_t *images) {
+    static const int grids[] = { 10, 50, 200 };
+    int count = 0;
+    char name[32];
+
+    for (size_t i = 0; i < sizeof(bmp_corpus) / sizeof(bmp_corpus[0]); i++) {
+        Image_t info;
+        uint08 *bits;
+        if (BMP_GetFileInfo(bmp_corpus[i], &info) < 0 || info.Width != WIDTH || info.Height != HEIGHT)
+            continue;
+        bits = calloc(ROW_BYTES * HEIGHT, 1);
+        BMP_LoadBitsFromFile(bmp_corpus[i], bits, HEIGHT, ROW_BYTES);
+        add_bits(images, &count, bmp_corpus[i], bits);
+    }
+
+    add(images, &count, "all white", memset(calloc(IMAGE_BYTES + LINE_WIDTH, 1), 0xFF, IMAGE_BYTES));
+    add(images, &count, "all black", calloc(IMAGE_BYTES + LINE_WIDTH, 1));
+
+    for (int i = 0; i < 3; i++) {
+        uint08 *bits = calloc(ROW_BYTES * HEIGHT, 1);
+        fill_grid(bits, grids[i], grids[i] / 3, grids[i] / 2, 2);
+        sprintf(name, "grid %d", grids[i]);
+        add_bits(images, &count, name, bits);
+    }
+
+    static const int densities[] = { 1, 5, 50 };
+    for (int i = 0; i < 3; i++) {
+        uint08 *bits = calloc(ROW_BYTES * HEIGHT, 1);
+        fill_mask(bits, i + 1, densities[i]);
+        sprintf(name, "random mask %d%%", densities[i]);
+        add_bits(images, &count, name, bits);
+    }
+
+    /* Colour content: gradients repeat in short runs, noise does not compress */
+    uint08 *ramp = calloc(IMAGE_BYTES + LINE_WIDTH, 1);
+    for (int y = 0; y < HEIGHT; y++)
+        for (int x = 0; x < WIDTH; x++) {
+            uint08 *p = ramp + y * LINE_WIDTH + x * 3;
+            p[0] = x >> 3; p[1] = y >> 3; p[2] = (x + y) >> 4;
+        }
+    add(images, &count, "rgb gradient", ramp);
+
+    uint08 *noise = calloc(IMAGE_BYTES + LINE_WIDTH, 1);
+    srand(7);
+    for (int i = 0; i < IMAGE_BYTES; i++)
+        noise[i] = rand() & 0xFF;
+    add(images, &count, "rgb noise", noise);
+
+    return count;
+}
+
+/* ============== Checks ============== */
+
+static int round_trip(const uint08 *pixels, const uint08 *compressed) {
+    /* Slack: the decoder writes through the end of the last line */
+    uint08 *decoded = calloc(IMAGE_BYTES + LINE_WIDTH, 1);
+    int ok;
+
+    RLE_DecompressBMP(compressed, decoded, LINE_WIDTH);
+    ok = memcmp(decoded, pixels, IMAGE_BYTES) == 0;
+    free(decoded);
+    return ok;
+}
+
+static double time_ms(int (*encode)(uint08 const *, uint16, uint16, uint16, uint08 *),
+                      const uint08 *pixels, uint08 *out) {
+    clock_t start = clock();
+    for (int i = 0; i < ITERATIONS; i++)
+        encode(pixels, WIDTH, HEIGHT, LINE_WIDTH, out);
+    return 1000.0 * (double)(clock() - start) / CLOCKS_PER_SEC / ITERATIONS;
+}
+
+static int run(const Image24_t *image, uint08 *refOut, uint08 *newOut) {
+    int refSize = ref_compress(image->pixels, WIDTH, HEIGHT, LINE_WIDTH, refOut);
+    int newSize = RLE_CompressBMP(image->pixels, WIDTH, HEIGHT, LINE_WIDTH, newOut);
+    int identical = refSize == newSize && memcmp(refOut, newOut, refSize) == 0;
+    int roundTrip = newSize == 0 || round_trip(image->pixels, newOut);
+    double refMs = time_ms(ref_compress, image->pixels, refOut);
+    double newMs = time_ms(RLE_CompressBMP, image->pixels, newOut);
+
+    printf("%-28s %9d %9.2f %9.2f %7.1fx  %s %s\n", image->name, newSize, refMs, newMs,
+           newMs > 0 ? refMs / newMs : 0.0, identical ? "same" : "DIFF",
+           newSize == 0 ? "n/a" : roundTrip ? "ok" : "FAIL");
+    return identical && roundTrip;
+}
+
+int main(void) {
+    Image24_t images[32];
+    int count = build_corpus(images);
+    uint08 *refOut = malloc(OUT_BYTES);
+    uint08 *newOut = malloc(OUT_BYTES);
+    int failures = 0;
+
+    printf("%-28s %9s %9s %9s %8s\n", "image", "bytes", "ref ms", "new ms", "speedup");
+    for (int i = 0; i < count; i++) {
+        failures += !run(&images[i], refOut, newOut);
+        free(images[i].pixels);
+    }
+
+    free(refOut);
+    free(newOut);
+    printf("\n%s\n", failures ? "MISMATCH" : "All outputs identical");
+    return failures ? 1 : 0;
+}
@@ -0,0 +1,88 @@
+"""
+bench_record.py
+Sustained recording rate at full ROI, and what it does to the preview.
+
+Records the camera stream for a while with a preview loop reading the newest
+frame every 16 ms, as VideoPanel does, and reports frames written, drops
+(in the ring, the writer queue and the SDK), MB/s sustained and the writer's
+own MB/s, plus the longest gap between preview frames.
+
+Needs a connected ASI camera, or --backend sim for the simulated one (run at
+--fps). Run from the repository root:
+    python benchmarks/bench_record.py [--seconds 10] [--output rec/bench.raw] [--backend sim] [--fps 120]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "GUI"))
+from asi_wrapper import ASICamera  # noqa: E402
+from recorder import Recorder  # noqa: E402
+
+
+def preview_loop(camera, stop: threading.Event, gaps: list):
+    """Copy out the newest frame every 16 ms; records the time between new frames."""
+    seq, last = 0, None
+    while not stop.is_set():
+        lease, seq = camera.get_latest_frame_lease(seq)
+        if lease is not None:
+            lease.release()
+            now = time.perf_counter()
+            if last is not None:
+                gaps.append(now - last)
+            last = now
+        time.sleep(0.016)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="Recording length")
+    parser.add_argument("--output", default="rec/bench.raw", help="Raw file to record to")
+    parser.add_argument("--exposure-us", type=int, default=100, help="Camera exposure")
+    parser.add_argument("--backend", choices=("dll", "sim"), help="Camera backend (default: CAMERA_BACKEND or dll)")
+    parser.add_argument("--fps", type=float, default=120.0, help="Frame rate of the simulated camera")
+    args = parser.parse_args()
+
+    camera = ASICamera(backend=args.backend)
+    if camera.backend == "sim":
+        camera.dll.fps = args.fps
+    if camera.init_camera(8, 2) != 0:
+        sys.exit("Camera not found")
+    _, max_width, _, max_height = camera.get_dimension_range()
+    camera.set_ROI(max_width - max_width % 8, max_height - max_height % 2)
+    camera.set_exposure(args.exposure_us)
+
+    stop, gaps = threading.Event(), []
+    camera.start_ring(8)
+    preview = threading.Thread(target=preview_loop, args=(camera, stop, gaps), daemon=True)
+    preview.start()
+    try:
+        recorder = Recorder(camera, args.output)
+        if not recorder.start():
+            sys.exit("Failed to start recording")
+        time.sleep(args.seconds)
+        stats = recorder.stop()
+    finally:
+        stop.set()
+        preview.join()
+        camera.stop_ring()
+        camera.stop_camera()
+
+    print(f"ROI {camera.roi_width}x{camera.roi_height}, {stats['elapsed_s']:.1f} s")
+    print(f"frames written   {stats['frames']:>8} ({stats['fps']:.1f} fps)")
+    print(f"dropped          {stats['ring_dropped']:>8} ring, {stats['queue_dropped']} queue, "
+          f"{stats['sdk_dropped']} sdk")
+    print(f"MB/s sustained   {stats['mb_per_s']:>8.1f}")
+    print(f"MB/s writer      {stats['writer_mb_per_s']:>8.1f}")
+    print(f"queue peak       {stats['queue_peak']:>8} of {stats['queue_size']}")
+    if gaps:
+        print(f"preview gap max  {max(gaps) * 1000:>8.1f} ms")
+    if stats['error']:
+        print(f"error: {stats['error']}")
+
+
+if __name__ == "__main__":
+    main()
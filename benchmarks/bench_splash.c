@@ -0,0 +1,218 @@
+/**
+ * bench_splash.c
+ * Check and time the packed 1-bit splash encoder against the 24-bit path.
+ *
+ * For every pattern in the corpus:
+ *   - SPL_ConvBitsToSplash() must return the same bytes as
+ *     SPL_ConvImageToSplash(SPL_COMP_RLE) on the 24-bit expansion
+ *   - RLE_DecompressBMP() of the output must reproduce the 24-bit image
+ * then both paths are timed and their buffer sizes reported.
+ *
+ * Build and run from the repository root:
+ *   gcc -O2 -Ilib -o bin\bench_splash.exe benchmarks\bench_splash.c ^
+ *       lib\splash.c lib\compress.c lib\BMPParser.c lib\Error.c lib\pattern.c
+ *   bin\bench_splash.exe
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "BMPParser.h"
+#include "compress.h"
+#include "splash.h"
+
+#define WIDTH       2048
+#define HEIGHT      1200
+#define ROW_BYTES   (WIDTH / 8)
+#define ITERATIONS  20
+
+typedef struct {
+    const char *name;
+    uint08 *bits;
+} Pattern_t;
+
+static const char *bmp_corpus[] = {
+    "test_patterns/testBMP.bmp",
+    "test_patterns/testBMPwhite.bmp",
+    "test_patterns/testBMPblack.bmp",
+    "row_pattern/0_0.bmp",
+    "row_pattern/0_3.bmp",
+};
+
+/**
+ * Grid pattern matching GUI/bmp_generator.py render_pattern()
+ */
+static void fill_grid(uint08 *bits, int grid, int row, int col, int thickness) {
+    int n = grid + 1;
+    int cell = HEIGHT / n;
+    int gridW = n * cell;
+    int padX = (WIDTH - HEIGHT) / 2;
+    int offX = padX + (HEIGHT - gridW) / 2;
+    int offY = (HEIGHT - gridW) / 2;
+
+    for (int y = 0; y < HEIGHT; y++) {
+        for (int x = 0; x < WIDTH; x++) {
+            int white = 1;
+            if (x >= padX && x < padX + HEIGHT) {
+                white = 0;
+                if (x >= offX && x < offX + gridW && y >= offY && y < offY + gridW) {
+                    int gx = (x - offX) / cell, gy = (y - offY) / cell;
+                    if (gx == col && gy == row) white = 1;
+                    if ((x - offX) % cell < thickness || (y - offY) % cell < thickness) white = 1;
+                }
+            }
+            if (white) bits[y * ROW_BYTES + (x >> 3)] |= 0x80 >> (x & 7);
+        }
+    }
+}
+
+static void fill_random(uint08 *bits, unsigned seed, int density) {
+    srand(seed);
+    for (int i = 0; i < ROW_BYTES * HEIGHT; i++) {
+        uint08 b = 0;
+        for (int k = 0; k < 8; k++)
+            if (rand() % 100 < density) b |= 0x80 >> k;
+        bits[i] = b;
+    }
+}
+
+static Image_t *expand_to_24bit(const uint08 *bits) {
+    Image_t *image = BMP_AllocImage(WIDTH, HEIGHT, 24);
+    for (int y = 0; y < HEIGHT; y++) {
+        uint08 *dst = image->Buffer + y * image->LineWidth;
+        for (int x = 0; x < WIDTH; x++) {
+            uint08 v = (bits[y * ROW_BYTES + (x >> 3)] & (0x80 >> (x & 7))) ? 0xFF : 0x00;
+            dst[x * 3] = dst[x * 3 + 1] = dst[x * 3 + 2] = v;
+        }
+    }
+    return image;
+}
+
+static double elapsed_ms(clock_t start) {
+    return 1000.0 * (double)(clock() - start) / CLOCKS_PER_SEC / ITERATIONS;
+}
+
+/**
+ * Reference path: 1-bit -> 24-bit Image_t -> SPL_ConvImageToSplash
+ */
+static int encode_24bit(const uint08 *bits, uint08 **outSplash, size_t *allocated) {
+    Image_t *image = expand_to_24bit(bits);
+    uint08 *splash = SPL_AllocSplash(WIDTH, HEIGHT);
+    int size = SPL_ConvImageToSplash(image, SPL_COMP_RLE, splash);
+    *allocated = (size_t)image->LineWidth * HEIGHT
+               + ALIGN_BYTES_NEXT(WIDTH * 3, 16) * HEIGHT;
+    BMP_FreeImage(image);
+    *outSplash = splash;
+    return size;
+}
+
+/**
+ * New path: packed bits -> SPL_ConvBitsToSplash into an exactly sized buffer
+ */
+static int encode_bits(const uint08 *bits, uint08 **outSplash, size_t *allocated) {
+    int size = SPL_ConvBitsToSplash(bits, WIDTH, HEIGHT, ROW_BYTES, NULL);
+    if (size < 0) {
+        *outSplash = NULL;
+        *allocated = 0;
+        return size;
+    }
+    *outSplash = malloc(size);
+    *allocated = size;
+    return SPL_ConvBitsToSplash(bits, WIDTH, HEIGHT, ROW_BYTES, *outSplash);
+}
+
+static int round_trip(const uint08 *bits, const uint08 *splash) {
+    Image_t *image = expand_to_24bit(bits);
+    size_t bytes = (size_t)image->LineWidth * HEIGHT;
+    /* Slack: the decoder writes through the end of the last line */
+    uint08 *decoded = calloc(bytes + image->LineWidth, 1);
+    int ok;
+
+    RLE_DecompressBMP(splash + 48, decoded, image->LineWidth);
+    ok = memcmp(decoded, image->Buffer, bytes) == 0;
+    free(decoded);
+    BMP_FreeImage(image);
+    return ok;
+}
+
+static int run(const Pattern_t *p) {
+    uint08 *refSplash, *newSplash;
+    size_t refAlloc, newAlloc;
+    int refSize = encode_24bit(p->bits, &refSplash, &refAlloc);
+    int newSize = encode_bits(p->bits, &newSplash, &newAlloc);
+    int identical = refSize == newSize &&
+                    (refSize < 0 || memcmp(refSplash, newSplash, refSize) == 0);
+    int roundTrip = refSize < 0 || round_trip(p->bits, newSplash);
+    clock_t start;
+    double refMs, newMs;
+
+    SPL_Free(refSplash);
+    free(newSplash);
+
+    start = clock();
+    for (int i = 0; i < ITERATIONS; i++) {
+        encode_24bit(p->bits, &refSplash, &refAlloc);
+        SPL_Free(refSplash);
+    }
+    refMs = elapsed_ms(start);
+
+    start = clock();
+    for (int i = 0; i < ITERATIONS; i++) {
+        encode_bits(p->bits, &newSplash, &newAlloc);
+        free(newSplash);
+    }
+    newMs = elapsed_ms(start);
+
+    printf("%-28s %9d %9.2f %9.2f %7.1fx %9zu %9zu  %s %s\n",
+           p->name, refSize, refMs, newMs, refMs / newMs,
+           refAlloc / 1024, newAlloc / 1024,
+           identical ? "same" : "DIFF", roundTrip ? "ok" : "FAIL");
+    return identical && roundTrip;
+}
+
+int main(void) {
+    Pattern_t patterns[32];
+    int count = 0;
+    int failures = 0;
+
+    for (size_t i = 0; i < sizeof(bmp_corpus) / sizeof(bmp_corpus[0]); i++) {
+        Image_t info;
+        if (BMP_GetFileInfo(bmp_corpus[i], &info) < 0 || info.Width != WIDTH || info.Height != HEIGHT)
+            continue;
+        patterns[count].name = bmp_corpus[i];
+        patterns[count].bits = calloc(ROW_BYTES * HEIGHT, 1);
+        BMP_LoadBitsFromFile(bmp_corpus[i], patterns[count].bits, HEIGHT, ROW_BYTES);
+        count++;
+    }
+
+    static const int grids[] = { 10, 50, 200 };
+    static char gridNames[3][32];
+    for (int i = 0; i < 3; i++) {
+        sprintf(gridNames[i], "grid %d", grids[i]);
+        patterns[count].name = gridNames[i];
+        patterns[count].bits = calloc(ROW_BYTES * HEIGHT, 1);
+        fill_grid(patterns[count].bits, grids[i], grids[i] / 3, grids[i] / 2, 2);
+        count++;
+    }
+
+    patterns[count].name = "random 5%";
+    patterns[count].bits = calloc(ROW_BYTES * HEIGHT, 1);
+    fill_random(patterns[count].bits, 1, 5);
+    count++;
+
+    patterns[count].name = "random 50%";
+    patterns[count].bits = calloc(ROW_BYTES * HEIGHT, 1);
+    fill_random(patterns[count].bits, 2, 50);
+    count++;
+
+    printf("%-28s %9s %9s %9s %8s %9s %9s\n", "pattern", "bytes",
+           "24bit ms", "bits ms", "speedup", "24bit KB", "bits KB");
+    for (int i = 0; i < count; i++) {
+        failures += !run(&patterns[i]);
+        free(patterns[i].bits);
+    }
+
+    printf("\n%s\n", failures ? "MISMATCH" : "All outputs identical");
+    return failures ? 1 : 0;
+}
@@ -0,0 +1,71 @@
+"""
+bench_startup.py
+Time to window, time to DMD ready and time to first camera frame of the GUI.
+
+Launches GUI/main.py with MICROSCOPY_STARTUP_REPORT set, so the GUI prints
+its startup milestones and closes itself once the DMD is connected and the
+first frame is drawn. Times are measured from process spawn, which includes
+interpreter start-up; the GUI's own in-process times are shown alongside.
+
+Needs a display, and the DMD and camera for the ready/first-frame columns.
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 3] [--timeout 60]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+MAIN = Path(__file__).parent.parent / "GUI" / "main.py"
+MILESTONES = ("window", "ui", "camera_ready", "dmd_ready", "first_frame")
+
+
+def run_once(timeout_s):
+    """Start the GUI once; returns {milestone: (spawn_ms, in_process_ms)}."""
+    env = dict(os.environ, MICROSCOPY_STARTUP_REPORT="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(MAIN)], cwd=MAIN.parent, env=env,
+                            stdout=subprocess.PIPE, text=True, bufsize=1)
+    # Kill a launch that never reaches every milestone (no device, no frame)
+    watchdog = threading.Timer(timeout_s, proc.kill)
+    watchdog.start()
+    marks = {}
+    try:
+        for line in proc.stdout:
+            parts = line.split()
+            # "startup <name> <ms> ms"
+            if len(parts) == 4 and parts[0] == "startup":
+                marks[parts[1]] = ((time.perf_counter() - start) * 1000, float(parts[2]))
+        proc.wait()
+    finally:
+        watchdog.cancel()
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Number of GUI launches")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Seconds to wait for each launch before killing it")
+    args = parser.parse_args()
+
+    print(f"{'run':<5}" + "".join(f"{name:>16}" for name in MILESTONES))
+    for run in range(args.runs):
+        marks = run_once(args.timeout)
+        cells = []
+        for name in MILESTONES:
+            if name in marks:
+                spawn_ms, own_ms = marks[name]
+                cells.append(f"{spawn_ms:>8.0f} ({own_ms:>4.0f})")
+            else:
+                cells.append(f"{'-':>15}")
+        print(f"{run:<5}" + "".join(f"{cell:>16}" for cell in cells))
+    print("\nms from spawn (ms from main.py start); '-' = not reached before --timeout")
+
+
+if __name__ == "__main__":
+    main()
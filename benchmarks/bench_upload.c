@@ -0,0 +1,177 @@
+/**
+ * bench_upload.c
+ * Compare the per-command pattern upload loop with LCR_PatternMemLoadStream
+ * against a fake HID device plugged in through USB_SetTransport().
+ *
+ * The fake device reassembles every command from its 64-byte reports, checks
+ * that the uploaded bytes arrive intact, counts reports and round trips, and
+ * can charge a delay per report and per round trip to model the USB link.
+ * The per-command loop sends no reads at all, so it never learns whether the
+ * device rejected a chunk; the stream rows show what checking costs at each
+ * ack interval (1 = after every command, 0 = once at the end). The error
+ * code only describes the last command, so only ack/1 verifies every chunk.
+ *
+ * Build and run from the repository root:
+ *   gcc -O2 -Ilib -Ihidapi -o bin\bench_upload.exe benchmarks\bench_upload.c ^
+ *       lib\API.c lib\usb.c lib\diagnosticFile.c hidapi\hid.c -lsetupapi -lhid
+ *   bin\bench_upload.exe [report_us] [ack_us]
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "API.h"
+#include "usb.h"
+
+#define CMD_PATMEM_LOAD_DATA  0x1A2B
+#define MAX_UPLOAD            (2 * 1024 * 1024)
+
+typedef struct {
+    uint08 message[HID_MESSAGE_MAX_SIZE + 4];
+    int have;                   /* Bytes of the current command received */
+    int need;                   /* Total bytes of the current command */
+    int replyPending;           /* A read command waits for its reply */
+    uint08 *received;           /* Reassembled upload payload */
+    int receivedSize;
+    unsigned int reports;
+    unsigned int roundTrips;
+    double reportUs;            /* Modelled cost of one report */
+    double ackUs;               /* Modelled cost of one round trip */
+} FakeDevice_t;
+
+static double now_us(void) {
+    return 1e6 * (double)clock() / CLOCKS_PER_SEC;
+}
+
+static void spend_us(double us) {
+    double end = now_us() + us;
+    while (us > 0 && now_us() < end);
+}
+
+static void fake_command(FakeDevice_t *dev) {
+    hidMessageStruct *msg = (hidMessageStruct *)dev->message;
+
+    if (msg->head.flags.rw) {
+        dev->replyPending = 1;
+        return;
+    }
+    if (msg->text.cmd == CMD_PATMEM_LOAD_DATA) {
+        int len = msg->text.data[2] | msg->text.data[3] << 8;
+        if (dev->receivedSize + len <= MAX_UPLOAD)
+            memcpy(dev->received + dev->receivedSize, &msg->text.data[4], len);
+        dev->receivedSize += len;
+    }
+}
+
+static int fake_write(void *context, uint08 *data) {
+    FakeDevice_t *dev = context;
+    int chunk;
+
+    dev->reports++;
+    spend_us(dev->reportUs);
+
+    if (dev->have == 0) {
+        hidMessageStruct *head = (hidMessageStruct *)(data + 1);
+        dev->need = sizeof(head->head) + head->head.length;
+    }
+    chunk = MIN(USB_MAX_PACKET_SIZE, dev->need - dev->have);
+    memcpy(dev->message + dev->have, data + 1, chunk);
+    dev->have += chunk;
+    if (dev->have == dev->need) {
+        fake_command(dev);
+        dev->have = 0;
+    }
+    return USB_MAX_PACKET_SIZE + 1;
+}
+
+static int fake_read(void *context, uint08 *data) {
+    FakeDevice_t *dev = context;
+    hidMessageStruct *reply = (hidMessageStruct *)data;
+
+    if (!dev->replyPending)
+        return -1;
+    dev->replyPending = 0;
+    dev->roundTrips++;
+    spend_us(dev->ackUs);
+
+    memset(data, 0, USB_MAX_PACKET_SIZE);
+    reply->head.length = 1;
+    reply->text.data[0] = 0;    /* Error code: none */
+    return USB_MAX_PACKET_SIZE;
+}
+
+static void reset(FakeDevice_t *dev) {
+    dev->have = dev->need = dev->replyPending = 0;
+    dev->receivedSize = 0;
+    dev->reports = dev->roundTrips = 0;
+}
+
+/**
+ * Original upload_pattern_data loop: one LCR_pattenMemLoad per 504 bytes
+ */
+static int upload_legacy(uint08 *data, int size) {
+    int offset = 0;
+    while (offset < size) {
+        int chunkSize = (size - offset > 504) ? 504 : (size - offset);
+        if (LCR_pattenMemLoad(TRUE, data + offset, chunkSize) < 0)
+            return -1;
+        offset += chunkSize;
+    }
+    return 0;
+}
+
+static int upload_stream(uint08 *data, int size, int ackInterval) {
+    API_UploadStats_t stats;
+    return LCR_PatternMemLoadStream(TRUE, data, size, ackInterval, &stats) < 0 ? -1 : 0;
+}
+
+static int run(FakeDevice_t *dev, const char *name, uint08 *data, int size, int ackInterval) {
+    double start, us;
+    int ok;
+
+    reset(dev);
+    LCR_InitPatternMemLoad(TRUE, 0, size);
+    start = now_us();
+    ok = (ackInterval < 0 ? upload_legacy(data, size) : upload_stream(data, size, ackInterval)) == 0;
+    us = now_us() - start;
+    ok = ok && dev->receivedSize == size && memcmp(dev->received, data, size) == 0;
+
+    printf("%-14s %9d %9u %7u %10.2f %9.2f  %s\n", name, size, dev->reports, dev->roundTrips,
+           us / 1000, us > 0 ? size / us : 0.0, ok ? "ok" : "FAIL");
+    return ok;
+}
+
+int main(int argc, char **argv) {
+    static const int sizes[] = { 16 * 1024, 256 * 1024, MAX_UPLOAD };
+    FakeDevice_t dev = { 0 };
+    USB_Transport_t transport = { fake_write, fake_read, &dev };
+    uint08 *data = malloc(MAX_UPLOAD);
+    int failures = 0;
+
+    dev.reportUs = argc > 1 ? atof(argv[1]) : 0;
+    dev.ackUs = argc > 2 ? atof(argv[2]) : 1000;
+    dev.received = malloc(MAX_UPLOAD);
+    srand(1);
+    for (int i = 0; i < MAX_UPLOAD; i++)
+        data[i] = rand() & 0xFF;
+
+    USB_SetTransport(&transport);
+    USB_Open();
+
+    printf("Fake device: %.0f us per report, %.0f us per round trip\n\n", dev.reportUs, dev.ackUs);
+    printf("%-14s %9s %9s %7s %10s %9s\n", "path", "bytes", "reports", "acks", "ms", "MB/s");
+    for (size_t i = 0; i < sizeof(sizes) / sizeof(sizes[0]); i++) {
+        failures += !run(&dev, "per-command", data, sizes[i], -1);
+        failures += !run(&dev, "stream ack/1", data, sizes[i], 1);
+        failures += !run(&dev, "stream ack/32", data, sizes[i], 32);
+        failures += !run(&dev, "stream end", data, sizes[i], 0);
+        printf("\n");
+    }
+
+    USB_SetTransport(NULL);
+    free(data);
+    free(dev.received);
+    printf("%s\n", failures ? "MISMATCH" : "All uploads intact");
+    return failures ? 1 : 0;
+}
@@ -4133,6 +4133,95 @@ int LCR_pattenMemLoad(BOOL master, unsigned char *pByteArray, int size)
     return -1;
 }
 
+int LCR_PatternMemLoadStream(BOOL master, unsigned char const *pByteArray, int size,
+                             int ackInterval, API_UploadStats_t *pStats)
+/**
+ * Streams a whole image into pattern memory after LCR_InitPatternMemLoad().
+ * Sends the same PATMEM_LOAD_DATA commands as repeated LCR_pattenMemLoad()
+ * calls, but writes the HID reports back to back without per-report logging,
+ * then reads the error code after the final command, where
+ * LCR_pattenMemLoad() never reads it.
+ *
+ * The error code describes the most recent command only, so a read checks
+ * just the command sent before it. With ackInterval = 0 this is an
+ * end-of-upload check: a chunk rejected earlier goes unnoticed. Only
+ * ackInterval = 1 checks every command; other values also read the code
+ * after every ackInterval-th command, which catches a failure there early
+ * but not the other chunks of the batch.
+ *
+ * @param   master - I - TRUE = primary controller, FALSE = secondary
+ * @param   pByteArray - I - Splash data to send
+ * @param   size - I - Number of bytes in pByteArray
+ * @param   ackInterval - I - Also read the error code after every ackInterval-th
+ *                            command (0 = after the final command only)
+ * @param   pStats - O - Upload counters, may be NULL
+ *
+ * @return  >=0 = Number of bytes sent    <BR>
+ *          -1 = USB write failed  <BR>
+ *          -2 = Device reported an error  <BR>
+ *
+ */
+{
+    hidMessageStruct msg;
+    API_UploadStats_t stats;
+    LCR_CMD cmd = master ? PATMEM_LOAD_DATA_PRIMARY : PATMEM_LOAD_DATA_SECONDARY;
+    int maxLen = 512 - sizeof(msg.head) - sizeof(msg.text.cmd) - 2; //Same bootloader workaround as LCR_pattenMemLoad
+    int offset = 0;
+    int sinceAck = 0;
+    int retval = 0;
+
+    STRUCT_CLEAR(stats);
+
+    while (offset < size)
+    {
+        int dataLen = MIN(size - offset, maxLen);
+        int totalLen;
+        int sent;
+        unsigned int code;
+
+        memcpy(&msg.text.data[4], pByteArray + offset, dataLen);
+        msg.text.data[2] = dataLen & 0xFF;
+        msg.text.data[3] = (dataLen >> 8) & 0xFF;
+        CmdList[cmd].wrBytes = dataLen + 2;
+        LCR_PrepWriteCmd(&msg, cmd);
+
+        totalLen = sizeof(msg.head) + msg.head.length;
+        OutputBuffer[0] = 0; // First byte is the report number
+        for (sent = 0; sent < totalLen; sent += USB_MAX_PACKET_SIZE)
+        {
+            memcpy(&OutputBuffer[bufferIndex], (uint08 *)&msg + sent, USB_MAX_PACKET_SIZE);
+            if (USB_Write(OutputBuffer) <= 0)
+            {
+                retval = -1;
+                goto done;
+            }
+            stats.Packets++;
+        }
+
+        offset += dataLen;
+        stats.Bytes += dataLen;
+        stats.Messages++;
+
+        if (++sinceAck == ackInterval || offset == size)
+        {
+            sinceAck = 0;
+            stats.RoundTrips++;
+            if (LCR_ReadErrorCode(&code) < 0 || code != 0)
+            {
+                retval = -2;
+                goto done;
+            }
+        }
+    }
+    retval = offset;
+
+done:
+    DIAG_updateProjectorControl(&DIAG_CmdInfo, retval);
+    if (pStats)
+        *pStats = stats;
+    return retval;
+}
+
 int LCR_getBatchFileName(unsigned char id, char *batchFileName, unsigned char* length)
 {
     hidMessageStruct msg;
@@ -48,6 +48,15 @@ typedef struct
 	uint16 PayloadLen;		/**< Number of bytes in payload */
 } API_CommandInfo_t;
 
+/** Counters of a streamed pattern memory upload */
+typedef struct
+{
+    unsigned int Bytes;         /**< Payload bytes sent */
+    unsigned int Messages;      /**< PATMEM_LOAD_DATA commands sent */
+    unsigned int Packets;       /**< HID reports written */
+    unsigned int RoundTrips;    /**< Error code reads used as batched acks */
+} API_UploadStats_t;
+
 typedef enum
 {
     PTN_MODE_DISABLE, /**< Disable pattern mode */
@@ -212,6 +221,8 @@ int LCR_SendPatReorderUpdate(uint8* payload, int size);
 
 int LCR_InitPatternMemLoad(BOOL master, unsigned short imageNum, unsigned int size);
 int LCR_pattenMemLoad(BOOL master, unsigned char *pByteArray, int size);
+int LCR_PatternMemLoadStream(BOOL master, unsigned char const *pByteArray, int size,
+                             int ackInterval, API_UploadStats_t *pStats);
 
 int LCR_WriteI2CPassThrough(unsigned int port, unsigned int devadd, unsigned char* wdata, unsigned int nwbytes);
 int LCR_ReadI2CPassThrough(unsigned int port, unsigned int devadd, unsigned char* wdata, unsigned int nwbytes, unsigned int nrbytes, unsigned char* rdata);
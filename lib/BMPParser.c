@@ -68,6 +68,14 @@ typedef struct
     uint32 FileSize;
 } BMP_ImageHeader_t;
 
+/** Packed 1-bit output buffer */
+typedef struct
+{
+    uint08 *Bits;
+    int Height;
+    int LineBytes;
+} BMP_BitsBuffer_t;
+
 /** BMP Image merging options */
 typedef struct
 {
@@ -89,6 +97,8 @@ static int ReadBuffer(void *Param, int X, int Y,
                                 uint8 *PixValue, uint32 Count);
 static int WriteBuffer(void *Param, int X, int Y,
                                 uint8 *PixValue, uint32 Count);
+static int WriteBits(void *Param, int X, int Y,
+                                uint8 *PixValue, uint32 Count);
 /****************************** VARIABLES *************************************/
 
 /************************* FUNCTION DEFINITIONS********************************/
@@ -686,6 +696,45 @@ int BMP_LoadFromFile(const char *FileName, Image_t *Image)
     return Error;
 }
 
+/**
+ * Load a BMP File as a packed 1-bit image
+ *
+ * Every pixel whose palette color is not black becomes 1. Rows are stored
+ * top row first, MSB first, LineBytes bytes apart.
+ *
+ * @param FileName BMP File to be loaded
+ * @param Bits Output buffer of Height * LineBytes bytes
+ * @param Height Number of rows in the output buffer
+ * @param LineBytes Number of bytes in an output row
+ *
+ * @return SUCCESS/ERR_NOT_FOUND/FAIL
+ */
+int BMP_LoadBitsFromFile(const char *FileName, uint08 *Bits, int Height,
+                                                            int LineBytes)
+{
+    int Error = SUCCESS;
+    FILE *fp = NULL;
+    BMP_BitsBuffer_t Buffer;
+
+    Buffer.Bits = Bits;
+    Buffer.Height = Height;
+    Buffer.LineBytes = LineBytes;
+
+    TRY_BEGIN()
+    {
+        if((fp = fopen(FileName, "rb")) == 0)
+            TRY_THROW(ERR_NOT_FOUND);
+
+        TRY_TRY(BMP_ParseImage(ReadFile, fp, WriteBits, &Buffer, 8));
+    }
+    TRY_END(Error);
+
+    if(fp)
+        fclose(fp);
+
+    return Error;
+}
+
 /**
  * Save the image data to a BMP file
  *
@@ -885,6 +934,41 @@ static int WriteBuffer(void *Param, int X, int Y,
 }
 
 
+/**
+ * Callback function for writing 8-bit pixel values as packed bits
+ *
+ * @param Param Callback param (BMP_BitsBuffer_t pointer)
+ * @param X X Pixel coordinate
+ * @param Y Y Pixel coordinate
+ * @param PixValue Pixel value array
+ * @param Count Number of pixels in the array
+ *
+ * @return SUCCESS/FAIL
+ */
+static int WriteBits(void *Param, int X, int Y,
+                                uint8 *PixValue, uint32 Count)
+{
+    BMP_BitsBuffer_t *Buffer = (BMP_BitsBuffer_t *)Param;
+    uint08 *Line;
+    uint32 i;
+
+    if(Y >= Buffer->Height)
+        return SUCCESS;
+
+    Line = Buffer->Bits + Y * Buffer->LineBytes;
+    if((uint32)X + Count > (uint32)Buffer->LineBytes * 8)
+        Count = Buffer->LineBytes * 8 - X;
+
+    for(i = 0; i < Count; i++, X++)
+    {
+        if(PixValue[i])
+            Line[X >> 3] |= 0x80 >> (X & 7);
+        else
+            Line[X >> 3] &= ~(0x80 >> (X & 7));
+    }
+    return SUCCESS;
+}
+
 /**
  * Callback function for writing BMP data to file
  *
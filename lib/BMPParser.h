@@ -28,6 +28,9 @@ int BMP_ParseImage(BMP_DataFunc_t *GetData, void *DataParam,
 
 int BMP_LoadFromFile(const char *FileName, Image_t *Image);
 
+int BMP_LoadBitsFromFile(const char *FileName, uint08 *Bits, int Height,
+                                                            int LineBytes);
+
 int BMP_SaveToFile(Image_t *Image, const char *FileName);
 
 int BMP_GetFileInfo(const char *FileName, Image_t *BMPHeader);
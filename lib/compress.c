@@ -11,6 +11,7 @@
 #include "common.h"
 #include "error.h"
 #include "compress.h"
+#include <string.h>
 
 static uint08 *AddCount(uint16 Count, uint08 *Out)
 {
@@ -103,32 +104,61 @@ static uint16 FindRepeat(uint08 const *Line, uint16 x, uint16 Width)
 	return i/3 - x;
 }
 
+/**
+ * Length of the run of equal pixels starting at x, limited to 255 pixels.
+ *
+ * Pixels x..x+n-1 are all equal exactly when every byte of that span matches
+ * the byte one pixel (3 bytes) further on, so the span is compared against
+ * itself shifted by one pixel, 8 bytes at a time, and only the first
+ * mismatching word is searched byte by byte. Never reads past pixel x+Size-1.
+ */
 static uint16 FindRepeat255(uint08 const *Line, uint16 x, uint16 Width)
 {
-	int i = 0;
-	int Size;
-	uint32 New;
-	uint32 Old;
+	uint32 Size = MIN(Width - x, 255);
+	uint32 Span = (Size - 1) * 3;
+	uint32 i = 0;
+	uint64 A;
+	uint64 B;
 
-	Size = Width - x;
 	Line += x * 3;
-	Old = PARSE_WORD24_LE(Line);
 
-	if(Size > 255)
-		Size = 255;
+	while(i + 8 <= Span)
+	{
+		memcpy(&A, Line + i, 8);
+		memcpy(&B, Line + i + 3, 8);
+		if(A != B)
+			break;
+		i += 8;
+	}
+
+	while(i < Span && Line[i] == Line[i + 3])
+		i++;
 
-	while(i < Size)
+	return i / 3 + 1;
+}
+
+/**
+ * Number of raw (unrepeated) pixels starting at x, limited to Max: pixels
+ * that differ from their right neighbour, or the last pixel of the line.
+ */
+static uint16 FindRaw(uint08 const *Line, uint16 x, uint16 Width, uint16 Max)
+{
+	uint32 End = MIN((uint32)Width - 1, (uint32)x + Max);
+	uint32 i = x;
+
+	Line += x * 3;
+	while(i < End && (Line[0] != Line[3] || Line[1] != Line[4] || Line[2] != Line[5]))
 	{
 		i++;
 		Line += 3;
-		New = PARSE_WORD24_LE(Line);
-		if(Old != New)
-			break;
 	}
 
-	return i;
-}
+	/* The last pixel of the line has no neighbour to repeat */
+	if(i == Width - 1 && i < (uint32)x + Max)
+		i++;
 
+	return i - x;
+}
 
 static uint16 FindCopy(uint08 const *Line1, uint08 const *Line2, uint16 x, uint16 Width)
 {
@@ -210,8 +240,10 @@ int RLE_CompressBMP(uint08 const *Input, uint16 Width, uint16 Height,
 			}
 			else
 			{
-				x++;
-				Raw++;
+				/* Output does not move while raw pixels accumulate */
+				Repeat = FindRaw(Line, x, Width, 255 - Raw);
+				x += Repeat;
+				Raw += Repeat;
 			}
 			if(Output >= OutPtrEnd)
 				return 0;
@@ -272,6 +304,261 @@ int RLE_CompressBMP(uint08 const *Input, uint16 Width, uint16 Height,
 	return Output - OutStart;
 }
 
+/** Value (0 or 1) of pixel x in a packed 1-bit line, MSB first */
+#define BIT_PIXEL(Line, x)	(((Line)[(x) >> 3] >> (7 - ((x) & 7))) & 1)
+
+static uint32 PutByte(uint08 *Out, uint32 Pos, uint08 Value)
+{
+	if(Out != NULL)
+		Out[Pos] = Value;
+	return Pos + 1;
+}
+
+/* A 1-bit pixel expands to the same three bytes in any channel order */
+static uint32 PutBitPixel(uint08 *Out, uint32 Pos, uint08 Bit)
+{
+	if(Out != NULL)
+	{
+		uint08 Value = Bit ? 0xFF : 0x00;
+
+		Out[Pos + 0] = Value;
+		Out[Pos + 1] = Value;
+		Out[Pos + 2] = Value;
+	}
+	return Pos + 3;
+}
+
+/* 24-bit expansion (0 = 000000, 1 = FFFFFF) of every packed byte, MSB first */
+static uint08 ExpandTable[256][24];
+/* Position of the first set bit of every byte, MSB first (8 for 0) */
+static uint08 FirstBitTable[256];
+static int BitTablesReady = 0;
+
+static void InitBitTables(void)
+{
+	int Byte;
+	int Bit;
+
+	for(Byte = 0; Byte < 256; Byte++)
+	{
+		FirstBitTable[Byte] = 8;
+		for(Bit = 7; Bit >= 0; Bit--)
+		{
+			memset(&ExpandTable[Byte][Bit * 3], (Byte & (0x80 >> Bit)) ? 0xFF : 0x00, 3);
+			if(Byte & (0x80 >> Bit))
+				FirstBitTable[Byte] = Bit;
+		}
+	}
+	BitTablesReady = 1;
+}
+
+static uint32 PutBitRaw(uint08 *Out, uint32 Pos, uint08 const *Line,
+											uint16 x, uint16 Raw)
+{
+	uint32 End = (uint32)x + Raw;
+
+	/* Size only: no need to look at the pixels */
+	if(Out == NULL)
+		return Raw == 0 ? Pos : (Raw == 1 ? Pos + 4 : Pos + 2 + Raw * 3);
+
+	if(Raw == 1)
+	{
+		Pos = PutByte(Out, Pos, 1);
+		Pos = PutBitPixel(Out, Pos, BIT_PIXEL(Line, x));
+	}
+	else if(Raw > 1)
+	{
+		Pos = PutByte(Out, Pos, 0);
+		Pos = PutByte(Out, Pos, Raw);
+
+		while(x < End && (x & 7))
+		{
+			Pos = PutBitPixel(Out, Pos, BIT_PIXEL(Line, x));
+			x++;
+		}
+		/* Whole bytes of pixels at once */
+		while((uint32)x + 8 <= End)
+		{
+			memcpy(Out + Pos, ExpandTable[Line[x >> 3]], 24);
+			Pos += 24;
+			x += 8;
+		}
+		while(x < End)
+		{
+			Pos = PutBitPixel(Out, Pos, BIT_PIXEL(Line, x));
+			x++;
+		}
+	}
+	return Pos;
+}
+
+/**
+ * Edges in byte Byte of a packed 1-bit line: bit set (MSB first) for every
+ * pixel that differs from the next one, and for the last pixel of the line,
+ * i.e. for the last pixel of every run of equal pixels.
+ */
+static uint08 BitEdges(uint08 const *Line, uint32 Byte, uint16 Width)
+{
+	uint32 LastByte = (uint32)(Width - 1) >> 3;
+	uint08 Last;
+
+	if(Byte < LastByte)
+		return Line[Byte] ^ (uint08)((Line[Byte] << 1) | (Line[Byte + 1] >> 7));
+
+	/* Drop the padding bits past the line end */
+	Last = (Width - 1) & 7;
+	return ((Line[Byte] ^ (uint08)(Line[Byte] << 1)) & (uint08)(0xFF << (8 - Last)))
+									| (0x80 >> Last);
+}
+
+/**
+ * RLE compression of a packed 1-bit image.
+ *
+ * Produces exactly the bitstream RLE_CompressBMP() produces for the same
+ * image expanded to 24-bit (0 = 0x000000, 1 = 0xFFFFFF), including the
+ * 'not compressible' result, without ever building the 24-bit image.
+ *
+ * Input - Packed pixel rows, MSB first, 1 = white
+ * Width, Height - Image size in pixels
+ * LineBytes - Number of bytes in a packed input row
+ * Output - Compressed data output, or NULL to only compute the size
+ *
+ * return Number of compressed bytes, 0 if the image does not compress
+ */
+int RLE_CompressBits(uint08 const *Input, uint16 Width, uint16 Height,
+											uint16 LineBytes, uint08 *Output)
+{
+	uint08 const *Line = Input;
+	uint32 Pos = 0;
+	uint32 Limit = (uint32)Width * Height * 3;
+	uint16 x;
+	uint16 y;
+	uint16 Raw;
+	uint32 Byte;
+	uint32 LastByte = (uint32)(Width - 1) >> 3;
+	uint08 WordAlign;
+
+	if(!BitTablesReady)
+		InitBitTables();
+
+	for(y = 0; y < Height; y++)
+	{
+		x = 0;
+		Raw = 0;
+
+		/* One run of equal pixels ends at every edge */
+		for(Byte = 0; Byte <= LastByte; Byte++)
+		{
+			uint08 Edges = BitEdges(Line, Byte, Width);
+
+			/* Inside a run: skip the following bytes of the same fill 8 at a time */
+			if(Edges == 0)
+			{
+				uint64 Fill;
+				uint64 Next;
+
+				memset(&Fill, Line[Byte], 8);
+				while(Byte + 8 <= LastByte)
+				{
+					memcpy(&Next, Line + Byte + 1, 8);
+					if(Next != Fill)
+						break;
+					Byte += 7;
+				}
+				continue;
+			}
+
+			while(Edges != 0)
+			{
+				uint08 Bit = FirstBitTable[Edges];
+				uint32 Repeat = Byte * 8 + Bit + 1 - x;
+
+				/*
+				 * Single pixels collect into raw runs of at most 255; a streak
+				 * of them is a streak of edges, taken in one step
+				 */
+				if(Repeat == 1)
+				{
+					uint08 Streak = FirstBitTable[(uint08)~(uint08)(Edges << Bit)];
+
+					Edges &= (uint08)(0xFF >> (Bit + Streak));
+					if(Raw + Streak <= 255)
+					{
+						x += Streak;
+						Raw += Streak;
+						continue;
+					}
+					while(Streak--)
+					{
+						if(Raw == 255)
+						{
+							Pos = PutBitRaw(Output, Pos, Line, x - Raw, Raw);
+							Raw = 0;
+							if(Pos >= Limit)
+								return 0;
+						}
+						x++;
+						Raw++;
+					}
+					continue;
+				}
+
+				Edges ^= 0x80 >> Bit;
+				Pos = PutBitRaw(Output, Pos, Line, x - Raw, Raw);
+				Raw = 0;
+
+				/* Long runs split into 255 pixel pieces; a lone pixel left over is raw */
+				while(Repeat > 1)
+				{
+					uint08 Count = (uint08)MIN(Repeat, 255);
+
+					Pos = PutByte(Output, Pos, Count);
+					Pos = PutBitPixel(Output, Pos, BIT_PIXEL(Line, x));
+					x += Count;
+					Repeat -= Count;
+					if(Pos >= Limit)
+						return 0;
+				}
+				if(Repeat == 1)
+				{
+					x++;
+					Raw++;
+				}
+			}
+		}
+
+		Pos = PutBitRaw(Output, Pos, Line, x - Raw, Raw);
+
+		if(y == Height - 1)
+			break;
+
+		/* End of line */
+		Pos = PutByte(Output, Pos, 0);
+		Pos = PutByte(Output, Pos, 0);
+
+		/* Next line should start in 4 byte boundary */
+		WordAlign = (4 - (Pos & 3)) & 3;
+
+		while(WordAlign--)
+			Pos = PutByte(Output, Pos, 0);
+
+		if(Pos >= Limit)
+			return 0;
+
+		Line = Line + LineBytes;
+	}
+
+	Pos = PutByte(Output, Pos, 0);
+	Pos = PutByte(Output, Pos, 1);
+
+	WordAlign = (16 - (Pos & 0xF)) & 0xF;
+
+	while(WordAlign--)
+		Pos = PutByte(Output, Pos, 0);
+
+	return Pos;
+}
+
 int RLE_CompressBMPSpl(uint08 const *Input, uint16 Width, uint16 Height, 
 											uint16 FullWidth, uint08 *Output)
 {
@@ -456,7 +743,8 @@ int RLE_DecompressBMP(uint08 const *InPtr, uint08 *OutPtr, uint16 ImageWidth)
 			switch(Count)
 			{
 				case 0: /* End of line */
-					InPtr = (uint08 *)ALIGN_BYTES_NEXT((uint32)InPtr, 4);
+					/* Align on the pointer itself; truncating it to uint32 breaks 64-bit builds */
+					InPtr += (4 - ((size_t)InPtr & 3)) & 3;
 					OutPtr = NextLine;
 					NextLine = NextLine + ImageWidth; 
 					break;
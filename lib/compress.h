@@ -26,6 +26,9 @@ int RLE_CompressBMP(uint08 const *Input, uint16 Width, uint16 Height,
 
 int RLE_DecompressBMP(uint08 const *InPtr, uint08 *OutPtr, uint16 ImageWidth);
 
+int RLE_CompressBits(uint08 const *Input, uint16 Width, uint16 Height,
+											uint16 LineBytes, uint08 *Output);
+
 int RLE_TestCompression(void);
 
 #ifdef __cplusplus
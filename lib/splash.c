@@ -128,6 +128,32 @@ static void Splash2ImageUncompressed(uint08 const *Splash, Image_t *Image)
     }
 }
 
+/**
+ * Fill in the splash header for an image of the given size
+ *
+ * @param Header Header to be filled
+ * @param Width Width of the image in pixels
+ * @param Height Height of the image in pixels
+ * @param Compression Compression type used for the data
+ * @param Size Number of bytes of image data following the header
+ *
+ */
+static void FillHeader(SPL_Header_t *Header, int Width, int Height,
+                                    SPL_Compression_t Compression, int Size)
+{
+    memset(Header, 0, sizeof(*Header));
+    memcpy(Header->Signature, "Spld", 4);
+    Header->Image_width = Width;
+    Header->Image_height = Height;
+    Header->Compression = Compression;
+    Header->Byte_count = Size;
+    Header->IsLeftImage = 1;
+    Header->Pixel_format = 1;
+    Header->Subimg_offset = 0xFFFFFFFF;
+    Header->Subimg_end = 0xFFFFFFFF;
+    Header->ByteOrder = 1;
+}
+
 /**
  * Converts the given input image to Splash image
  *
@@ -186,17 +212,42 @@ int SPL_ConvImageToSplash(Image_t const *Image, SPL_Compression_t Compression,
             break;
     }
 
-    memset(Header, 0, sizeof(*Header));
-    memcpy(Header->Signature, "Spld", 4);
-    Header->Image_width = Image->Width;
-    Header->Image_height = Image->Height;
-    Header->Compression = Compression;
-    Header->Byte_count = Size;
-    Header->IsLeftImage = 1;
-    Header->Pixel_format = 1;
-    Header->Subimg_offset = 0xFFFFFFFF;
-    Header->Subimg_end = 0xFFFFFFFF;
-    Header->ByteOrder = 1;
+    FillHeader(Header, Image->Width, Image->Height, Compression, Size);
+
+    return Size + sizeof(SPL_Header_t);
+}
+
+/**
+ * Converts a packed 1-bit image directly to an RLE splash image
+ *
+ * The output is byte-identical to SPL_ConvImageToSplash() with SPL_COMP_RLE
+ * on the same image expanded to 24-bit black/white, but the 24-bit copy is
+ * never built. Call with Splash = NULL first to get the size to allocate.
+ *
+ * @param Bits Packed pixel rows, MSB first, 1 = white
+ * @param Width Width of the image in pixels
+ * @param Height Height of the image in pixels
+ * @param LineBytes Number of bytes in a packed row
+ * @param Splash [out] Splash image, or NULL to only compute the size
+ *
+ * @return Size of the splash image in bytes, FAIL
+ *
+ */
+int SPL_ConvBitsToSplash(uint08 const *Bits, int Width, int Height,
+                                            int LineBytes, uint08 *Splash)
+{
+    int Size;
+
+    if(Bits == NULL)
+        THROW(ERR_NULL_PTR);
+
+    Size = RLE_CompressBits(Bits, Width, Height, LineBytes,
+                    Splash == NULL ? NULL : Splash + sizeof(SPL_Header_t));
+    if(Size <= 0)
+        THROW_MSG(FAIL, "The selected compression scheme not perfoming well; please use Uncompressed compression type.");
+
+    if(Splash != NULL)
+        FillHeader((SPL_Header_t *)Splash, Width, Height, SPL_COMP_RLE, Size);
 
     return Size + sizeof(SPL_Header_t);
 }
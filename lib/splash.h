@@ -37,6 +37,8 @@ typedef struct
 
 int SPL_ConvImageToSplash(Image_t const *Image, SPL_Compression_t Compression, 
 															uint08 *Splash);
+int SPL_ConvBitsToSplash(uint08 const *Bits, int Width, int Height,
+                                            int LineBytes, uint08 *Splash);
 int SPL_ConvSplashToImage(uint08 const *Splash, Image_t *Image);
 int SPL_GetSplashImageInfo(uint08 const *Splash, SPL_Info_t *Info);
 uint08 *SPL_AllocSplash(int Width, int Height);
@@ -22,6 +22,7 @@ static hid_device *DeviceHandle;
 
 static BOOL FakeConnection = FALSE; /**< Simulated connection */
 static BOOL USBConnected = FALSE; /**< Device connected status */
+static USB_Transport_t const *Transport = NULL; /**< Pluggable transport, NULL = HID */
 
 /**
  * Enable/disable simulated connection without HW
@@ -34,6 +35,17 @@ void USB_SetFakeConnection(BOOL enable)
     FakeConnection = enable;
 }
 
+/**
+ * Route all USB traffic through a custom transport instead of the HID device
+ *
+ * @param NewTransport Transport to use, NULL to go back to the HID device.
+ *                  Must stay valid while installed.
+ */
+void USB_SetTransport(USB_Transport_t const *NewTransport)
+{
+    Transport = NewTransport;
+}
+
 /**
  * Check if USB device is conencted.
  *
@@ -44,6 +56,27 @@ BOOL USB_IsConnected()
     return USBConnected;
 }
 
+/**
+ * Check that the DLPC900 is still enumerated on the bus. Does not touch the
+ * open device handle, so it is safe to call from a thread other than the
+ * one doing USB_Write/USB_Read.
+ *
+ * @return TRUE = device present, FALSE = device unplugged
+ */
+BOOL USB_IsPresent()
+{
+    struct hid_device_info *hid_info;
+
+    if(FakeConnection == TRUE || Transport != NULL)
+        return USBConnected;
+
+    hid_info = hid_enumerate(MY_VID, MY_PID);
+    if(hid_info == NULL)
+        return FALSE;
+    hid_free_enumeration(hid_info);
+    return TRUE;
+}
+
 /**
  * Initialize USB driver
  *
@@ -71,7 +104,7 @@ int USB_Exit(void)
  */
 int USB_Open()
 {
-    if(FakeConnection == FALSE)
+    if(FakeConnection == FALSE && Transport == NULL)
     {
         struct hid_device_info *hid_info;
         hid_info = hid_enumerate(MY_VID, MY_PID);
@@ -117,6 +150,9 @@ static unsigned char dispmode;
  */
 int USB_Write(uint08 *Data)
 {
+    if(Transport != NULL)
+        return Transport->Write(Transport->Context, Data);
+
     if(FakeConnection == TRUE)
     {
         memcpy(&dummyMsg, Data + 1, 16);
@@ -156,6 +192,9 @@ int USB_Write(uint08 *Data)
  */
 int USB_Read(uint08 *Data)
 {
+    if(Transport != NULL)
+        return Transport->Read(Transport->Context, Data);
+
     if(FakeConnection == TRUE)
     {
         switch(dummyMsg.text.cmd)
@@ -188,7 +227,7 @@ int USB_Read(uint08 *Data)
  */
 int USB_Close()
 {
-    if(FakeConnection == FALSE)
+    if(FakeConnection == FALSE && Transport == NULL)
     {
         hid_close(DeviceHandle);
         USBConnected = FALSE;
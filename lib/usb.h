@@ -88,9 +88,19 @@ typedef struct
         unsigned char data[HID_MESSAGE_MAX_SIZE];
     }text;
 }hidMessageStruct;
+/** Replacement for the HID device, e.g. a fake device in tests */
+typedef struct
+{
+    int (*Write)(void *Context, uint08 *Data); /**< Send one report (report ID + 64 bytes), >0 on success */
+    int (*Read)(void *Context, uint08 *Data);  /**< Receive one 64 byte report, >0 on success */
+    void *Context;                             /**< Passed back to Write/Read */
+} USB_Transport_t;
+
 void USB_SetFakeConnection(BOOL enable);
+void USB_SetTransport(USB_Transport_t const *NewTransport);
 int USB_Open(void);
 BOOL USB_IsConnected();
+BOOL USB_IsPresent();
 int USB_Write(uint08 *Data);
 int USB_Read(uint08 *Data);
 int USB_Close();
@@ -2,12 +2,102 @@
 #include <ASICamera2.h>
 #include <windows.h>
 
+#include <chrono>
+#include <condition_variable>
+#include <cstring>
+#include <mutex>
+#include <thread>
+#include <vector>
+
 #ifdef _WIN32
     #define ASI_API __declspec(dllexport)
 #else
     #define ASI_API
 #endif
 
+// ============== Capture Ring State ==============
+
+// A capture thread owns ASIGetVideoData while the ring runs and keeps the
+// newest nSlots frames. Frame seq (1, 2, ...) lives in slot (seq - 1) % nSlots.
+// Each frame is captured into a spare buffer outside the lock, which is then
+// swapped with the slot it replaces, so readers only wait for a memcpy.
+struct CaptureRing {
+    std::mutex lock;
+    std::condition_variable frameReady;
+    std::thread thread;
+    bool running = false;
+    int cameraID = -1;
+    int frameSize = 0;
+    std::vector<std::vector<unsigned char>> slots;
+    std::vector<unsigned int> slotSeq;  // Frame held by each slot, 0 if none yet
+    std::vector<unsigned char> spare;
+    unsigned int captured = 0;          // Sequence number of the newest frame
+    int dropped = 0;                    // SDK drops while the ring runs
+};
+
+static CaptureRing ring;
+
+static void ring_capture_loop() {
+    // Short waits keep cam_ring_stop responsive; a pending frame is simply
+    // picked up by the next call
+    const int waitMs = 100;
+    while (true) {
+        {
+            std::lock_guard<std::mutex> guard(ring.lock);
+            if (!ring.running) break;
+        }
+        ASI_ERROR_CODE res = ASIGetVideoData(ring.cameraID, ring.spare.data(), ring.frameSize, waitMs);
+        if (res == ASI_ERROR_TIMEOUT) continue;
+        if (res != ASI_SUCCESS) {
+            // Camera gone or not capturing: back off instead of spinning
+            std::this_thread::sleep_for(std::chrono::milliseconds(waitMs));
+            continue;
+        }
+
+        int dropped = 0;
+        ASIGetDroppedFrames(ring.cameraID, &dropped);
+        {
+            std::lock_guard<std::mutex> guard(ring.lock);
+            unsigned int seq = ring.captured + 1;
+            size_t slot = (seq - 1) % ring.slots.size();
+            ring.slots[slot].swap(ring.spare);
+            ring.slotSeq[slot] = seq;
+            ring.captured = seq;
+            ring.dropped = dropped;
+        }
+        ring.frameReady.notify_all();
+    }
+}
+
+// Stops the capture thread and frees the slots; does not stop video capture
+static void ring_halt() {
+    {
+        std::lock_guard<std::mutex> guard(ring.lock);
+        if (!ring.running) return;
+        ring.running = false;
+    }
+    ring.frameReady.notify_all();
+    if (ring.thread.joinable()) ring.thread.join();
+
+    std::lock_guard<std::mutex> guard(ring.lock);
+    ring.slots.clear();
+    ring.slotSeq.clear();
+    ring.spare.clear();
+    ring.spare.shrink_to_fit();
+}
+
+// Copies frame seq into buffer, or the oldest frame still held if seq has
+// been overwritten. Caller holds ring.lock. Returns the sequence copied, 0 if none
+static unsigned int ring_copy(unsigned int seq, unsigned char* buffer) {
+    size_t nSlots = ring.slots.size();
+    if (seq == 0 || seq > ring.captured) return 0;
+    if (ring.captured - seq >= nSlots) seq = ring.captured - static_cast<unsigned int>(nSlots) + 1;
+    size_t slot = (seq - 1) % nSlots;
+    if (ring.slotSeq[slot] != seq) return 0;
+    memcpy(buffer, ring.slots[slot].data(), ring.frameSize);
+    return seq;
+}
+
 extern "C" {
 // TODO: Document functions aka multi-line comments them
 
@@ -173,8 +263,9 @@ ASI_API int cam_start_video(int cameraID) {
     return 0;
 }
 
-// Stops video capture
+// Stops video capture (and the capture ring, if running)
 ASI_API int cam_stop_video(int cameraID) {
+    ring_halt();
     ASI_ERROR_CODE res = ASIStopVideoCapture(cameraID);
     if (res != ASI_SUCCESS) return -1;
     return 0;
@@ -188,6 +279,138 @@ ASI_API int cam_get_frame(int cameraID, unsigned char* buffer, int bufferSize, i
     return 0;
 }
 
+// Gets number of frames dropped since video capture started (buffer overruns)
+ASI_API int cam_get_dropped_frames(int cameraID, int* dropped) {
+    if (!dropped) return -1;
+    ASI_ERROR_CODE res = ASIGetDroppedFrames(cameraID, dropped);
+    if (res != ASI_SUCCESS) return -1;
+    return 0;
+}
+
+// ============== Capture Ring ==============
+
+// Starts video capture with a capture thread filling an nSlots frame ring.
+// Frame size follows the current ROI; restart the ring after changing it.
+// While the ring runs, read frames with cam_ring_latest / cam_ring_read
+// instead of cam_get_frame
+ASI_API int cam_ring_start(int cameraID, int nSlots) {
+    if (nSlots < 2) return -1;
+    ring_halt();
+
+    int width = 0, height = 0, bin = 0;
+    ASI_IMG_TYPE type;
+    if (ASIGetROIFormat(cameraID, &width, &height, &bin, &type) != ASI_SUCCESS) return -2;
+    int bytesPerPixel = type == ASI_IMG_RGB24 ? 3 : type == ASI_IMG_RAW16 ? 2 : 1;
+
+    std::lock_guard<std::mutex> guard(ring.lock);
+    ring.cameraID = cameraID;
+    ring.frameSize = width * height * bytesPerPixel;
+    ring.slots.assign(nSlots, std::vector<unsigned char>(ring.frameSize));
+    ring.slotSeq.assign(nSlots, 0);
+    ring.spare.assign(ring.frameSize, 0);
+    ring.captured = 0;
+    ring.dropped = 0;
+
+    if (ASIStartVideoCapture(cameraID) != ASI_SUCCESS) {
+        ring.slots.clear();
+        ring.slotSeq.clear();
+        return -3;
+    }
+    ring.running = true;
+    ring.thread = std::thread(ring_capture_loop);
+    return 0;
+}
+
+// Stops the capture thread and video capture
+ASI_API int cam_ring_stop(int cameraID) {
+    ring_halt();
+    ASI_ERROR_CODE res = ASIStopVideoCapture(cameraID);
+    if (res != ASI_SUCCESS) return -1;
+    return 0;
+}
+
+// Copies the newest frame if it is newer than *seq (the last frame the
+// caller has, 0 for none) and sets *seq to it. Never blocks.
+// Returns 0 on a new frame, 1 if there is none, <0 on error
+ASI_API int cam_ring_latest(int cameraID, unsigned char* buffer, int bufferSize, unsigned int* seq) {
+    if (!buffer || !seq) return -100;
+    std::lock_guard<std::mutex> guard(ring.lock);
+    if (!ring.running || ring.cameraID != cameraID) return -1;
+    if (bufferSize < ring.frameSize) return -100;
+    if (ring.captured <= *seq) return 1;
+    *seq = ring_copy(ring.captured, buffer);
+    return 0;
+}
+
+// Copies frame *seq, waiting up to waitMs for it to be captured (negative
+// waits forever). If the frame has already been overwritten the oldest frame
+// still held is copied instead and *seq updated, so the caller sees the gap.
+// Returns 0 on success, -2 on timeout, <0 on other errors
+ASI_API int cam_ring_read(int cameraID, unsigned int* seq, unsigned char* buffer, int bufferSize, int waitMs) {
+    if (!buffer || !seq || *seq == 0) return -100;
+    std::unique_lock<std::mutex> guard(ring.lock);
+    if (!ring.running || ring.cameraID != cameraID) return -1;
+    if (bufferSize < ring.frameSize) return -100;
+
+    unsigned int wanted = *seq;
+    auto arrived = [wanted] { return !ring.running || ring.captured >= wanted; };
+    if (waitMs < 0) {
+        ring.frameReady.wait(guard, arrived);
+    } else if (!ring.frameReady.wait_for(guard, std::chrono::milliseconds(waitMs), arrived)) {
+        return -2;
+    }
+    if (!ring.running) return -1;
+    *seq = ring_copy(wanted, buffer);
+    return 0;
+}
+
+// Gets frames captured into the ring and frames the SDK dropped since cam_ring_start
+ASI_API int cam_ring_stats(int cameraID, int* dropped, int* captured) {
+    if (!dropped || !captured) return -1;
+    std::lock_guard<std::mutex> guard(ring.lock);
+    if (ring.cameraID != cameraID) return -1;
+    *dropped = ring.dropped;
+    *captured = static_cast<int>(ring.captured);
+    return 0;
+}
+
+// ============== Trigger Mode ==============
+
+// Reports whether the camera has a trigger port (1) or not (0)
+ASI_API int cam_is_trigger_cam(int cameraID, int* isTrigger) {
+    if (!isTrigger) return -1;
+    ASI_CAMERA_INFO info;
+    ASI_ERROR_CODE res = ASIGetCameraPropertyByID(cameraID, &info);
+    if (res != ASI_SUCCESS) return -1;
+    *isTrigger = info.IsTriggerCam == ASI_TRUE ? 1 : 0;
+    return 0;
+}
+
+// Sets camera mode: 0=normal, 1=soft edge, 2=rising edge, 3=falling edge,
+// 4=soft level, 5=high level, 6=low level. Frames are then read with cam_get_frame
+ASI_API int cam_set_camera_mode(int cameraID, int mode) {
+    ASI_ERROR_CODE res = ASISetCameraMode(cameraID, static_cast<ASI_CAMERA_MODE>(mode));
+    if (res != ASI_SUCCESS) return -1;
+    return 0;
+}
+
+// Gets current camera mode (see cam_set_camera_mode)
+ASI_API int cam_get_camera_mode(int cameraID, int* mode) {
+    if (!mode) return -1;
+    ASI_CAMERA_MODE m;
+    ASI_ERROR_CODE res = ASIGetCameraMode(cameraID, &m);
+    if (res != ASI_SUCCESS) return -1;
+    *mode = static_cast<int>(m);
+    return 0;
+}
+
+// Sends a soft trigger; edge modes only need start=1, level modes start and stop
+ASI_API int cam_send_soft_trigger(int cameraID, int start) {
+    ASI_ERROR_CODE res = ASISendSoftTrigger(cameraID, static_cast<ASI_BOOL>(start));
+    if (res != ASI_SUCCESS) return -1;
+    return 0;
+}
+
 // ============== Snap Mode ==============
 
 // Starts snap exposure
@@ -301,7 +524,9 @@ ASI_API int cam_init_camera(int* cameraID, int roiWidth, int roiHeight, int roiB
 
 // Stops the camera and closes it
 ASI_API int cam_stop_camera(int cameraID) {
+    ring_halt();
     ASIStopVideoCapture(cameraID);
+    ASISetCameraMode(cameraID, ASI_MODE_NORMAL);
     ASIStopExposure(cameraID);
 
     ASI_ERROR_CODE closeResult = ASICloseCamera(cameraID);
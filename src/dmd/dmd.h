@@ -1,6 +1,20 @@
 #ifndef CMD_H
 #define CMD_H
 
+/** Microseconds spent in each stage of the last display call */
+typedef struct {
+    double otfUs;               /* OTF mode check/switch */
+    double ledUs;               /* LED enable */
+    double loadUs;              /* BMP file load (0 for in-memory buffers) */
+    double splashUs;            /* Splash conversion */
+    double uploadUs;            /* USB pattern memory upload */
+    double lutUs;               /* Pattern LUT, config and validation */
+    double totalUs;             /* Whole call */
+    unsigned int uploadBytes;   /* Splash bytes sent */
+    unsigned int uploadPackets; /* HID reports used for them */
+    unsigned int uploadAcks;    /* Round trips spent checking for upload errors */
+} DMD_Timings_t;
+
 // Connection commands (dmd_connection.c)
 int cmd_is_connected(void);
 int cmd_connect(void);
@@ -25,9 +39,31 @@ int cmd_tpg(void);
 
 // BMP Image loading (dmd_image.c)
 int cmd_display_bmp(const char *filename);
+int cmd_display_buffer(const unsigned char *bits, int width, int height);
+int cmd_preload_buffer(const unsigned char *bits, int width, int height);
 int cmd_load_bmp(void);
 int cmd_load_white(void);
 int cmd_load_black(void);
 int cmd_load_half(void);
+int cmd_play_sequence(const unsigned char *bits, int count, int width, int height,
+                      int exposureUs, int darkUs, unsigned int repeat);
+int cmd_configure_playback(int exposureUs, int darkUs, int ledSelect, unsigned int repeat, int waitForTrigger);
+void cmd_get_playback(int *exposureUs, int *darkUs, int *ledSelect, unsigned int *repeat, int *waitForTrigger);
+int cmd_configure_trigger_out(int trigOut, int invert, int risingUs, int fallingUs);
+
+// Device-resident pattern cache (dmd_image.c)
+void cmd_invalidate_pattern_cache(void);
+void cmd_invalidate_display_state(void);
+void cmd_release_sequence_images(void);
+int cmd_set_upload_ack_interval(int interval);
+void cmd_get_elided_stats(unsigned int *otf, unsigned int *led, unsigned int *display);
+int cmd_set_pattern_cache_slots(int slots);
+void cmd_get_pattern_cache_stats(unsigned int *hits, unsigned int *misses, unsigned int *evictions);
+
+// Timing and quiet mode (dmd_timing.c)
+extern int dmd_quiet;
+double cmd_now_us(void);
+void cmd_set_quiet(int quiet);
+void cmd_get_last_timings(DMD_Timings_t *timings);
 
 #endif
\ No newline at end of file
@@ -98,6 +98,7 @@ DMD_API int dmd_show_tpg(void) {
 // ============== LED Control ==============
 
 DMD_API int dmd_set_led_enables(int seq_ctrl, int red, int green, int blue) {
+    cmd_invalidate_display_state();
     return LCR_SetLedEnables(seq_ctrl, red, green, blue);
 }
 
@@ -118,6 +119,36 @@ DMD_API int dmd_display_bmp(const char* filename) {
     return cmd_display_bmp(filename);
 }
 
+DMD_API int dmd_display_buffer(const unsigned char* bits, int width, int height) {
+    if (!bits) return -1;
+    return cmd_display_buffer(bits, width, height);
+}
+
+DMD_API int dmd_preload_buffer(const unsigned char* bits, int width, int height) {
+    if (!bits) return -1;
+    return cmd_preload_buffer(bits, width, height);
+}
+
+DMD_API int dmd_play_sequence(const unsigned char* bits, int count, int width, int height,
+                              int exposure_us, int dark_us, unsigned int repeat) {
+    if (!bits) return -1;
+    return cmd_play_sequence(bits, count, width, height, exposure_us, dark_us, repeat);
+}
+
+DMD_API int dmd_configure_playback(int exposure_us, int dark_time_us, int led_mask,
+                                   unsigned int repeat, int wait_for_trigger) {
+    return cmd_configure_playback(exposure_us, dark_time_us, led_mask, repeat, wait_for_trigger);
+}
+
+DMD_API void dmd_get_playback(int* exposure_us, int* dark_time_us, int* led_mask,
+                              unsigned int* repeat, int* wait_for_trigger) {
+    cmd_get_playback(exposure_us, dark_time_us, led_mask, repeat, wait_for_trigger);
+}
+
+DMD_API int dmd_configure_trigger_out(int trig_out, int invert, int rising_us, int falling_us) {
+    return cmd_configure_trigger_out(trig_out, invert, rising_us, falling_us);
+}
+
 DMD_API int dmd_load_white(void) {
     return cmd_load_white();
 }
@@ -129,3 +160,45 @@ DMD_API int dmd_load_black(void) {
 DMD_API int dmd_load_half(void) {
     return cmd_load_half();
 }
+
+// ============== Pattern Cache ==============
+
+DMD_API int dmd_get_cache_stats(unsigned int* hits, unsigned int* misses, unsigned int* evictions) {
+    if (!hits || !misses || !evictions) return -1;
+    cmd_get_pattern_cache_stats(hits, misses, evictions);
+    return 0;
+}
+
+DMD_API int dmd_set_cache_slots(int slots) {
+    return cmd_set_pattern_cache_slots(slots);
+}
+
+DMD_API void dmd_invalidate_cache(void) {
+    cmd_invalidate_pattern_cache();
+}
+
+DMD_API int dmd_get_elided_stats(unsigned int* otf, unsigned int* led, unsigned int* display) {
+    if (!otf || !led || !display) return -1;
+    cmd_get_elided_stats(otf, led, display);
+    return 0;
+}
+
+DMD_API void dmd_invalidate_display_state(void) {
+    cmd_invalidate_display_state();
+}
+
+// ============== Timing ==============
+
+DMD_API int dmd_get_last_timings(DMD_Timings_t* timings) {
+    if (!timings) return -1;
+    cmd_get_last_timings(timings);
+    return 0;
+}
+
+DMD_API int dmd_set_upload_ack_interval(int interval) {
+    return cmd_set_upload_ack_interval(interval);
+}
+
+DMD_API void dmd_set_quiet(int quiet) {
+    cmd_set_quiet(quiet);
+}
@@ -3,30 +3,37 @@
 */
 #include <stdio.h>
 #include "usb.h"
+#include "dmd.h"
 
 /**
- * Checks if DLPC900 device is connected
+ * Checks that the DLPC900 connection is open and the device is still on the
+ * bus. Only enumerates USB devices, so it is cheap and can run on a monitor
+ * thread while another thread owns the HID handle.
+ * @return 0 if connected, -1 if never connected or unplugged
  */
 int cmd_is_connected(void) {
-    if (USB_Open() != 0) {
-            printf("ERROR: Cannot connect to DLPC900. Is the device connected?\n");
-            USB_Exit();
-            return -1;
-        }
+    if (!USB_IsConnected() || !USB_IsPresent()) return -1;
     return 0;
 }
 
-/** 
+/**
  *   Establish USB connection to DLPC900 device
 */
 int cmd_connect(void) {
+    cmd_invalidate_pattern_cache();
+    /* Drop the stale handle left behind by an unplug */
+    if (USB_IsConnected()) USB_Close();
     if (USB_Init() != 0) {
         printf("ERROR: USB initialization failed\n");
         return -1;
     }
-    
-    if(cmd_is_connected() != 0) return -1;
-    
+
+    if (USB_Open() != 0) {
+        printf("ERROR: Cannot connect to DLPC900. Is the device connected?\n");
+        USB_Exit();
+        return -1;
+    }
+
     printf("Connected to DLPC900\n");
     return 0;
 }
@@ -36,6 +43,7 @@ int cmd_connect(void) {
 *   Close USB connection to DLPC900 device
 */
 int cmd_disconnect(void) {
+    cmd_invalidate_pattern_cache();
     USB_Close();
     USB_Exit();
     return 0;
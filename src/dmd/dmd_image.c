@@ -13,14 +13,284 @@
 #include "pattern.h"
 #include "splash.h"
 
+/* Binary patterns packed into one 24-bit image */
+#define PATTERNS_PER_IMAGE  24
+/* Size of the pattern LUT kept by API.c */
+#define MAX_SEQUENCE_PATTERNS 1024
+
+/* Progress output, suppressed in quiet mode. Errors always use printf. */
+#define LOG(...) do { if (!dmd_quiet) printf(__VA_ARGS__); } while (0)
+
+/* DLPC900 1-bit exposure floor (DLP6500, the slowest supported DMD) */
+#define MIN_EXPOSURE_1BIT_US 105
+/* Exposure and dark time are 24-bit fields in the pattern LUT */
+#define MAX_LUT_TIME_US      0xFFFFFF
+
+/* TRIG_OUT edge delay range relative to the pattern exposure, in us */
+#define MIN_TRIG_OUT_DELAY_US (-20)
+#define MAX_TRIG_OUT_DELAY_US 20000
+
+/* Pattern LUT repeat count that loops forever */
+#define REPEAT_FOREVER 0xFFFFFFFF
+
+/* Image indices reserved for the device-resident pattern cache. Pattern
+   memory holds 400 full-resolution 1-bit patterns, i.e. 16 whole 24-bit
+   images, and each cached pattern takes one image (see CacheSlot_t) */
+#define MAX_CACHE_SLOTS     16
+#define DEFAULT_CACHE_SLOTS 16
+
+/**
+ * One uploaded pattern living in DLPC900 pattern memory. A cached pattern
+ * is uploaded as a black/white image (SPL_ConvBitsToSplash), the same in
+ * all 24 bit planes, so it takes a whole image index and bitIndex is 0.
+ * Packing cached patterns into planes would mean re-uploading the image,
+ * the other 23 patterns included, for every new pattern, and the mixed
+ * planes compress far worse; play_sequence packs 24 per image instead.
+ */
+typedef struct {
+    int used;
+    uint64 hash;            /* FNV-1a of the packed pattern and its size */
+    unsigned long lastUse;  /* Value of cache_clock when last displayed */
+    int imageIndex;         /* Image index the splash was uploaded to */
+    int bitIndex;           /* First bit plane of the pattern in that image (0) */
+} CacheSlot_t;
+
+/** LUT parameters used for single-pattern display */
+typedef struct {
+    int exposureUs;
+    int darkUs;             /* Pattern is cleared for this long after each exposure */
+    int ledSelect;          /* b0 = Red, b1 = Green, b2 = Blue */
+    unsigned int repeat;    /* 0xFFFFFFFF loops forever */
+    int waitForTrigger;     /* Each exposure waits for TRIG_IN_1 */
+} Playback_t;
+
 /**
- * Load a 1-bit BMP file and return the 24-bit structure
+ * What the device is known to be showing, used to elide redundant commands.
+ * A LUT with a finite repeat count may have finished since, so displaying
+ * only means the pattern is still on the mirrors when it loops forever.
+ */
+typedef struct {
+    int otfMode;            /* Device confirmed in OTF mode */
+    int ledsEnabled;        /* All LEDs enabled by prepare_display */
+    int displaying;         /* A pattern LUT is running */
+    uint64 hash;            /* Pattern being displayed */
+    int imageIndex;         /* Where the displayed pattern lives */
+    int bitIndex;
+    Playback_t playback;    /* LUT parameters it was started with */
+} DisplayState_t;
+
+/* exposure = 500ms, white, repeat=0xFFFFFFFF for infinite loop */
+static Playback_t playback = { 500000, 0, 7, REPEAT_FOREVER, 0 };
+static DisplayState_t display_state;
+/* Image indices 0..n-1 hold the images of a sequence LUT that may still be
+   running; kept apart from display_state, which is forgotten more freely */
+static int sequence_images = 0;
+static DMD_Timings_t last_timings;
+static unsigned int elided_otf = 0;
+static unsigned int elided_led = 0;
+static unsigned int elided_display = 0;
+
+/* PATMEM_LOAD_DATA commands sent between upload error checks; 0 checks
+   the final command of each image only (see LCR_PatternMemLoadStream) */
+static int upload_ack_interval = 0;
+
+static CacheSlot_t cache_slots[MAX_CACHE_SLOTS];
+static int cache_num_slots = DEFAULT_CACHE_SLOTS;
+static unsigned long cache_clock = 0;
+static unsigned int cache_hits = 0;
+static unsigned int cache_misses = 0;
+static unsigned int cache_evictions = 0;
+
+/**
+ * Hash a packed pattern together with its size (64-bit FNV-1a)
+ */
+static uint64 hash_bits(const uint08 *bits, int width, int height, int rowBytes) {
+    uint64 hash = 0xCBF29CE484222325ULL;
+    size_t size = (size_t)rowBytes * height;
+
+    hash = (hash ^ (uint64)width) * 0x100000001B3ULL;
+    hash = (hash ^ (uint64)height) * 0x100000001B3ULL;
+    for (size_t i = 0; i < size; i++)
+        hash = (hash ^ bits[i]) * 0x100000001B3ULL;
+    return hash;
+}
+
+/**
+ * Find the slot holding a pattern and mark it as most recently used
+ * @return Slot or NULL when the pattern is not on the device
+ */
+static CacheSlot_t* cache_lookup(uint64 hash) {
+    for (int i = 0; i < cache_num_slots; i++) {
+        if (cache_slots[i].used && cache_slots[i].hash == hash) {
+            cache_slots[i].lastUse = ++cache_clock;
+            return &cache_slots[i];
+        }
+    }
+    return NULL;
+}
+
+/**
+ * Claim a slot for a new pattern: a free one, otherwise the least recently
+ * used. The pattern on the mirrors is never evicted, so the next pattern
+ * uploads into another image index while it shows, and image indices held
+ * by a running sequence are never claimed either.
+ * @return Slot, or NULL when the running LUT holds every slot
+ */
+static CacheSlot_t* cache_claim(uint64 hash) {
+    CacheSlot_t *slot = NULL;
+
+    for (int i = 0; i < cache_num_slots; i++) {
+        /* Slot i uploads to image index i */
+        if (i < sequence_images)
+            continue;
+        if (!cache_slots[i].used) {
+            slot = &cache_slots[i];
+            break;
+        }
+        if (display_state.displaying && cache_slots[i].hash == display_state.hash)
+            continue;
+        if (!slot || cache_slots[i].lastUse < slot->lastUse)
+            slot = &cache_slots[i];
+    }
+
+    if (!slot) return NULL;
+    if (slot->used) {
+        LOG("  Evicting cached pattern from image index %d\n", slot->imageIndex);
+        cache_evictions++;
+    }
+    slot->used = 1;
+    slot->hash = hash;
+    slot->lastUse = ++cache_clock;
+    slot->imageIndex = (int)(slot - cache_slots);
+    slot->bitIndex = 0;
+    return slot;
+}
+
+/**
+ * Drop cached patterns living in image indices that are about to be overwritten
+ */
+static void cache_release(int firstIndex, int count) {
+    for (int i = 0; i < cache_num_slots; i++) {
+        if (cache_slots[i].used && cache_slots[i].imageIndex >= firstIndex &&
+            cache_slots[i].imageIndex < firstIndex + count)
+            cache_slots[i].used = 0;
+    }
+}
+
+/**
+ * Forget every uploaded pattern. Called whenever the device may have lost
+ * its pattern memory (mode change, reset, standby, reconnect).
+ */
+void cmd_invalidate_pattern_cache(void) {
+    memset(cache_slots, 0, sizeof(cache_slots));
+    sequence_images = 0;
+    cmd_invalidate_display_state();
+}
+
+/**
+ * Forget the known mode, LED and displayed-pattern state so the next
+ * display sends every command again. Called when anything outside
+ * display_bits may have changed it.
+ */
+void cmd_invalidate_display_state(void) {
+    memset(&display_state, 0, sizeof(display_state));
+}
+
+/**
+ * Hand the image indices of a sequence back to the pattern cache once its
+ * LUT has been stopped
+ */
+void cmd_release_sequence_images(void) {
+    sequence_images = 0;
+}
+
+/**
+ * Set how many upload commands (504 bytes each) are streamed between error
+ * code checks; 0 (the default) checks once at the end of each image and
+ * 1 checks every command. A check only sees the command just before it.
+ * @return 0 on success, -1 on invalid interval
+ */
+int cmd_set_upload_ack_interval(int interval) {
+    if (interval < 0) {
+        printf("ERROR: Upload ack interval must be >= 0\n");
+        return -1;
+    }
+    upload_ack_interval = interval;
+    return 0;
+}
+
+/**
+ * Copy the stage timings of the last display call
+ */
+void cmd_get_last_timings(DMD_Timings_t *timings) {
+    *timings = last_timings;
+}
+
+/**
+ * Read how many commands were skipped because the device already matched
+ */
+void cmd_get_elided_stats(unsigned int *otf, unsigned int *led, unsigned int *display) {
+    *otf = elided_otf;
+    *led = elided_led;
+    *display = elided_display;
+}
+
+/**
+ * Set how many image indices the pattern cache may use (1..MAX_CACHE_SLOTS)
+ * @return 0 on success, -1 on invalid count
+ */
+int cmd_set_pattern_cache_slots(int slots) {
+    if (slots < 1 || slots > MAX_CACHE_SLOTS) {
+        printf("ERROR: Pattern cache slots must be 1..%d\n", MAX_CACHE_SLOTS);
+        return -1;
+    }
+    cmd_invalidate_pattern_cache();
+    cache_num_slots = slots;
+    return 0;
+}
+
+/**
+ * Read the pattern cache counters
+ */
+void cmd_get_pattern_cache_stats(unsigned int *hits, unsigned int *misses, unsigned int *evictions) {
+    *hits = cache_hits;
+    *misses = cache_misses;
+    *evictions = cache_evictions;
+}
+
+/**
+ * Print an ASCII preview (60x20) of a packed 1-bit image
+ * @param bits - Packed rows, MSB first
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @param rowBytes - Number of bytes in a packed row
+ */
+static void print_preview(const uint08 *bits, int width, int height, int rowBytes) {
+    LOG("=== Image Preview (scaled 60x20) ===\n");
+    for (int py = 0; py < 20; py++) {
+        int imgY = (py * height) / 20;
+        for (int px = 0; px < 60; px++) {
+            int imgX = (px * width) / 60;
+            int bit = bits[imgY * rowBytes + (imgX >> 3)] & (0x80 >> (imgX & 7));
+            LOG("%c", bit ? '#' : '.');
+        }
+        LOG("\n");
+    }
+    LOG("====================================\n\n");
+}
+
+/**
+ * Load a 1-bit BMP file as packed bits (no 24-bit expansion)
  * @param filename - Path to the BMP file
- * @return Pointer to Image_t structure (24-bit) or NULL on failure
+ * @param width - Receives the width in pixels
+ * @param height - Receives the height in pixels
+ * @return Packed rows, MSB first, (width + 7) / 8 bytes per row, or NULL on failure.
+ *         Free with free().
  */
-static Image_t* load_bmp_file(const char *filename) {
+static uint08* load_bmp_file(const char *filename, int *width, int *height) {
     Image_t imgInfo;
-    Image_t *image = NULL;
+    uint08 *bits = NULL;
+    int rowBytes;
     
     if (BMP_GetFileInfo(filename, &imgInfo) < 0) {
         printf("ERROR: Cannot read BMP file: %s\n", filename);
@@ -32,70 +302,68 @@ static Image_t* load_bmp_file(const char *filename) {
         return NULL;
     }
     
-    /* 
-     * Note: Allocate as 24-bit
-     * BMP_ParseImage() inside BMP_AllocImage() reads 1-bit BMP and converts to output 24-bit depth via palette
-     */
-    image = BMP_AllocImage(imgInfo.Width, imgInfo.Height, 24);
-    if (!image) {
+    rowBytes = (imgInfo.Width + 7) / 8;
+    bits = malloc(rowBytes * imgInfo.Height);
+    if (!bits) {
         printf("ERROR: Cannot allocate image buffer\n");
         return NULL;
     }
 
     // Show BMP metadata
-    printf("\n=== BMP Image Metadata ===\n");
-    printf("  Filename:   %s\n", filename);
-    printf("  Width:      %d pixels\n", imgInfo.Width);
-    printf("  Height:     %d pixels\n", imgInfo.Height);
-    printf("  Input:      %d-bit BMP\n", imgInfo.BitDepth);
-    printf("  Output:     24-bit (for splash format)\n");
-    printf("  LineWidth:  %d bytes\n", image->LineWidth);
-    printf("==========================\n\n");
+    LOG("\n=== BMP Image Metadata ===\n");
+    LOG("  Filename:   %s\n", filename);
+    LOG("  Width:      %d pixels\n", imgInfo.Width);
+    LOG("  Height:     %d pixels\n", imgInfo.Height);
+    LOG("  Input:      %d-bit BMP\n", imgInfo.BitDepth);
+    LOG("  Output:     1-bit packed (for splash format)\n");
+    LOG("  LineWidth:  %d bytes\n", rowBytes);
+    LOG("==========================\n\n");
     
-    if (BMP_LoadFromFile(filename, image) < 0) {
+    if (BMP_LoadBitsFromFile(filename, bits, imgInfo.Height, rowBytes) < 0) {
         printf("ERROR: Cannot load BMP data\n");
-        BMP_FreeImage(image);
+        free(bits);
         return NULL;
     }
 
-    // ASCII preview (60x20)
-    printf("=== Image Preview (scaled 60x20) ===\n");
-    for (int py = 0; py < 20; py++) {
-        int imgY = (py * image->Height) / 20;
-        for (int px = 0; px < 60; px++) {
-            int imgX = (px * image->Width) / 60;
-            int idx = imgY * image->LineWidth + (imgX * 3);
-            printf("%c", image->Buffer[idx] ? '#' : '.');
-        }
-        printf("\n");
-    }
-    printf("====================================\n\n");
+    if (!dmd_quiet) print_preview(bits, imgInfo.Width, imgInfo.Height, rowBytes);
 
-    printf("BMP loaded successfully (24-bit)\n");
-    return image;
+    LOG("BMP loaded successfully (1-bit)\n");
+    *width = imgInfo.Width;
+    *height = imgInfo.Height;
+    return bits;
 }
 
 /**
- * Convert a 24-bit Image_t to splash format with RLE compression
- * @param image - Pointer to 24-bit Image_t
+ * Convert a packed 1-bit image to splash format with RLE compression.
+ * Encodes straight from the bits; the splash buffer is sized to the
+ * compressed data instead of the uncompressed 24-bit image.
+ * @param bits - Packed rows, MSB first
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @param rowBytes - Number of bytes in a packed row
  * @param outSplash - Pointer to store allocated splash buffer
  * @return Size of splash data in bytes, or -1 on failure
  */
-static int convert_to_splash(Image_t *image, uint08 **outSplash) {
-    uint08 *splash = SPL_AllocSplash(image->Width, image->Height);
+static int convert_to_splash(const uint08 *bits, int width, int height, int rowBytes, uint08 **outSplash) {
+    int splashSize = SPL_ConvBitsToSplash(bits, width, height, rowBytes, NULL);
+    if (splashSize < 0) {
+        printf("ERROR: Cannot convert to splash format\n");
+        return -1;
+    }
+
+    uint08 *splash = malloc(splashSize);
     if (!splash) {
         printf("ERROR: Cannot allocate splash buffer\n");
         return -1;
     }
     
-    int splashSize = SPL_ConvImageToSplash(image, SPL_COMP_RLE, splash);
-    if (splashSize < 0) {
+    if (SPL_ConvBitsToSplash(bits, width, height, rowBytes, splash) != splashSize) {
         printf("ERROR: Cannot convert to splash format\n");
         SPL_Free(splash);
         return -1;
     }
     
-    printf("Compressed to %d bytes\n", splashSize);
+    LOG("Compressed to %d bytes\n", splashSize);
     *outSplash = splash;
     return splashSize;
 }
@@ -108,64 +376,49 @@ static int convert_to_splash(Image_t *image, uint08 **outSplash) {
  * @return 0 on success, -1 on failure
  */
 static int upload_pattern_data(uint08 *splash, int splashSize, int imageIndex) {
-    int offset, chunkSize;
+    API_UploadStats_t stats;
+    double start = cmd_now_us();
+    double seconds;
+    int result;
     
-    printf("  Uploading to image index %d...\n", imageIndex);
+    LOG("  Uploading to image index %d...\n", imageIndex);
     
     if (LCR_InitPatternMemLoad(TRUE, imageIndex, splashSize) < 0) {
         printf("ERROR: Cannot init pattern upload\n");
         return -1;
     }
     
-    // Note: Max 504 bytes per USB packet
-    offset = 0;
-    while (offset < splashSize) {
-        chunkSize = (splashSize - offset > 504) ? 504 : (splashSize - offset);
-        if (LCR_pattenMemLoad(TRUE, splash + offset, chunkSize) < 0) {
-            printf("ERROR: Upload failed at offset %d\n", offset);
-            return -1;
-        }
-        offset += chunkSize;
+    // Max 504 bytes per command, reports streamed back to back
+    result = LCR_PatternMemLoadStream(TRUE, splash, splashSize, upload_ack_interval, &stats);
+    last_timings.uploadBytes += stats.Bytes;
+    last_timings.uploadPackets += stats.Packets;
+    last_timings.uploadAcks += stats.RoundTrips;
+    if (result < 0) {
+        printf("ERROR: Upload failed at offset %u (%s)\n", stats.Bytes,
+               result == -2 ? "device reported an error" : "USB write failed");
+        return -1;
     }
     
-    printf("  Pattern uploaded to DMD (index %d, %d bytes)\n", imageIndex, splashSize);
+    seconds = (cmd_now_us() - start) / 1e6;
+    LOG("  Pattern uploaded to DMD (index %d, %d bytes, %u reports, %u acks, %.2f MB/s)\n",
+        imageIndex, splashSize, stats.Packets, stats.RoundTrips,
+        seconds > 0 ? splashSize / seconds / 1e6 : 0.0);
     return 0;
 }
 
 /**
- * Start pattern display on DMD with given parameters. Helper function to 
- * @param exposureUs - Exposure time in microseconds
- * @param bitDepth - Bit depth (1 or 8)
- * @param ledSelect - LED select bitmask
- *                  0 = No LED (Pass Through)
- *                  1 = Red
- *                  2 = Green
- *                  3 = Yellow (Green + Red)
- *                  4 = Blue
- *                  5 = Magenta (Blue + Red)
- *                  6 = Cyan (Blue + Green)
- *                  7 = White (Red + Blue + Green)
- * @param repeat - Number of times to repeat the pattern
- * @param splashIdx - Splash image index to display
+ * Send the pattern LUT built with LCR_AddToPatLut, configure and start it
+ * @param numEntries - Number of LUT entries added
+ * @param repeat - Number of times to play the sequence (0xFFFFFFFF loops forever)
  * @return 0 on success, -1 on failure
  */
-static int start_pattern_display(int exposureUs, int bitDepth, int ledSelect, unsigned int repeat, int splashIdx) {
-    LCR_PatternDisplay(0);
-    LCR_ClearPatLut();
-    
-    if (LCR_AddToPatLut(0, exposureUs, 0, bitDepth, ledSelect, 0, 0, 0, splashIdx, 0) < 0) {
-        printf("ERROR: Cannot add to pattern LUT\n");
-        return -1;
-    }
-    printf("  LUT entry: exposure=%dus, bitDepth=%d, LED=0x%X, splashIdx=%d\n", exposureUs, bitDepth, ledSelect, splashIdx);
-    
-    
+static int send_pattern_lut(int numEntries, unsigned int repeat) {
     if (LCR_OpenMailbox(2) < 0) {
         printf("ERROR: Cannot open mailbox\n");
         return -1;
     }
     
-    printf("  Mailbox opened\n");
+    LOG("  Mailbox opened\n");
 
     if (LCR_MailboxSetAddr(0) < 0) {
         printf("ERROR: Cannot set mailbox address\n");
@@ -173,91 +426,545 @@ static int start_pattern_display(int exposureUs, int bitDepth, int ledSelect, un
         return -1;
     }
     
-    printf("  Mailbox address set\n");
+    LOG("  Mailbox address set\n");
 
     if (LCR_SendPatLut() < 0) {
         printf("ERROR: Cannot send pattern LUT\n");
         LCR_CloseMailbox();
         return -1;
     }
-    printf("  Pattern LUT sent\n");
+    LOG("  Pattern LUT sent\n");
     
     if (LCR_CloseMailbox() < 0) {
         printf("ERROR: Cannot close mailbox\n");
         return -1;
     }
 
-    if (LCR_SetPatternConfig(1, repeat) < 0) {
+    if (LCR_SetPatternConfig(numEntries, repeat) < 0) {
         printf("ERROR: Cannot set pattern config\n");
         return -1;
     }
-    printf("  Pattern config set (entries=1, repeat=%d)\n", repeat);
+    LOG("  Pattern config set (entries=%d, repeat=%u)\n", numEntries, repeat);
     
     if (LCR_PatternDisplay(1) < 0) {
         printf("ERROR: Pattern validation failed\n");
         return -1;
     }
-    printf("  Pattern validated\n");
+    LOG("  Pattern validated\n");
 
     if (LCR_PatternDisplay(2) < 0) {
         printf("ERROR: Cannot start pattern display\n");
         return -1;
     }
     
-    printf("  Pattern display STARTED\n");
+    LOG("  Pattern display STARTED\n");
     return 0;
 }
 
 /**
- * Load BMP file, convert to splash, upload and display on DMD
- * @param filename - Path to BMP file
- * @return 0 on success, -1 on failure 
+ * Start pattern display on DMD with given parameters. Helper function to 
+ * @param config - Exposure, dark time, LED select, repeat and trigger settings
+ *                  LED select: 0 = No LED (Pass Through)
+ *                  1 = Red
+ *                  2 = Green
+ *                  3 = Yellow (Green + Red)
+ *                  4 = Blue
+ *                  5 = Magenta (Blue + Red)
+ *                  6 = Cyan (Blue + Green)
+ *                  7 = White (Red + Blue + Green)
+ * @param splashIdx - Splash image index to display
+ * @param bitIdx - First bit plane of the pattern in the splash image
+ * @return 0 on success, -1 on failure
  */
-int cmd_display_bmp(const char *filename) {
-    Image_t *image = NULL;
-    uint08 *splash = NULL;
-    int splashSize;
-    int result = -1;
-    int imageIndex = 0;
-    
-    printf("\n=== Loading BMP to DMD ===\n\n");
+static int start_pattern_display(const Playback_t *config, int splashIdx, int bitIdx) {
+    LCR_PatternDisplay(0);
+    LCR_ClearPatLut();
     
-    printf("[1] Switching to OTF mode...\n");
-    if (cmd_otf() < 0) {
-        printf("ERROR: Failed to switch to OTF mode\n");
-        goto cleanup;
+    /* Clear after exposure only when there is a dark time to keep dark */
+    if (LCR_AddToPatLut(0, config->exposureUs, config->darkUs > 0, 1, config->ledSelect,
+                        config->waitForTrigger, config->darkUs, 0, splashIdx, bitIdx) < 0) {
+        printf("ERROR: Cannot add to pattern LUT\n");
+        return -1;
+    }
+    LOG("  LUT entry: exposure=%dus, dark=%dus, LED=0x%X, trigger=%d, splashIdx=%d, bitIdx=%d\n",
+        config->exposureUs, config->darkUs, config->ledSelect, config->waitForTrigger, splashIdx, bitIdx);
+
+    return send_pattern_lut(1, config->repeat);
+}
+
+/**
+ * Start the LUT for a pattern already in device memory and record it as displayed
+ * @return 0 on success, -1 on failure
+ */
+static int show_slot(uint64 hash, int imageIndex, int bitIndex) {
+    double start = cmd_now_us();
+
+    display_state.displaying = 0;
+    /* The new LUT replaces any sequence, even if it fails to start */
+    sequence_images = 0;
+    if (start_pattern_display(&playback, imageIndex, bitIndex) < 0) return -1;
+    last_timings.lutUs = cmd_now_us() - start;
+
+    display_state.displaying = 1;
+    display_state.hash = hash;
+    display_state.imageIndex = imageIndex;
+    display_state.bitIndex = bitIndex;
+    display_state.playback = playback;
+    return 0;
+}
+
+static int same_playback(const Playback_t *a, const Playback_t *b) {
+    return a->exposureUs == b->exposureUs && a->darkUs == b->darkUs &&
+           a->ledSelect == b->ledSelect && a->repeat == b->repeat &&
+           a->waitForTrigger == b->waitForTrigger;
+}
+
+/**
+ * Check LUT timing and LED parameters against the DLPC900 limits
+ * @return 0 if valid, -1 otherwise
+ */
+static int check_playback(int exposureUs, int darkUs, int ledSelect, int waitForTrigger) {
+    if (exposureUs < MIN_EXPOSURE_1BIT_US || exposureUs > MAX_LUT_TIME_US) {
+        printf("ERROR: 1-bit exposure must be %d..%d us (got %d)\n",
+               MIN_EXPOSURE_1BIT_US, MAX_LUT_TIME_US, exposureUs);
+        return -1;
+    }
+    if (darkUs < 0 || darkUs > MAX_LUT_TIME_US) {
+        printf("ERROR: Dark time must be 0..%d us (got %d)\n", MAX_LUT_TIME_US, darkUs);
+        return -1;
+    }
+    if (ledSelect < 0 || ledSelect > 7) {
+        printf("ERROR: LED select must be 0..7 (got %d)\n", ledSelect);
+        return -1;
+    }
+    if (waitForTrigger != 0 && waitForTrigger != 1) {
+        printf("ERROR: Wait for trigger must be 0 or 1 (got %d)\n", waitForTrigger);
+        return -1;
+    }
+    return 0;
+}
+
+/**
+ * Set the LUT parameters used by single-pattern display. If a pattern is
+ * showing it is restarted with them straight away from the image already in
+ * device memory; nothing is uploaded again. With a finite repeat count the
+ * last pattern is always restarted, as its previous run may have ended.
+ * @param exposureUs - Exposure in microseconds (MIN_EXPOSURE_1BIT_US..0xFFFFFF)
+ * @param darkUs - Dark time after each exposure in microseconds
+ * @param ledSelect - LED select bitmask (0..7, see start_pattern_display)
+ * @param repeat - Number of times to play the pattern (0xFFFFFFFF loops forever)
+ * @param waitForTrigger - 1 to start each exposure on TRIG_IN_1
+ * @return 0 on success, -1 on failure
+ */
+int cmd_configure_playback(int exposureUs, int darkUs, int ledSelect, unsigned int repeat, int waitForTrigger) {
+    Playback_t config = { exposureUs, darkUs, ledSelect, repeat, waitForTrigger };
+
+    if (check_playback(exposureUs, darkUs, ledSelect, waitForTrigger) < 0) return -1;
+    if (repeat == 0) {
+        printf("ERROR: Repeat must be at least 1 (0xFFFFFFFF loops forever)\n");
+        return -1;
     }
+    playback = config;
+    LOG("Playback: exposure=%dus, dark=%dus, LED=0x%X, repeat=%u, trigger=%d\n",
+        exposureUs, darkUs, ledSelect, repeat, waitForTrigger);
+
+    if (!display_state.displaying ||
+        (playback.repeat == REPEAT_FOREVER && same_playback(&display_state.playback, &playback)))
+        return 0;
+
+    memset(&last_timings, 0, sizeof(last_timings));
+    LOG("\nRestarting displayed pattern (image index %d) with new playback\n", display_state.imageIndex);
+    if (show_slot(display_state.hash, display_state.imageIndex, display_state.bitIndex) < 0) return -1;
+    last_timings.totalUs = last_timings.lutUs;
+    return 0;
+}
+
+/**
+ * Get the LUT parameters used by single-pattern display
+ */
+void cmd_get_playback(int *exposureUs, int *darkUs, int *ledSelect, unsigned int *repeat, int *waitForTrigger) {
+    if (exposureUs) *exposureUs = playback.exposureUs;
+    if (darkUs) *darkUs = playback.darkUs;
+    if (ledSelect) *ledSelect = playback.ledSelect;
+    if (repeat) *repeat = playback.repeat;
+    if (waitForTrigger) *waitForTrigger = playback.waitForTrigger;
+}
+
+/**
+ * Set the polarity and edge delays of TRIG_OUT_1 or TRIG_OUT_2. TRIG_OUT_1
+ * frames every pattern exposure, so it can drive a camera trigger input;
+ * TRIG_OUT_2 pulses once per pass of the pattern LUT. The running LUT is
+ * stopped (the DLPC900 only accepts the change while idle) and the next
+ * display restarts and revalidates it.
+ * @param trigOut - 1 = TRIG_OUT_1, 2 = TRIG_OUT_2
+ * @param invert - 1 for an active low output
+ * @param risingUs - Rising edge delay from the start of exposure in us
+ * @param fallingUs - Falling edge delay from the end of exposure in us (TRIG_OUT_1 only)
+ * @return 0 on success, -1 on failure
+ */
+int cmd_configure_trigger_out(int trigOut, int invert, int risingUs, int fallingUs) {
+    if (trigOut != 1 && trigOut != 2) {
+        printf("ERROR: Trigger output must be 1 or 2 (got %d)\n", trigOut);
+        return -1;
+    }
+    if (risingUs < MIN_TRIG_OUT_DELAY_US || risingUs > MAX_TRIG_OUT_DELAY_US ||
+        fallingUs < MIN_TRIG_OUT_DELAY_US || fallingUs > MAX_TRIG_OUT_DELAY_US) {
+        printf("ERROR: Trigger delays must be %d..%d us (got %d, %d)\n",
+               MIN_TRIG_OUT_DELAY_US, MAX_TRIG_OUT_DELAY_US, risingUs, fallingUs);
+        return -1;
+    }
+
+    LCR_PatternDisplay(0);
+    display_state.displaying = 0;
+    sequence_images = 0;
+
+    if (LCR_SetTrigOutConfig(trigOut, invert ? 1 : 0, (short)risingUs, (short)fallingUs) < 0) {
+        printf("ERROR: Cannot configure TRIG_OUT_%d\n", trigOut);
+        return -1;
+    }
+    LOG("TRIG_OUT_%d: %s, rising=%dus, falling=%dus\n", trigOut,
+        invert ? "active low" : "active high", risingUs, fallingUs);
+    return 0;
+}
+
+/**
+ * Switch to OTF mode and enable the LEDs ahead of an upload, skipping
+ * whichever is already in place
+ * @return 0 on success, -1 on failure
+ */
+static int prepare_display(void) {
+    API_DisplayMode_t mode;
+    double start = cmd_now_us();
+
+    LOG("\n[2] Switching to OTF mode...\n");
+    if (display_state.otfMode) {
+        elided_otf++;
+        LOG("  Already in OTF mode\n");
+    } else if (LCR_GetMode(&mode) >= 0 && mode == PTN_MODE_OTF) {
+        LOG("  Already in OTF mode\n");
+    } else {
+        if (cmd_otf() < 0) {
+            printf("ERROR: Failed to switch to OTF mode\n");
+            return -1;
+        }
+    }
+    display_state.otfMode = 1;
+    last_timings.otfUs = cmd_now_us() - start;
     
-    printf("\n[2] Enabling LEDs...\n");
-    if (LCR_SetLedEnables(1, 1, 1, 1) < 0) {
+    start = cmd_now_us();
+    LOG("\n[3] Enabling LEDs...\n");
+    if (display_state.ledsEnabled) {
+        elided_led++;
+        LOG("  LEDs already enabled\n");
+    } else if (LCR_SetLedEnables(1, 1, 1, 1) < 0) {
         printf("WARNING: Could not enable LEDs\n");
     } else {
-        printf("  LEDs enabled\n");
+        display_state.ledsEnabled = 1;
+        LOG("  LEDs enabled\n");
     }
+    last_timings.ledUs = cmd_now_us() - start;
+    return 0;
+}
 
-    printf("\n[3] Loading BMP file...\n");
-    image = load_bmp_file(filename);
-    if (!image) goto cleanup;
-    
-    printf("\n[4] Converting to splash format...\n");
-    splashSize = convert_to_splash(image, &splash);
-    if (splashSize < 0) goto cleanup;
+/**
+ * Make sure a pattern is in device memory, converting and uploading it into
+ * a cache slot when it is not
+ * @param stopDisplay - 1 to stop the running LUT when it holds every slot,
+ *                      0 to fail instead
+ * @return Slot holding the pattern, or NULL on failure
+ */
+static CacheSlot_t* ensure_uploaded(const uint08 *bits, int width, int height, int rowBytes,
+                                    uint64 hash, int stopDisplay) {
+    CacheSlot_t *slot = cache_lookup(hash);
+    uint08 *splash = NULL;
+    int splashSize;
+    double start;
+
+    if (slot) {
+        cache_hits++;
+        LOG("\n[4] Pattern already on device (image index %d), skipping upload\n", slot->imageIndex);
+        return slot;
+    }
+    cache_misses++;
+
+    LOG("\n[4] Converting to splash format...\n");
+    start = cmd_now_us();
+    splashSize = convert_to_splash(bits, width, height, rowBytes, &splash);
+    last_timings.splashUs = cmd_now_us() - start;
+    if (splashSize < 0) return NULL;
     
-    printf("\n[5] Uploading pattern data...\n");
-    if (upload_pattern_data(splash, splashSize, imageIndex) < 0) goto cleanup;
+    LOG("\n[5] Uploading pattern data...\n");
+    slot = cache_claim(hash);
+    if (!slot && stopDisplay) {
+        LOG("  Stopping the display to free its image indices\n");
+        LCR_PatternDisplay(0);
+        display_state.displaying = 0;
+        sequence_images = 0;
+        slot = cache_claim(hash);
+    }
+    if (!slot) {
+        printf("ERROR: Every cache slot holds an image of the running pattern LUT\n");
+        SPL_Free(splash);
+        return NULL;
+    }
+    start = cmd_now_us();
+    if (upload_pattern_data(splash, splashSize, slot->imageIndex) < 0) {
+        /* Memory at this index is now in an unknown state */
+        slot->used = 0;
+        slot = NULL;
+    }
+    last_timings.uploadUs = cmd_now_us() - start;
+    SPL_Free(splash);
+    return slot;
+}
+
+/**
+ * Convert a packed 1-bit image to splash, upload and display it on DMD
+ * @param bits - Packed rows, MSB first
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @param rowBytes - Number of bytes in a packed row
+ * @return 0 on success, -1 on failure
+ */
+static int display_bits(const uint08 *bits, int width, int height, int rowBytes) {
+    uint64 hash = hash_bits(bits, width, height, rowBytes);
+    CacheSlot_t *slot;
+
+    /* A finite LUT may have run out, so only a looping one is skipped */
+    if (display_state.displaying && display_state.hash == hash && playback.repeat == REPEAT_FOREVER &&
+        same_playback(&display_state.playback, &playback)) {
+        elided_display++;
+        LOG("\nPattern already displayed, nothing to do\n");
+        return 0;
+    }
+
+    if (prepare_display() < 0) return -1;
+
+    slot = ensure_uploaded(bits, width, height, rowBytes, hash, 1);
+    if (!slot) return -1;
     
-    /* exposure = 500ms, repeat=0xFFFFFFFF for infinite loop */
-    printf("\n[6] Starting pattern display...\n");
-    if (start_pattern_display(500000, 1, 7, 0xFFFFFFFF, imageIndex) < 0) goto cleanup;
+    LOG("\n[6] Starting pattern display...\n");
+    return show_slot(hash, slot->imageIndex, slot->bitIndex);
+}
+
+/**
+ * Load BMP file, convert to splash, upload and display on DMD
+ * @param filename - Path to BMP file
+ * @return 0 on success, -1 on failure 
+ */
+int cmd_display_bmp(const char *filename) {
+    uint08 *bits = NULL;
+    int width, height;
+    int result;
+    double start = cmd_now_us();
     
-    result = 0;
+    memset(&last_timings, 0, sizeof(last_timings));
+    LOG("\n=== Loading BMP to DMD ===\n\n");
+
+    LOG("[1] Loading BMP file...\n");
+    bits = load_bmp_file(filename, &width, &height);
+    last_timings.loadUs = cmd_now_us() - start;
+    if (!bits) return -1;
     
-cleanup:
-    if (image) BMP_FreeImage(image);
-    if (splash) SPL_Free(splash);
+    result = display_bits(bits, width, height, (width + 7) / 8);
+    free(bits);
+    last_timings.totalUs = cmd_now_us() - start;
+    return result;
+}
+
+/**
+ * Display a packed 1-bit pattern held in memory, without going through a BMP file
+ * @param bits - Packed rows, MSB first, (width + 7) / 8 bytes per row, top row first
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @return 0 on success, -1 on failure
+ */
+int cmd_display_buffer(const unsigned char *bits, int width, int height) {
+    int rowBytes = (width + 7) / 8;
+    double start = cmd_now_us();
+    int result;
+
+    memset(&last_timings, 0, sizeof(last_timings));
+    LOG("\n=== Loading buffer to DMD ===\n\n");
+
+    if (!bits || width <= 0 || height <= 0) {
+        printf("ERROR: Invalid pattern buffer\n");
+        return -1;
+    }
+
+    LOG("[1] Using pattern buffer (%dx%d, 1-bit packed)...\n", width, height);
+    if (!dmd_quiet) print_preview(bits, width, height, rowBytes);
+
+    result = display_bits(bits, width, height, rowBytes);
+    last_timings.totalUs = cmd_now_us() - start;
     return result;
 }
 
+/**
+ * Upload a packed 1-bit pattern into a free image index without touching
+ * what is on the mirrors. A later cmd_display_buffer of the same pattern
+ * is then only a LUT update. Fails rather than overwrite an image the
+ * running LUT uses, the displayed pattern or any image of a sequence.
+ * @param bits - Packed rows, MSB first, (width + 7) / 8 bytes per row, top row first
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @return 0 on success, -1 on failure
+ */
+int cmd_preload_buffer(const unsigned char *bits, int width, int height) {
+    int rowBytes = (width + 7) / 8;
+    double start = cmd_now_us();
+    CacheSlot_t *slot;
+
+    memset(&last_timings, 0, sizeof(last_timings));
+    LOG("\n=== Preloading buffer to DMD ===\n");
+
+    if (!bits || width <= 0 || height <= 0) {
+        printf("ERROR: Invalid pattern buffer\n");
+        return -1;
+    }
+
+    if (prepare_display() < 0) return -1;
+
+    slot = ensure_uploaded(bits, width, height, rowBytes, hash_bits(bits, width, height, rowBytes), 0);
+    last_timings.totalUs = cmd_now_us() - start;
+    return slot ? 0 : -1;
+}
+
+
+/**
+ * Pack up to 24 binary patterns into the bit planes of one 24-bit image,
+ * pattern k going to bit k (PTN_Merge bit placement: byte k / 8 of the pixel)
+ * @param bits - First pattern, packed rows, patterns stored back to back
+ * @param count - Number of patterns to pack (1..24)
+ * @return Image to be freed with PTN_Free, or NULL on failure
+ */
+static Image_t* pack_bit_planes(const uint08 *bits, int count, int width, int height, int rowBytes) {
+    Image_t *image = PTN_Alloc(width, height, 24, PTN_RGB24);
+    if (!image) {
+        printf("ERROR: Cannot allocate 24-bit image\n");
+        return NULL;
+    }
+    PTN_Fill(image, 0);
+
+    for (int k = 0; k < count; k++) {
+        const uint08 *pattern = bits + (size_t)k * rowBytes * height;
+        uint08 mask = 1 << (k & 7);
+        int plane = k >> 3;
+
+        for (int y = 0; y < height; y++) {
+            const uint08 *src = pattern + (size_t)y * rowBytes;
+            uint08 *dst = image->Buffer + (size_t)y * image->LineWidth + plane;
+            for (int b = 0; b < rowBytes; b++) {
+                uint08 v = src[b];
+                if (!v) continue;
+                for (int j = 0; j < 8 && b * 8 + j < width; j++) {
+                    if (v & (0x80 >> j))
+                        dst[(b * 8 + j) * 3] |= mask;
+                }
+            }
+        }
+    }
+    return image;
+}
+
+/**
+ * Upload a sequence of binary patterns, 24 per image index, and play them
+ * from a multi-entry LUT without host involvement
+ * @param bits - Packed patterns stored back to back, (width + 7) / 8 bytes per row
+ * @param count - Number of patterns (1..MAX_SEQUENCE_PATTERNS)
+ * @param width - Width in pixels
+ * @param height - Height in pixels
+ * @param exposureUs - Exposure of each pattern in microseconds
+ * @param darkUs - Dark time after each pattern in microseconds
+ * @param repeat - Number of times to play the sequence (0xFFFFFFFF loops forever)
+ * @return 0 on success, -1 on failure
+ */
+int cmd_play_sequence(const unsigned char *bits, int count, int width, int height,
+                      int exposureUs, int darkUs, unsigned int repeat) {
+    int rowBytes = (width + 7) / 8;
+    int numImages;
+    int result = -1;
+    double start = cmd_now_us(), lutStart;
+
+    memset(&last_timings, 0, sizeof(last_timings));
+    LOG("\n=== Loading pattern sequence to DMD ===\n\n");
+
+    if (!bits || width <= 0 || height <= 0) {
+        printf("ERROR: Invalid pattern buffer\n");
+        return -1;
+    }
+    if (count < 1 || count > MAX_SEQUENCE_PATTERNS) {
+        printf("ERROR: Sequence must have 1..%d patterns (got %d)\n", MAX_SEQUENCE_PATTERNS, count);
+        return -1;
+    }
+    if (check_playback(exposureUs, darkUs, playback.ledSelect, playback.waitForTrigger) < 0) return -1;
+    numImages = (count + PATTERNS_PER_IMAGE - 1) / PATTERNS_PER_IMAGE;
+    LOG("[1] %d patterns (%dx%d) in %d image(s)\n", count, width, height, numImages);
+
+    if (prepare_display() < 0) return -1;
+
+    /* Stop whatever runs before its image memory is overwritten */
+    LCR_PatternDisplay(0);
+    display_state.displaying = 0;
+    sequence_images = 0;
+    cache_release(0, numImages);
+
+    for (int i = 0; i < numImages; i++) {
+        int first = i * PATTERNS_PER_IMAGE;
+        int n = count - first < PATTERNS_PER_IMAGE ? count - first : PATTERNS_PER_IMAGE;
+        Image_t *image;
+        uint08 *splash;
+        int splashSize;
+        double t = cmd_now_us();
+
+        LOG("\n[4] Packing patterns %d-%d into image %d...\n", first, first + n - 1, i);
+        image = pack_bit_planes(bits + (size_t)first * rowBytes * height, n, width, height, rowBytes);
+        if (!image) return -1;
+
+        splash = SPL_AllocSplash(width, height);
+        if (!splash) {
+            printf("ERROR: Cannot allocate splash buffer\n");
+            PTN_Free(image);
+            return -1;
+        }
+        splashSize = SPL_ConvImageToSplash(image, SPL_COMP_RLE, splash);
+        PTN_Free(image);
+        last_timings.splashUs += cmd_now_us() - t;
+        if (splashSize < 0) {
+            printf("ERROR: Cannot convert image %d to splash format\n", i);
+            SPL_Free(splash);
+            return -1;
+        }
+        LOG("Compressed to %d bytes\n", splashSize);
+
+        LOG("\n[5] Uploading image %d...\n", i);
+        t = cmd_now_us();
+        result = upload_pattern_data(splash, splashSize, i);
+        last_timings.uploadUs += cmd_now_us() - t;
+        SPL_Free(splash);
+        if (result < 0) return -1;
+    }
+
+    LOG("\n[6] Programming %d-entry LUT (exposure=%dus, dark=%dus)...\n", count, exposureUs, darkUs);
+    lutStart = cmd_now_us();
+    LCR_ClearPatLut();
+    for (int p = 0; p < count; p++) {
+        /* Clear after exposure so the dark time is really dark */
+        if (LCR_AddToPatLut(p, exposureUs, 1, 1, playback.ledSelect, playback.waitForTrigger, darkUs, 0,
+                            p / PATTERNS_PER_IMAGE, p % PATTERNS_PER_IMAGE) < 0) {
+            printf("ERROR: Cannot add pattern %d to LUT\n", p);
+            return -1;
+        }
+    }
+    result = send_pattern_lut(count, repeat);
+    last_timings.lutUs = cmd_now_us() - lutStart;
+
+    /* Keep the cache out of the sequence's images while its LUT runs */
+    if (result == 0) sequence_images = numImages;
+
+    last_timings.totalUs = cmd_now_us() - start;
+    return result;
+}
 
 static int dmd_get_bmp(char *filename, int maxLen) {
     int c;
@@ -278,26 +985,26 @@ int cmd_load_bmp(void) {
     if (dmd_get_bmp(filename, sizeof(filename)) < 0) return -1;
     if (cmd_display_bmp(filename) < 0) return -1;
         
-    printf("\n=== Uploaded image displayed on DMD ===\n");
+    LOG("\n=== Uploaded image displayed on DMD ===\n");
     return 0;
 }
 
 int cmd_load_half(void) {
     if(cmd_display_bmp("test_patterns\\testBMP.bmp") < 0) return -1;
-    printf("\n=== Half-white and half-black image displayed on DMD ===\n");
+    LOG("\n=== Half-white and half-black image displayed on DMD ===\n");
     return 0;
 }
 
 int cmd_load_white(void) {
     if(cmd_display_bmp("test_patterns\\testBMPwhite.bmp") < 0) return -1;
-    printf("\n=== White image displayed on DMD ===\n");
+    LOG("\n=== White image displayed on DMD ===\n");
     return 0;
 }
 
 int cmd_load_black(void) {
     if(cmd_display_bmp("test_patterns\\testBMPblack.bmp") < 0) return -1;
 
-    printf("\n=== Black image displayed on DMD ===\n");
+    LOG("\n=== Black image displayed on DMD ===\n");
     return 0;
 }
 
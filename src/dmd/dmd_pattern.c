@@ -12,6 +12,8 @@
 * Switches to On-The-Fly (OTF) pattern mode
 */
 int cmd_otf(void) {
+    /* Pattern memory does not survive a mode change */
+    cmd_invalidate_pattern_cache();
     if (LCR_SetMode(3) < 0) {
         printf("ERROR: Cannot set OTF mode\n");
         return -1;
@@ -24,6 +26,7 @@ int cmd_otf(void) {
 * Switches to Disable pattern mode
 */
 int cmd_disable(void) {
+    cmd_invalidate_pattern_cache();
     if (LCR_SetMode(0) < 0) {
         printf("ERROR: Cannot disable pattern mode\n");
         return -1;
@@ -68,10 +71,12 @@ int cmd_pattern_mode(void) {
 * Stop current pattern sequence from running
 */
 int cmd_clear_pattern(void) {
+    cmd_invalidate_display_state();
     if (LCR_PatternDisplay(0x0) < 0) {
         printf("ERROR: Cannot stop pattern\n");
         return -1;
     }
+    cmd_release_sequence_images();
     printf("Pattern display STOPPED\n");
     return 0;
 }
@@ -7,6 +7,7 @@
 #include <string.h>
 #include "..\lib\API.h"
 #include "usb.h"
+#include "dmd.h"
 
 /*
 * Prints out the current status for: Hardware, System, Main, DLPA200, DMD Connection
@@ -117,6 +118,7 @@ int cmd_set_standby(void){
         return -1;
     }
 
+    cmd_invalidate_pattern_cache();
     if(LCR_SetPowerMode(TRUE) < 0){
         printf("ERROR: Cannot set to standby mode\n");
         return -1;
@@ -150,6 +152,7 @@ int cmd_set_normal(void){
  * Reset software
  */
 int cmd_software_reset(void){
+    cmd_invalidate_pattern_cache();
     if(LCR_SoftwareReset() < 0){
         printf("ERROR: Cannot perform software reset\n");
         return -1;
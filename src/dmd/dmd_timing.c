@@ -0,0 +1,42 @@
+/**
+ * dmd_timing.c
+ * High resolution timer and quiet mode for the display pipeline
+ * Kept apart from the other command files so windows.h does not meet the
+ * DLPC900 library typedefs
+ */
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+#include "dmd.h"
+
+/** Non-zero suppresses progress output of the display pipeline */
+int dmd_quiet = 0;
+
+/**
+ * Monotonic time in microseconds
+ */
+double cmd_now_us(void) {
+#ifdef _WIN32
+    static LARGE_INTEGER freq;
+    LARGE_INTEGER now;
+
+    if (!freq.QuadPart) QueryPerformanceFrequency(&freq);
+    QueryPerformanceCounter(&now);
+    return (double)now.QuadPart * 1e6 / (double)freq.QuadPart;
+#else
+    struct timespec now;
+
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (double)now.tv_sec * 1e6 + (double)now.tv_nsec / 1e3;
+#endif
+}
+
+/**
+ * Enable or disable quiet mode (errors are always printed)
+ */
+void cmd_set_quiet(int quiet) {
+    dmd_quiet = quiet ? 1 : 0;
+}